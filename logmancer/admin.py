@@ -3,7 +3,8 @@ from django.utils.html import format_html
 from django.utils.timezone import localtime
 from django.utils.translation import gettext_lazy as _
 
-from logmancer.models import LogEntry
+from logmancer.levels import LogLevel
+from logmancer.models import LogAggregate, LogEntry, NotificationOutbox
 
 LEVEL_COLORS = {
     "DEFAULT": "#000000",
@@ -17,6 +18,29 @@ LEVEL_COLORS = {
 }
 
 
+class MinimumLevelFilter(admin.SimpleListFilter):
+    """Filter entries at or above a severity using the level_value index"""
+
+    title = _("Minimum level")
+    parameter_name = "min_level"
+
+    def lookups(self, request, model_admin):
+        seen = set()
+        choices = []
+        for level in LogLevel:
+            if level.value.value and level.value.value not in seen:
+                seen.add(level.value.value)
+                choices.append((str(level.value.value), f"{level.value.name}+"))
+        return choices
+
+    def queryset(self, request, queryset):
+        try:
+            value = int(self.value())
+        except (TypeError, ValueError):
+            return queryset
+        return queryset.filter(level_value__gte=value)
+
+
 @admin.register(LogEntry)
 class LogEntryAdmin(admin.ModelAdmin):
     list_display = (
@@ -29,6 +53,7 @@ class LogEntryAdmin(admin.ModelAdmin):
         "short_message",
     )
     list_filter = (
+        MinimumLevelFilter,
         "level",
         "status_code",
         "actor_type",
@@ -48,6 +73,10 @@ class LogEntryAdmin(admin.ModelAdmin):
         "meta",
         "source",
         "actor_type",
+        "sample_rate",
+        "duration_ms",
+        "db_query_count",
+        "db_time_ms",
     )
 
     def formatted_timestamp(self, obj):
@@ -67,3 +96,42 @@ class LogEntryAdmin(admin.ModelAdmin):
         return msg[:60] + "..." if len(msg) > 60 else msg
 
     short_message.short_description = _("Message")
+
+
+@admin.register(LogAggregate)
+class LogAggregateAdmin(admin.ModelAdmin):
+    list_display = (
+        "bucket",
+        "period",
+        "method",
+        "path",
+        "status_code",
+        "level",
+        "count",
+        "error_count",
+        "p50_ms",
+        "p95_ms",
+    )
+    list_filter = ("period", "method", "status_code", "level")
+    search_fields = ("path",)
+    ordering = ("-bucket",)
+    date_hierarchy = "bucket"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    list_display = ("id", "backend", "log_entry_id", "attempts", "next_attempt_at", "last_error")
+    list_filter = ("backend", "attempts")
+    ordering = ("id",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
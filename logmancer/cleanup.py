@@ -0,0 +1,264 @@
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.deletion import Collector
+from django.db.models.signals import post_delete
+
+from logmancer.levels import LogLevel
+from logmancer.models import LogEntry
+from logmancer.sampling import parse_statuses
+
+logger = logging.getLogger("logmancer.cleanup")
+
+
+class BatchProgress(NamedTuple):
+    """Progress after one committed batch, ``next_pk`` is where a rerun can resume"""
+
+    deleted: int
+    total: int
+    next_pk: int
+
+
+def as_list(value) -> list:
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def status_q(statuses: Iterable[str]) -> Q:
+    """Build a status_code filter from exact codes and classes such as 5xx"""
+    q = Q()
+    for status in statuses:
+        if status.endswith("xx"):
+            start = int(status[0]) * 100
+            q |= Q(status_code__gte=start, status_code__lt=start + 100)
+        else:
+            q |= Q(status_code=int(status))
+    return q
+
+
+class RetentionPolicy(NamedTuple):
+    """Keep rows matching ``filters`` for ``days`` days"""
+
+    label: str
+    days: int
+    filters: Q
+    min_level: Optional[str] = None
+
+    @classmethod
+    def from_config(cls, config) -> "RetentionPolicy":
+        days = config["days"]
+        if not isinstance(days, int) or days < 0:
+            raise ValueError("days must be a non-negative integer")
+
+        filters = Q()
+        labels = []
+        min_level = None
+        levels = [str(level).upper() for level in as_list(config.get("level"))]
+        if levels:
+            filters &= Q(level__in=levels)
+            labels.append(f"level={','.join(levels)}")
+        if config.get("min_level"):
+            level = LogLevel.lookup(config["min_level"])
+            if level is None:
+                raise ValueError(f"unknown level {config['min_level']!r}")
+            filters &= Q(level_value__gte=level.value.value)
+            labels.append(f"min_level={level.name}")
+            min_level = level.name
+        sources = as_list(config.get("source"))
+        if sources:
+            filters &= Q(source__in=sources)
+            labels.append(f"source={','.join(sources)}")
+        statuses = sorted(parse_statuses(config.get("status")))
+        if statuses:
+            filters &= status_q(statuses)
+            labels.append(f"status={','.join(statuses)}")
+
+        if not labels:
+            raise ValueError("a policy needs level, min_level, source or status")
+        return cls(" ".join(labels), days, filters, min_level)
+
+
+def build_retention_policies(configs: Iterable[dict]) -> List[RetentionPolicy]:
+    """
+    Build the valid policies, dropping repeats of an earlier policy's filters.
+
+    Labels are derived from the filters and name the cleanup passes, so a repeat
+    would only shadow the first policy's days and make ``--start-pass`` ambiguous.
+    """
+    policies = []
+    labels = set()
+    for config in configs:
+        try:
+            policy = RetentionPolicy.from_config(config)
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            logger.error(f"Ignoring invalid RETENTION_POLICIES entry {config!r}: {e}")
+            continue
+        if policy.label in labels:
+            logger.error(
+                f"Ignoring RETENTION_POLICIES entry {config!r}: "
+                f"duplicates the filters of policy {policy.label!r}"
+            )
+            continue
+        labels.add(policy.label)
+        policies.append(policy)
+    return policies
+
+
+def plan_retention(
+    policies: List[RetentionPolicy], default_days: int, now: datetime
+) -> List[Tuple[str, int, object]]:
+    """
+    Return one (label, days, queryset) pass per policy plus one for everything else.
+
+    A row belongs to the first policy it matches, so each pass excludes the rows of
+    the policies before it. Every pass filters on timestamp together with the
+    policy's level, source or status columns, which the composite indexes cover.
+    """
+    passes = []
+    earlier = Q()
+    for policy in policies:
+        queryset = LogEntry.objects.filter(
+            policy.filters, timestamp__lt=now - timedelta(days=policy.days)
+        )
+        if earlier:
+            queryset = queryset.exclude(earlier)
+        passes.append((policy.label, policy.days, queryset))
+        earlier |= policy.filters
+
+    queryset = LogEntry.objects.filter(timestamp__lt=now - timedelta(days=default_days))
+    if earlier:
+        queryset = queryset.exclude(earlier)
+    passes.append(("default", default_days, queryset))
+    return passes
+
+
+@contextmanager
+def without_receiver(signal, receiver):
+    """Temporarily disconnect a receiver that was connected with default arguments"""
+    disconnected = signal.disconnect(receiver)
+    try:
+        yield
+    finally:
+        if disconnected:
+            signal.connect(receiver)
+
+
+def can_raw_delete(queryset) -> bool:
+    """
+    Check whether rows can be deleted with a single DELETE statement.
+
+    Logmancer's own post_delete receiver listens to every model, which alone makes
+    Django's Collector fetch each row into Python. It never logs LogEntry deletes, so
+    it is ignored here; any other delete listener, cascade or parent model still
+    requires the Collector.
+    """
+    from logmancer.signals import log_model_delete
+
+    with without_receiver(post_delete, log_model_delete):
+        return Collector(using=queryset.db).can_fast_delete(queryset)
+
+
+def delete_in_batches(
+    queryset,
+    batch_size: int = 10000,
+    sleep: float = 0,
+    start_pk: Optional[int] = None,
+    progress: Optional[Callable[[BatchProgress], None]] = None,
+    raw: Optional[bool] = None,
+    before_delete: Optional[Callable] = None,
+) -> int:
+    """
+    Delete the rows of a queryset in bounded primary-key ranges.
+
+    Each range holds at most ``batch_size`` matching rows and is deleted in its own
+    transaction, so locks are short-lived and an interrupted run keeps everything it
+    already deleted. The total is counted from the deletes themselves, no separate
+    ``count()`` is run.
+
+    When ``raw`` is true (by default when ``can_raw_delete`` allows it) each range is
+    removed with one DELETE statement and no delete signals are sent.
+
+    ``before_delete`` is called with each batch's queryset inside its transaction,
+    e.g. to roll the rows up before they are gone.
+    """
+    batch_size = max(1, batch_size)
+    queryset = queryset.order_by()
+    using = queryset.db
+    if raw is None:
+        raw = can_raw_delete(queryset)
+    cursor = start_pk
+    total = 0
+
+    while True:
+        remaining = queryset if cursor is None else queryset.filter(pk__gte=cursor)
+        pks = remaining.order_by("pk").values_list("pk", flat=True)
+        first = list(pks[:1])
+        if not first:
+            break
+
+        # The pk of the batch_size-th matching row closes the range
+        last = list(pks[batch_size - 1 : batch_size])
+        batch = remaining.filter(pk__lte=last[0]) if last else remaining
+
+        with transaction.atomic(using=using):
+            if before_delete is not None:
+                before_delete(batch)
+            deleted = batch._raw_delete(using) if raw else batch.delete()[0]
+
+        total += deleted
+        if not last:
+            if progress:
+                progress(BatchProgress(deleted, total, first[0]))
+            break
+
+        cursor = last[0] + 1
+        if progress:
+            progress(BatchProgress(deleted, total, cursor))
+        if sleep:
+            time.sleep(sleep)
+
+    return total
+
+
+def backfill_level_values(
+    batch_size: int = 10000,
+    sleep: float = 0,
+    progress: Optional[Callable[[BatchProgress], None]] = None,
+) -> int:
+    """
+    Recompute ``level_value`` for rows that still hold the column default.
+
+    Rows written before the column existed look like INFO to ``min_level`` filters
+    and retention policies until this has run. Each primary-key range of at most
+    ``batch_size`` stale rows is updated in its own transaction.
+    """
+    batch_size = max(1, batch_size)
+    stale = LogEntry.objects.stale_level_values().order_by("pk")
+    cursor = None
+    total = 0
+
+    while True:
+        remaining = stale if cursor is None else stale.filter(pk__gt=cursor)
+        pks = list(remaining.values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            break
+
+        with transaction.atomic():
+            updated = remaining.filter(pk__lte=pks[-1]).backfill_level_values()
+
+        total += updated
+        cursor = pks[-1]
+        if progress:
+            progress(BatchProgress(updated, total, cursor + 1))
+        if len(pks) < batch_size:
+            break
+        if sleep:
+            time.sleep(sleep)
+
+    return total
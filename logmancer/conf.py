@@ -1,24 +1,150 @@
+from types import MappingProxyType
+from typing import Any, FrozenSet, Mapping, NamedTuple, Optional
+
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from logmancer.matching import PathMatcher
+from logmancer.sampling import RequestSampler, SlowRequestFilter
+from logmancer.sanitize import MetaLimits, Sanitizer
 
 DEFAULTS = {
     "LOG_SENSITIVE_KEYS": ["password", "token", "authorization"],
+    "LOG_SENSITIVE_VALUE_PATTERNS": [],
     "ENABLE_MIDDLEWARE": True,
     "AUTO_LOG_EXCEPTIONS": False,
     "CLEANUP_AFTER_DAYS": 30,
-    "SIGNAL_EXCLUDE_MODELS": ["logmancer.LogEntry", "admin.LogEntry"],
+    "SIGNAL_EXCLUDE_MODELS": [
+        "logmancer.LogEntry",
+        "logmancer.NotificationOutbox",
+        "admin.LogEntry",
+    ],
     "PATH_EXCLUDE_PREFIXES": [],
     "DEFAULT_LOG_LEVEL": "INFO",
     "NOTIFICATIONS": {},
     "ENABLE_NOTIFICATIONS": False,
+    "NOTIFICATION_QUEUE_SIZE": 1000,
+    "NOTIFICATION_MAX_CONCURRENCY": 10,
+    "NOTIFICATION_OVERFLOW_POLICY": "drop_newest",
+    "NOTIFICATION_BLOCK_TIMEOUT": 1.0,
+    "NOTIFICATION_STATS_INTERVAL": 0,
+    "NOTIFICATION_DEDUP_WINDOW": 0,
+    "NOTIFICATION_DEDUP_MAX_KEYS": 10000,
+    "NOTIFICATION_OUTBOX": False,
+    "NOTIFICATION_OUTBOX_BATCH_SIZE": 100,
+    "NOTIFICATION_OUTBOX_MAX_ATTEMPTS": 5,
+    "NOTIFICATION_OUTBOX_BACKOFF": 30,
+    "BUFFERED_WRITES": False,
+    "BUFFER_SIZE": 100,
+    "BUFFER_FLUSH_INTERVAL": 5,
+    "MIDDLEWARE_BACKGROUND_WRITES": False,
+    "BACKGROUND_QUEUE_SIZE": 10000,
+    "META_MAX_FIELD_BYTES": 65536,
+    "META_MAX_DEPTH": 20,
+    "META_MAX_LIST_LENGTH": 1000,
+    "LOG_REQUEST_BODY": True,
+    "BODY_CAPTURE_PATHS": [],
+    "BODY_CAPTURE_CONTENT_TYPES": [],
+    "BODY_MAX_BYTES": 65536,
+    "BODY_FORMAT": "parsed",
+    "SAMPLING_RULES": [],
+    "RATE_LIMITS": [],
+    "PARTITIONING": None,
+    "PARTITION_PREMAKE": 3,
+    "CLEANUP_BATCH_SIZE": 10000,
+    "CLEANUP_BATCH_SLEEP": 0,
+    "RETENTION_POLICIES": [],
+    "ROLLUP_PERIODS": [],
+    "ROLLUP_SOURCES": ["middleware"],
+    "LOG_DB_TIMING": False,
+    "SLOW_REQUESTS_ONLY": False,
+    "SLOW_REQUEST_THRESHOLD_MS": 1000,
+    "SLOW_REQUEST_THRESHOLDS": {},
 }
 
 
+class LogmancerSettings(NamedTuple):
+    """Immutable snapshot of LOGMANCER settings with precomputed hot path lookups"""
+
+    values: Mapping[str, Any]
+    sensitive_keys: FrozenSet[str]
+    exclude_models: FrozenSet[str]
+    path_exclude_matcher: PathMatcher
+    sanitizer: Sanitizer
+    masker: Sanitizer
+    body_capture_paths: PathMatcher
+    body_content_types: FrozenSet[str]
+    sampler: RequestSampler
+    slow_requests: Optional[SlowRequestFilter]
+
+    @classmethod
+    def build(cls, user_settings) -> "LogmancerSettings":
+        values = {**DEFAULTS, **user_settings}
+
+        def as_list(key):
+            val = values.get(key)
+            return list(val) if isinstance(val, (list, tuple)) else []
+
+        def as_dict(key):
+            val = values.get(key)
+            return val if isinstance(val, dict) else {}
+
+        def as_int(key):
+            val = values.get(key)
+            return val if isinstance(val, int) else DEFAULTS.get(key, 0)
+
+        exclude_models = DEFAULTS["SIGNAL_EXCLUDE_MODELS"] + as_list("SIGNAL_EXCLUDE_MODELS")
+        sensitive_keys = frozenset(k.lower() for k in as_list("LOG_SENSITIVE_KEYS"))
+        value_patterns = as_list("LOG_SENSITIVE_VALUE_PATTERNS")
+        limits = MetaLimits(
+            max_field_bytes=as_int("META_MAX_FIELD_BYTES"),
+            max_depth=as_int("META_MAX_DEPTH"),
+            max_list_length=as_int("META_MAX_LIST_LENGTH"),
+        )
+
+        return cls(
+            values=MappingProxyType(values),
+            sensitive_keys=sensitive_keys,
+            exclude_models=frozenset(m.lower() for m in exclude_models),
+            path_exclude_matcher=PathMatcher(as_list("PATH_EXCLUDE_PREFIXES")),
+            sanitizer=Sanitizer(sensitive_keys, limits, value_patterns),
+            masker=Sanitizer(sensitive_keys, value_patterns=value_patterns),
+            body_capture_paths=PathMatcher(as_list("BODY_CAPTURE_PATHS")),
+            body_content_types=frozenset(t.lower() for t in as_list("BODY_CAPTURE_CONTENT_TYPES")),
+            sampler=RequestSampler(as_list("SAMPLING_RULES"), as_list("RATE_LIMITS")),
+            slow_requests=(
+                SlowRequestFilter(
+                    as_int("SLOW_REQUEST_THRESHOLD_MS"), as_dict("SLOW_REQUEST_THRESHOLDS")
+                )
+                if values.get("SLOW_REQUESTS_ONLY") is True
+                else None
+            ),
+        )
+
+
+_settings = None
+
+
+def get_settings() -> LogmancerSettings:
+    """Get the cached settings snapshot, building it on first use"""
+    global _settings
+    if _settings is None:
+        _settings = LogmancerSettings.build(getattr(settings, "LOGMANCER", {}))
+    return _settings
+
+
+@receiver(setting_changed)
+def reset_settings(setting, **kwargs):
+    """Drop the cached snapshot when LOGMANCER changes, e.g. with override_settings"""
+    global _settings
+    if setting == "LOGMANCER":
+        _settings = None
+
+
 def get(key):
     """Get value from LOGMANCER settings"""
-    logmancer_settings = getattr(settings, "LOGMANCER", {})
-    if key in logmancer_settings:
-        return logmancer_settings[key]
-    return DEFAULTS.get(key)
+    return get_settings().values.get(key)
 
 
 def get_list(key):
@@ -57,18 +183,11 @@ def should_exclude_model(model):
     """
     Determines whether the model should be excluded from signal logging.
     """
-    ex_models = DEFAULTS["SIGNAL_EXCLUDE_MODELS"]
-    exclude_list = ex_models + get_list("SIGNAL_EXCLUDE_MODELS")
-    model_key = f"{model._meta.app_label}.{model.__name__}".lower()
-
-    normalized_excludes = [m.lower() for m in exclude_list]
-
-    return model_key in normalized_excludes
+    return model._meta.label_lower in get_settings().exclude_models
 
 
 def should_exclude_path(path: str) -> bool:
     """
     Checks whether logging should be excluded for a given path in middleware.
     """
-    prefixes = get_list("PATH_EXCLUDE_PREFIXES")
-    return any(path.startswith(p) for p in prefixes)
+    return get_settings().path_exclude_matcher.matches(path)
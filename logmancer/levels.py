@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Dict, NamedTuple
+from typing import Dict, NamedTuple, Optional
 
 
 class LevelInfo(NamedTuple):
@@ -74,22 +74,35 @@ class LogLevel(Enum):
         css_class="log-fatal",
     )
 
+    @classmethod
+    def lookup(cls, name: str) -> Optional["LogLevel"]:
+        """Get LogLevel from name string, or None if unknown"""
+        level = _LEVELS_BY_NAME.get(name)
+        if level is None and isinstance(name, str):
+            level = _LEVELS_BY_NAME.get(name.upper())
+        return level
+
     @classmethod
     def from_name(cls, name: str) -> "LogLevel":
         """Get LogLevel from name string"""
-        name_upper = name.upper()
-        for level in cls:
-            if level.value.name == name_upper:
-                return level
-        raise ValueError(f"Unknown log level: {name}")
+        level = cls.lookup(name)
+        if level is None:
+            raise ValueError(f"Unknown log level: {name}")
+        return level
 
     @classmethod
     def from_value(cls, value: int) -> "LogLevel":
         """Get LogLevel from numeric value"""
-        for level in cls:
-            if level.value.value == value:
-                return level
-        raise ValueError(f"Unknown log level value: {value}")
+        level = _LEVELS_BY_VALUE.get(value)
+        if level is None:
+            raise ValueError(f"Unknown log level value: {value}")
+        return level
+
+    @classmethod
+    def severity(cls, name: str, default: int = 0) -> int:
+        """Get numeric value for a level name, or default if unknown"""
+        level = cls.lookup(name)
+        return level.value.value if level is not None else default
 
     @classmethod
     def get_choices(cls):
@@ -164,3 +177,12 @@ class LogLevel(Enum):
         if isinstance(other, LogLevel):
             return self.value.value >= other.value.value
         return NotImplemented
+
+
+# Lookup tables built once at import time
+_LEVELS_BY_NAME: Dict[str, LogLevel] = {level.value.name: level for level in LogLevel}
+_LEVELS_BY_VALUE: Dict[int, LogLevel] = {}
+for _level in LogLevel:
+    # Aliases share a value (CRITICAL/FATAL), the first definition wins
+    _LEVELS_BY_VALUE.setdefault(_level.value.value, _level)
+del _level
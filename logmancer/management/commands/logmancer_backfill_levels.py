@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from logmancer.cleanup import backfill_level_values
+from logmancer.conf import get, get_int
+
+
+class Command(BaseCommand):
+    help = "Logmancer: Fills in level_value for log entries written before it existed."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Update at most this many rows per transaction",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            help="Seconds to wait between batches",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options.get("batch_size") or get_int("CLEANUP_BATCH_SIZE")
+        sleep = options.get("sleep")
+        if sleep is None:
+            sleep = get("CLEANUP_BATCH_SLEEP") or 0
+
+        count = backfill_level_values(batch_size, sleep, progress=self.report_progress)
+        self.stdout.write(
+            self.style.SUCCESS(f"[Logmancer] Backfilled level_value of {count} log entries.")
+        )
+
+    def report_progress(self, progress):
+        self.stdout.write(
+            f"[Logmancer] Updated {progress.deleted} entries ({progress.total} total)"
+        )
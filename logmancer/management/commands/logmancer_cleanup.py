@@ -1,11 +1,15 @@
+import shlex
 from datetime import timedelta
+from functools import partial
 
-from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
 
-from logmancer.conf import get_int
+from logmancer.cleanup import build_retention_policies, delete_in_batches, plan_retention
+from logmancer.conf import get, get_int, get_list
 from logmancer.models import LogEntry
+from logmancer.partitions import get_partitioner
+from logmancer.rollup import rollup
 from logmancer.utils import LogEvent
 
 
@@ -23,32 +27,146 @@ class Command(BaseCommand):
             action="store_true",
             help="Show how many logs would be deleted, but do not delete.",
         )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Delete at most this many rows per transaction",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            help="Seconds to wait between batches",
+        )
+        parser.add_argument(
+            "--start-pk",
+            type=int,
+            help="Resume a previous run from this primary key",
+        )
+        parser.add_argument(
+            "--start-pass",
+            help="Resume a previous run from this retention pass, --start-pk applies to it",
+        )
 
     def handle(self, *args, **options):
         days = options.get("days") or get_int("CLEANUP_AFTER_DAYS")
         dry_run = options.get("dry_run", False)
-        threshold_date = timezone.now() - timedelta(days=days)
+        now = timezone.now()
+
+        policies = build_retention_policies(get_list("RETENTION_POLICIES"))
+        passes = plan_retention(policies, days, now)
+        if any(policy.min_level for policy in policies):
+            oldest_kept = now - timedelta(days=min(pass_days for _, pass_days, _ in passes))
+            self.check_level_values(oldest_kept, dry_run)
+        # A partition can only go once no policy keeps any of its rows
+        threshold_date = now - timedelta(days=max(pass_days for _, pass_days, _ in passes))
+
+        before_delete = None
+        periods = get_list("ROLLUP_PERIODS")
+        if periods:
+            # Rows are compacted into LogAggregate in the transaction that removes them
+            before_delete = partial(rollup, periods=periods, sources=get_list("ROLLUP_SOURCES"))
 
-        old_logs = LogEntry.objects.filter(timestamp__lt=threshold_date)
-        count = old_logs.count()
+        dropped = self.drop_partitions(threshold_date, dry_run, before_delete)
 
         if dry_run:
+            count = 0
+            for label, pass_days, old_logs in passes:
+                pass_count = old_logs.count()
+                count += pass_count
+                if label != "default":
+                    self.stdout.write(
+                        f"[Logmancer] {pass_count} entries matching {label} "
+                        f"older than {pass_days} days"
+                    )
             msg = (
                 f"[Logmancer] {count} log entries older than {days} days "
                 "would be deleted (dry run)."
             )
             self.stdout.write(self.style.WARNING(msg))
         else:
-            with transaction.atomic():
-                old_logs.delete()
-                LogEvent.info(
-                    message=f"{count} old logs cleaned up (>{days} days)",
-                    meta={"days": days, "count": count},
-                    source="cleanup",
-                    actor_type="system",
-                )
+            counts = self.delete_passes(passes, options, before_delete)
+            count = sum(counts.values())
+
+            LogEvent.info(
+                message=f"{count} old logs cleaned up (>{days} days)",
+                meta={
+                    "days": days,
+                    "count": count,
+                    "policies": counts,
+                    "dropped_partitions": [p.name for p in dropped],
+                },
+                source="cleanup",
+                actor_type="system",
+            )
             self.stdout.write(
                 self.style.SUCCESS(
                     f"[Logmancer] Deleted {count} log entries older than {days} days."
                 )
             )
+
+    def delete_passes(self, passes, options, before_delete=None):
+        """Run the retention passes in order, returns the deleted count per pass"""
+        labels = [label for label, _, _ in passes]
+        start_pass = options.get("start_pass") or labels[0]
+        if start_pass not in labels:
+            raise CommandError(
+                f"Unknown retention pass {start_pass!r}, expected one of: {', '.join(labels)}"
+            )
+
+        batch_size = options.get("batch_size") or get_int("CLEANUP_BATCH_SIZE")
+        sleep = options.get("sleep")
+        if sleep is None:
+            sleep = get("CLEANUP_BATCH_SLEEP") or 0
+
+        counts = {}
+        # Passes before the resumed one already finished
+        for label, pass_days, old_logs in passes[labels.index(start_pass) :]:
+            counts[label] = delete_in_batches(
+                old_logs,
+                batch_size=batch_size,
+                sleep=sleep,
+                start_pk=options.get("start_pk") if label == start_pass else None,
+                progress=partial(self.report_progress, label),
+                before_delete=before_delete,
+            )
+            if label != "default":
+                self.stdout.write(
+                    f"[Logmancer] Deleted {counts[label]} entries matching {label} "
+                    f"older than {pass_days} days"
+                )
+        return counts
+
+    def check_level_values(self, threshold_date, dry_run):
+        """Refuse min_level retention while old rows still hold the level_value default"""
+        if not LogEntry.objects.filter(timestamp__lt=threshold_date).stale_level_values().exists():
+            return
+
+        msg = (
+            "Some log entries have no level_value yet and min_level retention policies "
+            "would delete them as INFO. Run logmancer_backfill_levels first."
+        )
+        if not dry_run:
+            raise CommandError(msg)
+        self.stdout.write(self.style.WARNING(f"[Logmancer] {msg}"))
+
+    def drop_partitions(self, threshold_date, dry_run, before_drop=None):
+        """Drop whole partitions older than the threshold instead of deleting their rows"""
+        partitioner = get_partitioner()
+        if partitioner is None or not partitioner.is_partitioned():
+            return []
+
+        if dry_run:
+            dropped = partitioner.expired(threshold_date)
+        else:
+            dropped = partitioner.drop_before(threshold_date, before_drop)
+            partitioner.ensure(get_int("PARTITION_PREMAKE"))
+        for partition in dropped:
+            verb = "would be dropped" if dry_run else "dropped"
+            self.stdout.write(f"[Logmancer] Partition {partition.name} {verb}.")
+        return dropped
+
+    def report_progress(self, label, progress):
+        self.stdout.write(
+            f"[Logmancer] {label}: deleted {progress.deleted} entries ({progress.total} total), "
+            f"resume with --start-pass {shlex.quote(label)} --start-pk {progress.next_pk}"
+        )
@@ -0,0 +1,78 @@
+import json
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from logmancer.conf import get_int
+from logmancer.models import NotificationOutbox
+from logmancer.notifications.dispatcher import STATS_SLOTS, stats_slot_key
+
+
+def process_stats():
+    """Counters published by each process's dispatcher, keyed by host:pid"""
+    published = cache.get_many([stats_slot_key(slot) for slot in range(STATS_SLOTS)])
+    processes = {}
+    for stats in published.values():
+        stats = dict(stats)
+        processes[stats.pop("process")] = stats
+    return processes
+
+
+def outbox_stats():
+    """Depth of the persistent outbox"""
+    now = timezone.now()
+    max_attempts = get_int("NOTIFICATION_OUTBOX_MAX_ATTEMPTS")
+    stats = NotificationOutbox.objects.aggregate(
+        total=Count("pk"),
+        due=Count("pk", filter=Q(next_attempt_at__lte=now, attempts__lt=max_attempts)),
+        retrying=Count("pk", filter=Q(attempts__gt=0, attempts__lt=max_attempts)),
+        dead=Count("pk", filter=Q(attempts__gte=max_attempts)),
+        oldest=Min("created_at", filter=Q(attempts__lt=max_attempts)),
+    )
+    oldest = stats.pop("oldest")
+    stats["oldest_age_s"] = round((now - oldest).total_seconds(), 1) if oldest else None
+    return stats
+
+
+class Command(BaseCommand):
+    help = "Logmancer: Shows notification queue and outbox metrics."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Print the metrics as JSON",
+        )
+
+    def handle(self, *args, **options):
+        processes = process_stats()
+        outbox = outbox_stats()
+
+        if options.get("json"):
+            self.stdout.write(json.dumps({"processes": processes, "outbox": outbox}, indent=2))
+            return
+
+        if not processes:
+            self.stdout.write(
+                "[Logmancer] No dispatcher stats published, they need a shared cache and "
+                "NOTIFICATION_STATS_INTERVAL > 0."
+            )
+        for process, stats in sorted(processes.items()):
+            self.stdout.write(
+                f"[Logmancer] {process}: {stats['enqueued']} enqueued, {stats['sent']} sent, "
+                f"{stats['failed']} failed, {stats.get('skipped', 0)} skipped, "
+                f"{stats['dropped']} dropped, "
+                f"{stats['spilled']} spilled to outbox; {stats['queued']} queued, "
+                f"{stats['in_flight']} in flight (max queued {stats['max_queued']}); "
+                f"latency avg {stats['avg_latency_ms']} ms, max {stats['max_latency_ms']} ms"
+            )
+
+        msg = (
+            f"[Logmancer] Outbox: {outbox['total']} rows, {outbox['due']} due, "
+            f"{outbox['retrying']} retrying, {outbox['dead']} given up"
+        )
+        if outbox["oldest_age_s"] is not None:
+            msg += f", oldest pending {outbox['oldest_age_s']} s"
+        self.stdout.write(msg)
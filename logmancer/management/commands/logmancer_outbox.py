@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from logmancer.conf import get_int
+from logmancer.notifications.outbox import drain_outbox
+
+
+class Command(BaseCommand):
+    help = "Logmancer: Delivers notifications stored in the outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Deliver at most this many notifications per batch",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            help="Give up on a notification after this many attempts",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running and poll the outbox for new notifications",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to wait between polls with --loop",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options.get("batch_size") or get_int("NOTIFICATION_OUTBOX_BATCH_SIZE")
+        max_attempts = options.get("max_attempts") or get_int("NOTIFICATION_OUTBOX_MAX_ATTEMPTS")
+        backoff = get_int("NOTIFICATION_OUTBOX_BACKOFF")
+
+        while True:
+            result = drain_outbox(batch_size, max_attempts, backoff)
+            if any(result):
+                self.stdout.write(
+                    f"[Logmancer] Outbox: {result.done} delivered, {result.retried} to retry, "
+                    f"{result.dead} given up"
+                )
+            if result.done + result.retried + result.dead == batch_size:
+                continue  # A full batch, more may be due
+            if not options.get("loop"):
+                break
+            close_old_connections()
+            time.sleep(options["interval"])
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from logmancer.conf import get_int
+from logmancer.partitions import get_partitioner
+
+
+class Command(BaseCommand):
+    help = "Logmancer: Sets up and maintains time partitions of the log table (PostgreSQL)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--setup",
+            action="store_true",
+            help="Convert the log table into a partitioned table.",
+        )
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            help="Number of upcoming periods to create partitions for.",
+        )
+        parser.add_argument(
+            "--list",
+            action="store_true",
+            help="List existing partitions.",
+        )
+        parser.add_argument("--database", default="default", help="Database alias to use.")
+
+    def handle(self, *args, **options):
+        partitioner = get_partitioner(options["database"])
+        if partitioner is None:
+            raise CommandError(
+                "[Logmancer] Partitioning needs LOGMANCER['PARTITIONING'] set to "
+                "'daily' or 'monthly' and a PostgreSQL database."
+            )
+
+        ahead = options.get("ahead")
+        if ahead is None:
+            ahead = get_int("PARTITION_PREMAKE")
+
+        if options.get("setup"):
+            if partitioner.setup(ahead):
+                self.stdout.write(self.style.SUCCESS("[Logmancer] Log table is now partitioned."))
+            else:
+                self.stdout.write(
+                    self.style.WARNING("[Logmancer] Log table is already partitioned.")
+                )
+        elif not partitioner.is_partitioned():
+            raise CommandError("[Logmancer] Log table is not partitioned, run with --setup first.")
+        else:
+            for name in partitioner.ensure(ahead):
+                self.stdout.write(f"[Logmancer] Created partition {name}")
+
+        if options.get("list"):
+            for partition in partitioner.partitions():
+                bounds = (
+                    "DEFAULT" if partition.is_default else f"{partition.start} - {partition.end}"
+                )
+                self.stdout.write(f"{partition.name}: {bounds}")
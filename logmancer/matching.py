@@ -0,0 +1,107 @@
+import fnmatch
+import logging
+import re
+from typing import Dict, Iterable, Optional, Pattern, Sequence, Set, Tuple
+
+REGEX_PREFIX = "re:"
+GLOB_CHARS = frozenset("*?[")
+
+logger = logging.getLogger("logmancer.matching")
+
+
+def compile_alternation(
+    parts: Sequence[str], flags: int = 0
+) -> Tuple[Tuple[Pattern, Optional[int]], ...]:
+    """
+    Compile regex parts into one alternation with a ``pN`` group per part.
+
+    Parts that are valid alone can still break the joined pattern, e.g. a global
+    inline flag such as ``(?i)`` that is no longer at the start, or a named group
+    used in two parts. The parts are then compiled one by one instead. Returns
+    ``(regex, index)`` pairs, ``index`` is None for the joined alternation.
+    """
+    if not parts:
+        return ()
+    try:
+        joined = "|".join(f"(?P<p{i}>{part})" for i, part in enumerate(parts))
+        return ((re.compile(joined, flags), None),)
+    except re.error:
+        return tuple((re.compile(part, flags), i) for i, part in enumerate(parts))
+
+
+class PathMatcher:
+    """
+    Matches request paths against a list of exclusion patterns.
+
+    Each pattern is one of:
+
+    * a plain prefix, e.g. ``"/static/"``
+    * a glob matched against the whole path, e.g. ``"/api/*/health"``
+    * a regular expression matched from the start of the path, e.g. ``"re:^/v[0-9]+/"``
+
+    Prefixes are indexed by length, so a lookup costs one set probe per distinct
+    prefix length instead of one ``startswith`` per prefix. Globs and regular
+    expressions are compiled into a single alternation where possible.
+    """
+
+    __slots__ = ("patterns", "_prefixes", "_lengths", "_regexes", "_regex_patterns")
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        self.patterns = tuple(p for p in patterns if isinstance(p, str) and p)
+        self._prefixes: Dict[int, Set[str]] = {}
+        regex_parts = []
+        self._regex_patterns = []
+
+        for pattern in self.patterns:
+            if pattern.startswith(REGEX_PREFIX):
+                expression = pattern[len(REGEX_PREFIX) :]
+                try:
+                    re.compile(expression)
+                except re.error as e:
+                    logger.error(f"Ignoring invalid path pattern '{pattern}': {e}")
+                    continue
+                regex_parts.append(expression)
+                self._regex_patterns.append(pattern)
+            elif GLOB_CHARS.intersection(pattern):
+                regex_parts.append(fnmatch.translate(pattern))
+                self._regex_patterns.append(pattern)
+            else:
+                self._prefixes.setdefault(len(pattern), set()).add(pattern)
+
+        self._lengths = tuple(sorted(self._prefixes))
+        self._regexes = compile_alternation(regex_parts)
+
+    def __bool__(self):
+        return bool(self.patterns)
+
+    def __repr__(self):
+        return f"PathMatcher({list(self.patterns)!r})"
+
+    def match(self, path: Optional[str]) -> Optional[str]:
+        """Return the first pattern that matches the path, or None"""
+        if not path:
+            return None
+
+        path_length = len(path)
+        for length in self._lengths:
+            if length > path_length:
+                break
+            prefix = path[:length]
+            if prefix in self._prefixes[length]:
+                return prefix
+
+        for regex, index in self._regexes:
+            found = regex.match(path)
+            if not found:
+                continue
+            if index is not None:
+                return self._regex_patterns[index]
+            for index, pattern in enumerate(self._regex_patterns):
+                if found.group(f"p{index}") is not None:
+                    return pattern
+
+        return None
+
+    def matches(self, path: Optional[str]) -> bool:
+        """Check whether any pattern matches the path"""
+        return self.match(path) is not None
@@ -2,11 +2,16 @@ import contextvars
 import json
 import logging
 import threading
+import time
 import traceback
 
-from logmancer.conf import get_bool, get_list, should_exclude_path
-from logmancer.models import LogEntry
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+from logmancer.conf import get, get_bool, get_int, get_settings, should_exclude_path
+from logmancer.sanitize import TRUNCATED_KEY, Sanitizer
+from logmancer.timing import RequestTiming, capture_queries, elapsed_ms
 from logmancer.utils import LogEvent
+from logmancer.writer import awrite_request_log, write_request_log
 
 logger = logging.getLogger("logmancer.middleware")
 
@@ -16,10 +21,20 @@ _context_user = contextvars.ContextVar("current_user", default=None)
 
 
 class DBLoggingMiddleware:
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(self.get_response)
+        if self.async_mode:
+            # Let Django call us natively under ASGI instead of adapting through a thread
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
         # Sync context
         _thread_user.user = getattr(request, "user", None)
 
@@ -27,8 +42,17 @@ class DBLoggingMiddleware:
         _context_user.set(getattr(request, "user", None))
 
         try:
-            response = self.get_response(request)
-            self.log_request(request, response)
+            start = time.perf_counter()
+            if get("LOG_DB_TIMING"):
+                with capture_queries() as timer:
+                    response = self.get_response(request)
+                timing = RequestTiming(
+                    elapsed_ms(start), timer.count, round(timer.seconds * 1000, 3)
+                )
+            else:
+                response = self.get_response(request)
+                timing = RequestTiming(elapsed_ms(start))
+            self.log_request(request, response, timing)
             return response
         finally:
             _thread_user.user = None
@@ -39,75 +63,165 @@ class DBLoggingMiddleware:
         _thread_user.user = getattr(request, "user", None)
         _context_user.set(getattr(request, "user", None))
 
-        response = await self.get_response(request)
-        self.log_request(request, response)
-
-        _thread_user.user = None
-        _context_user.set(None)
-
-        return response
-
-    def mask_sensitive_data(self, data):
-        if not isinstance(data, (dict, list)):
-            return data
-
-        sensitive_keys = [k.lower() for k in get_list("LOG_SENSITIVE_KEYS")]
-
-        if isinstance(data, list):
-            return [self.mask_sensitive_data(item) for item in data]
-
-        masked = {}
-        for key, value in data.items():
-            if key.lower() in sensitive_keys:
-                masked[key] = "****"
-            elif isinstance(value, (dict, list)):
-                masked[key] = self.mask_sensitive_data(value)
-            else:
-                masked[key] = value
+        try:
+            # Queries run in sync_to_async worker threads here, so only the
+            # wall-clock duration is recorded
+            start = time.perf_counter()
+            response = await self.get_response(request)
+            await self.alog_request(request, response, RequestTiming(elapsed_ms(start)))
+            return response
+        finally:
+            _thread_user.user = None
+            _context_user.set(None)
 
-        return masked
+    def mask_sensitive_data(self, data, sensitive_keys=None):
+        if sensitive_keys is None:
+            return get_settings().masker.sanitize(data)
+        return Sanitizer(sensitive_keys).sanitize(data)
 
     def get_user_from_request(self, request):
         if hasattr(request, "user") and getattr(request.user, "is_authenticated", False):
             return request.user
         return None
 
-    def log_request(self, request, response):
+    async def aget_user_from_request(self, request):
+        if hasattr(request, "auser"):
+            user = await request.auser()
+            return user if getattr(user, "is_authenticated", False) else None
+        # Resolving a lazy request.user may hit the session store
+        return await sync_to_async(self.get_user_from_request)(request)
+
+    def log_request(self, request, response, timing=None):
         if should_exclude_path(request.path):
             return
         try:
+            sample_rate = self.get_sample_rate(request, response, timing)
+            if sample_rate is None:
+                return
             user = self.get_user_from_request(request)
+            write_request_log(**self.build_log_fields(request, response, user, sample_rate, timing))
+        except Exception as e:
+            logger.exception(f"Middleware log error: {e}")
 
-            try:
-                if request.content_type == "application/json":
-                    body_data = json.loads(request.body.decode("utf-8"))
-                else:
-                    body_data = request.POST.dict()
-            except Exception:
-                body_data = {}
+    async def alog_request(self, request, response, timing=None):
+        if should_exclude_path(request.path):
+            return
+        try:
+            sample_rate = self.get_sample_rate(request, response, timing)
+            if sample_rate is None:
+                return
+            user = await self.aget_user_from_request(request)
+            fields = self.build_log_fields(request, response, user, sample_rate, timing)
+            await awrite_request_log(**fields)
+        except Exception as e:
+            logger.exception(f"Middleware log error: {e}")
 
-            meta = {
-                "GET": self.mask_sensitive_data(request.GET.dict()),
-                "POST": self.mask_sensitive_data(body_data),
-                "headers": self.mask_sensitive_data(
-                    {k: v for k, v in request.headers.items() if k.lower() != "authorization"}
-                ),
+    def get_sample_rate(self, request, response, timing=None):
+        """Return the sampling rate for a request worth logging, None to skip it"""
+        conf = get_settings()
+        if conf.slow_requests is not None and not conf.slow_requests.keep(
+            request.path, response.status_code, timing.duration_ms if timing else None
+        ):
+            return None
+        return conf.sampler.sample(request.path, request.method, response.status_code)
+
+    def build_log_fields(self, request, response, user, sample_rate=1.0, timing=None):
+        """Build LogEntry field values for a request without touching the database"""
+        try:
+            body_data, body_size = self.get_request_body(request)
+        except Exception:
+            body_data, body_size = {}, None
+
+        # Masking and size limits are applied in one pass over the whole payload
+        meta = get_settings().sanitizer.sanitize(
+            {
+                "GET": request.GET.dict(),
+                "POST": body_data,
+                "headers": {
+                    k: v for k, v in request.headers.items() if k.lower() != "authorization"
+                },
                 "remote_addr": request.META.get("REMOTE_ADDR"),
             }
+        )
+        if body_size is not None:
+            meta.setdefault(TRUNCATED_KEY, {})["POST"] = f"{body_size} bytes"
 
-            LogEntry.objects.create(
-                level="INFO",
-                message=f"{request.method} {request.path} - {response.status_code}",
-                path=request.path,
-                method=request.method,
-                status_code=response.status_code,
-                user=user,
-                meta=meta,
-                source="middleware",
-                actor_type="user" if user else "system",
-            )
-        except Exception as e:
-            logger.exception(f"Middleware log error: {e}")
+        return {
+            "level": "INFO",
+            "message": f"{request.method} {request.path} - {response.status_code}",
+            "path": request.path,
+            "method": request.method,
+            "status_code": response.status_code,
+            "user": user,
+            "meta": meta,
+            "source": "middleware",
+            "actor_type": "user" if user else "system",
+            "sample_rate": sample_rate,
+            **(timing._asdict() if timing is not None else {}),
+        }
+
+    def should_capture_body(self, request):
+        """Check BODY_CAPTURE_PATHS and BODY_CAPTURE_CONTENT_TYPES for this request"""
+        if not get("LOG_REQUEST_BODY"):
+            return False
+
+        conf = get_settings()
+        if conf.body_capture_paths and not conf.body_capture_paths.matches(request.path):
+            return False
+        content_type = (request.content_type or "").lower()
+        if conf.body_content_types and content_type not in conf.body_content_types:
+            return False
+        return True
+
+    def get_request_body(self, request):
+        """
+        Return the body to log and, if it was cut, its original size in bytes.
+
+        Bodies over BODY_MAX_BYTES are never parsed or loaded whole: JSON and raw bodies
+        are stored as a decoded slice, forms that the view has not parsed yet are skipped.
+        """
+        if not self.should_capture_body(request):
+            return {}, None
+
+        max_bytes = get_int("BODY_MAX_BYTES")
+        raw = get("BODY_FORMAT") == "raw"
+
+        if raw or request.content_type == "application/json":
+            body, size = self.read_body(request, max_bytes)
+            if body is None:
+                return {}, None
+            if size is not None:
+                return body.decode("utf-8", "ignore"), size
+            if raw:
+                return body.decode("utf-8", "replace"), None
+            return json.loads(body), None
+
+        content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+        if max_bytes and content_length > max_bytes and not hasattr(request, "_post"):
+            return {}, content_length
+        return request.POST.dict(), None
+
+    def read_body(self, request, max_bytes):
+        """
+        Return the body, at most ``max_bytes`` of it, and its original size if it was
+        cut. A stream the view has not read is read only up to ``max_bytes + 1`` bytes
+        instead of loading the whole payload into ``request.body``. Returns (None, None)
+        when the view consumed the stream without keeping the body.
+        """
+        if not hasattr(request, "_body"):
+            if getattr(request, "_read_started", False):
+                return None, None
+            if max_bytes:
+                content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+                body = request.read(max_bytes + 1)
+                if len(body) > max_bytes:
+                    return body[:max_bytes], max(content_length, len(body))
+                return body, None
+
+        body = request.body
+        if max_bytes and len(body) > max_bytes:
+            return body[:max_bytes], len(body)
+        return body, None
 
     def process_exception(self, request, exception):
         if not get_bool("AUTO_LOG_EXCEPTIONS"):
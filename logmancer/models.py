@@ -6,52 +6,150 @@ from uuid import UUID
 
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from logmancer.levels import LogLevel
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
 logger = logging.getLogger("logmancer.models")
 
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS
+
+
+def json_default(obj):
+    """Fallback serializer for values the JSON encoders don't support natively"""
+    if isinstance(obj, (dt.datetime, dt.date)):
+        return obj.isoformat()
+    elif isinstance(obj, Decimal):
+        return float(obj)
+    elif isinstance(obj, UUID):
+        return str(obj)
+    return str(obj)
+
+
+class SafeJSONEncoder(json.JSONEncoder):
+    """Encodes log metadata in a single pass, using orjson when it is installed"""
+
+    def default(self, obj):
+        return json_default(obj)
+
+    def encode(self, obj):
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj, default=json_default, option=ORJSON_OPTIONS).decode()
+            except (TypeError, orjson.JSONEncodeError):
+                # e.g. integers beyond 64 bits, let the stdlib encoder decide
+                pass
+        return super().encode(obj)
+
+
+class EncodedJSON(str):
+    """JSON text that has already been encoded"""
+
+
+class EncodedJSONEncoder(json.JSONEncoder):
+    """Passes EncodedJSON through to the database adapter unchanged"""
+
+    def encode(self, obj):
+        if isinstance(obj, EncodedJSON):
+            return str(obj)
+        return super().encode(obj)
+
 
 class SafeJSONField(models.JSONField):
     """JSONField that automatically sanitizes data"""
 
-    def get_prep_value(self, value):
-        """Prepare value for database - sanitize before saving"""
-        if value is None:
-            return value
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("encoder", SafeJSONEncoder)
+        super().__init__(*args, **kwargs)
 
-        value = self.make_json_safe(value)
-        return super().get_prep_value(value)
+    def get_db_prep_value(self, value, connection, prepared=False):
+        """
+        Serialize once with the field's encoder, falling back to {} if encoding fails.
+
+        Encoding happens here rather than in the database adapter, which on PostgreSQL
+        only runs when the query executes and would fail the whole INSERT.
+        """
+        if not prepared:
+            value = self.get_prep_value(value)
+        try:
+            encoded = json.dumps(value, cls=self.encoder)
+        except (TypeError, ValueError, RecursionError) as e:
+            logger.error(f"SafeJSONField encode error: {e}")
+            encoded = "{}"
+        return connection.ops.adapt_json_value(EncodedJSON(encoded), EncodedJSONEncoder)
 
     @staticmethod
     def make_json_safe(data):
         """Convert data to JSON-serializable format"""
-
-        def default_serializer(obj):
-            if isinstance(obj, (dt.datetime, dt.date)):
-                return obj.isoformat()
-            elif isinstance(obj, Decimal):
-                return float(obj)
-            elif isinstance(obj, UUID):
-                return str(obj)
-            elif hasattr(obj, "__dict__"):
-                return str(obj)
-            return str(obj)
-
         try:
-            json_str = json.dumps(data, default=default_serializer)
-            return json.loads(json_str)
+            return json.loads(SafeJSONEncoder().encode(data))
         except Exception as e:
             logger.error(f"make_json_safe error: {e}")
             return {}
 
 
+class LevelValueField(models.PositiveSmallIntegerField):
+    """Numeric severity of the row's level, recomputed whenever the row is written"""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("default", LogLevel.INFO.value.value)
+        kwargs.setdefault("editable", False)
+        super().__init__(*args, **kwargs)
+
+    def pre_save(self, model_instance, add):
+        # Also called by bulk_create, so buffered writes stay in sync
+        value = LogLevel.severity(model_instance.level)
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+class LogEntryQuerySet(models.QuerySet):
+    def min_level(self, level):
+        """Entries at or above the given level, served by the level_value index"""
+        return self.filter(level_value__gte=LogLevel.from_name(level).value.value)
+
+    def stale_level_values(self):
+        """
+        Rows whose level_value was never computed, e.g. written before the column existed
+        and still holding its default. ``logmancer_backfill_levels`` fixes them.
+        """
+        default = LogLevel.INFO.value.value
+        same = models.Q()
+        for level in LogLevel:
+            if level.value.value == default:
+                same |= models.Q(level__iexact=level.value.name)
+        return self.filter(level_value=default).exclude(same)
+
+    def backfill_level_values(self) -> int:
+        """Recompute level_value from level, returns the number of updated rows"""
+        return self.update(
+            level_value=models.Case(
+                *(
+                    models.When(level__iexact=level.value.name, then=level.value.value)
+                    for level in LogLevel
+                ),
+                default=0,
+            )
+        )
+
+    def slowest(self):
+        """Timed requests, slowest first, served by the duration index"""
+        return self.filter(duration_ms__isnull=False).order_by("-duration_ms")
+
+
 class LogEntry(models.Model):
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     level = models.CharField(
         max_length=10, choices=LogLevel.get_choices(), default=LogLevel.INFO.name, db_index=True
     )
+    level_value = LevelValueField(help_text="Numeric severity of the level")
     message = models.TextField(blank=True, null=True)
 
     path = models.CharField(max_length=500, blank=True, null=True)
@@ -83,11 +181,33 @@ class LogEntry(models.Model):
         null=True,
         help_text="Additional metadata for the log entry in JSON format",
     )
+    sample_rate = models.FloatField(
+        default=1.0,
+        help_text="Fraction of matching requests that were logged, for re-weighting counts",
+    )
+    duration_ms = models.FloatField(
+        blank=True, null=True, help_text="Wall-clock request duration in milliseconds"
+    )
+    db_query_count = models.PositiveIntegerField(
+        blank=True, null=True, help_text="Database queries run by the request"
+    )
+    db_time_ms = models.FloatField(
+        blank=True, null=True, help_text="Time spent in database queries in milliseconds"
+    )
+
+    objects = LogEntryQuerySet.as_manager()
 
     class Meta:
         ordering = ["-timestamp"]
         verbose_name = _("Log Entry")
         verbose_name_plural = _("Log Entries")
+        indexes = [
+            models.Index(fields=["timestamp"], name="logmancer_timestamp_idx"),
+            models.Index(fields=["level_value", "timestamp"], name="logmancer_level_ts_idx"),
+            models.Index(fields=["source", "timestamp"], name="logmancer_source_ts_idx"),
+            models.Index(fields=["status_code", "timestamp"], name="logmancer_status_ts_idx"),
+            models.Index(fields=["-duration_ms", "timestamp"], name="logmancer_duration_idx"),
+        ]
 
     def get_level_info(self):
         """Get full level information"""
@@ -103,3 +223,67 @@ class LogEntry(models.Model):
 
     def __str__(self):
         return f"[{self.timestamp:%Y-%m-%d %H:%M:%S}] {self.level}"
+
+
+class LogAggregate(models.Model):
+    """Request counts per path, method, status and level, rolled up before rows expire"""
+
+    PERIOD_CHOICES = [("hour", _("Hour")), ("day", _("Day"))]
+
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES)
+    bucket = models.DateTimeField(help_text="Start of the hour or day, in UTC")
+    path = models.CharField(max_length=500, blank=True, null=True)
+    method = models.CharField(max_length=10, blank=True, null=True)
+    status_code = models.PositiveSmallIntegerField(blank=True, null=True)
+    level = models.CharField(max_length=10, blank=True, null=True)
+
+    count = models.PositiveIntegerField(default=0, help_text="Number of stored rows")
+    error_count = models.PositiveIntegerField(
+        default=0, help_text="Rows with a 5xx status or a level of ERROR and above"
+    )
+    estimated_count = models.FloatField(
+        default=0, help_text="Row count re-weighted by each row's sample_rate"
+    )
+    p50_ms = models.FloatField(blank=True, null=True, help_text="Median request duration")
+    p95_ms = models.FloatField(blank=True, null=True, help_text="95th percentile request duration")
+
+    class Meta:
+        ordering = ["-bucket"]
+        verbose_name = _("Log Aggregate")
+        verbose_name_plural = _("Log Aggregates")
+        indexes = [
+            models.Index(fields=["period", "bucket"], name="logmancer_agg_bucket_idx"),
+            models.Index(fields=["path", "period", "bucket"], name="logmancer_agg_path_idx"),
+        ]
+
+    def __str__(self):
+        return f"[{self.period} {self.bucket:%Y-%m-%d %H:%M}] {self.method} {self.path}"
+
+
+class NotificationOutbox(models.Model):
+    """A notification for one backend, stored with its log entry until it is delivered"""
+
+    log_entry = models.ForeignKey(
+        LogEntry,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+        help_text="Not enforced, so cleanup can keep deleting log entries in bulk",
+    )
+    backend = models.CharField(max_length=50)
+    context = SafeJSONField(blank=True, null=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["id"]
+        verbose_name = _("Notification Outbox")
+        verbose_name_plural = _("Notification Outbox")
+        indexes = [
+            models.Index(fields=["next_attempt_at"], name="logmancer_outbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"[{self.backend}] entry {self.log_entry_id} ({self.attempts} attempts)"
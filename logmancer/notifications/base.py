@@ -1,8 +1,11 @@
+import asyncio
 import logging
 from abc import ABC, abstractmethod
 from typing import Any, Dict, Optional
 
 from logmancer.levels import LogLevel
+from logmancer.matching import PathMatcher
+from logmancer.notifications.digest import Digest, build_digest
 
 logger = logging.getLogger("logmancer.notifications")
 
@@ -10,14 +13,37 @@ logger = logging.getLogger("logmancer.notifications")
 class NotificationBackend(ABC):
     """Base class for all notification backends"""
 
+    name = None
+
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.enabled = config.get("enabled", True)
+        self.excluded_paths = PathMatcher(config.get("excluded_paths", []))
+        self.min_level = LogLevel.lookup(config.get("min_level", "ERROR"))
+        self.max_concurrency = config.get("max_concurrency", 4)
+        self.batch_window = config.get("batch_window", 0)
+        self.batch_max_size = max(1, config.get("batch_max_size", 50))
+        self.digest_top = config.get("digest_top", 5)
         self.logger = logger
+        self._batch = []
+        self._batch_timer = None
+        self._batch_limit = None
+
+        if self.batch_window and type(self).send_digest is NotificationBackend.send_digest:
+            self.logger.warning(
+                f"{self.__class__.__name__} does not implement send_digest, "
+                "batch_window is ignored"
+            )
+            self.batch_window = 0
 
     @abstractmethod
     async def send_notification(self, log_entry, context: Optional[Dict] = None):
-        """Send notification for a log entry"""
+        """
+        Send notification for a log entry.
+
+        Returns False when delivery failed, so the outbox can retry it, and None when
+        the entry was filtered out.
+        """
         raise NotImplementedError
 
     @abstractmethod
@@ -30,9 +56,8 @@ class NotificationBackend(ABC):
         if not self.enabled:
             return False
 
-        min_level_name = self.config.get("min_level", "ERROR")
-
-        if not LogLevel.should_log(log_entry.level, min_level_name):
+        level = LogLevel.lookup(log_entry.level)
+        if level is None or self.min_level is None or level < self.min_level:
             return False
 
         # Check source filter
@@ -44,34 +69,78 @@ class NotificationBackend(ABC):
             return False
 
         # Check path filter
-        excluded_paths = self.config.get("excluded_paths", [])
-        if log_entry.path:
-            for excluded_path in excluded_paths:
-                if log_entry.path.startswith(excluded_path):
-                    self.logger.debug(
-                        f"Path {log_entry.path} matches excluded path: {excluded_path}"
-                    )
-                    return False
+        excluded_path = self.excluded_paths.match(log_entry.path)
+        if excluded_path is not None:
+            self.logger.debug(f"Path {log_entry.path} matches excluded path: {excluded_path}")
+            return False
 
         return True
 
-    def get_level_emoji(self, log_entry) -> str:
+    async def add_to_batch(self, log_entry, limit=None):
+        """
+        Collect an entry for the next digest.
+
+        The first entry of a batch starts a ``batch_window`` second timer, the batch is
+        sent when the timer fires or once ``batch_max_size`` entries are collected.
+        ``limit`` is the semaphore capping this backend's in-flight sends, the batch
+        holds it while it is sent.
+        """
+        if not self.should_send(log_entry):
+            return
+
+        if limit is not None:
+            self._batch_limit = limit
+        self._batch.append(log_entry)
+        if len(self._batch) >= self.batch_max_size:
+            await self.flush_batch()
+        elif self._batch_timer is None:
+            self._batch_timer = asyncio.ensure_future(self._flush_later())
+
+    async def flush_batch(self):
+        """Send the collected entries, a single entry is sent as a regular notification"""
+        timer, self._batch_timer = self._batch_timer, None
+        if timer is not None and timer is not asyncio.current_task():
+            timer.cancel()
+
+        entries, self._batch = self._batch, []
+        if not entries:
+            return
+        if self._batch_limit is None:
+            return await self._send_batch(entries)
+        async with self._batch_limit:
+            return await self._send_batch(entries)
+
+    async def _send_batch(self, entries):
+        if len(entries) == 1:
+            return await self.send_notification(entries[0])
+        return await self.send_digest(build_digest(entries, self.digest_top))
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.batch_window)
         try:
-            return LogLevel.from_name(log_entry.level).emoji
-        except ValueError:
-            return "📝"
+            await self.flush_batch()
+        except Exception as e:
+            self.logger.error(f"Digest notification failed via {self.__class__.__name__}: {e}")
+
+    async def send_digest(self, digest: Digest):
+        """Send one message summarizing a batch of entries"""
+        raise NotImplementedError(f"{self.__class__.__name__} does not support batching")
+
+    def get_suppressed(self, context: Optional[Dict]) -> int:
+        """Repeats of this alert suppressed by deduplication since it was last sent"""
+        return context.get("suppressed", 0) if isinstance(context, dict) else 0
+
+    def get_level_emoji(self, log_entry) -> str:
+        level = LogLevel.lookup(log_entry.level)
+        return level.emoji if level is not None else "📝"
 
     def get_level_color(self, log_entry) -> str:
-        try:
-            return LogLevel.from_name(log_entry.level).color
-        except ValueError:
-            return "#808080"
+        level = LogLevel.lookup(log_entry.level)
+        return level.color if level is not None else "#808080"
 
     def get_slack_color(self, log_entry) -> str:
-        try:
-            return LogLevel.from_name(log_entry.level).slack_color
-        except ValueError:
-            return "danger"
+        level = LogLevel.lookup(log_entry.level)
+        return level.slack_color if level is not None else "danger"
 
     def test_connection(self) -> bool:
         return True
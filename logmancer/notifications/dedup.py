@@ -0,0 +1,69 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+NORMALIZE_PATTERNS = (
+    (re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.I), "<uuid>"),
+    (re.compile(r"0x[0-9a-f]+|\b[0-9a-f]{16,}\b", re.I), "<hex>"),
+    (re.compile(r"'[^']*'|\"[^\"]*\""), "<str>"),
+    (re.compile(r"\d+(\.\d+)?"), "<n>"),
+)
+
+
+def normalize_message(message) -> str:
+    """Replace ids, numbers and quoted values so repeats of one problem compare equal"""
+    message = str(message or "")[:500]
+    for pattern, placeholder in NORMALIZE_PATTERNS:
+        message = pattern.sub(placeholder, message)
+    return message
+
+
+def fingerprint(log_entry) -> str:
+    """Hash of level, normalized message, path and exception type"""
+    meta = getattr(log_entry, "meta", None)
+    exception_type = meta.get("exception_type", "") if isinstance(meta, dict) else ""
+    parts = (
+        log_entry.level or "",
+        normalize_message(log_entry.message),
+        log_entry.path or "",
+        exception_type,
+    )
+    return hashlib.sha1("\x1f".join(parts).encode()).hexdigest()
+
+
+class DedupStore:
+    """
+    Remembers recently notified fingerprints for ``window`` seconds.
+
+    Repeats inside the window are suppressed and counted, the count is returned when
+    the fingerprint is next allowed through. At most ``max_keys`` fingerprints are
+    kept, the least recently seen are evicted first.
+    """
+
+    def __init__(self, window: float, max_keys: int = 10000):
+        self.window = window
+        self.max_keys = max(1, max_keys)
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._seen)
+
+    def check(self, key, now=None) -> Tuple[bool, int]:
+        """Return (send, suppressed repeats since the previous send) for a fingerprint"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            seen = self._seen.get(key)
+            if seen is not None and now - seen[0] < self.window:
+                seen[1] += 1
+                self._seen.move_to_end(key)
+                return False, 0
+
+            self._seen[key] = [now, 0]
+            self._seen.move_to_end(key)
+            while len(self._seen) > self.max_keys:
+                self._seen.popitem(last=False)
+            return True, seen[1] if seen is not None else 0
@@ -0,0 +1,55 @@
+from collections import Counter
+from typing import List, NamedTuple, Optional, Tuple
+
+from logmancer.levels import LogLevel
+
+
+class Digest(NamedTuple):
+    """Summary of a batch of log entries sent as one notification"""
+
+    total: int
+    levels: List[Tuple[str, int]]
+    paths: List[Tuple[str, int]]
+    messages: List[Tuple[str, int]]
+    start: object
+    end: object
+    top_level: Optional[LogLevel]
+
+
+def _severity(name):
+    level = LogLevel.lookup(name)
+    return level.value.value if level is not None else -1
+
+
+def build_digest(entries, top: int = 5) -> Digest:
+    """Count entries by level and path and keep the ``top`` most frequent messages"""
+    levels = Counter(entry.level for entry in entries)
+    paths = Counter(entry.path for entry in entries if entry.path)
+    messages = Counter((entry.message or "")[:200] for entry in entries)
+    timestamps = [entry.timestamp for entry in entries if entry.timestamp is not None]
+
+    ordered_levels = sorted(levels.items(), key=lambda item: -_severity(item[0]))
+    return Digest(
+        total=len(entries),
+        levels=ordered_levels,
+        paths=paths.most_common(top),
+        messages=messages.most_common(top),
+        start=min(timestamps) if timestamps else None,
+        end=max(timestamps) if timestamps else None,
+        top_level=LogLevel.lookup(ordered_levels[0][0]) if ordered_levels else None,
+    )
+
+
+def format_digest(digest: Digest) -> str:
+    """Plain text rendering of a digest"""
+    lines = [f"{digest.total} log entries"]
+    if digest.start is not None:
+        lines[0] += f" between {digest.start:%Y-%m-%d %H:%M:%S} and {digest.end:%H:%M:%S}"
+
+    lines.append("Levels: " + ", ".join(f"{level} x{count}" for level, count in digest.levels))
+    if digest.paths:
+        lines.append("Top paths:")
+        lines.extend(f"  {count}x {path}" for path, count in digest.paths)
+    lines.append("Top messages:")
+    lines.extend(f"  {count}x {message}" for message, count in digest.messages)
+    return "\n".join(lines)
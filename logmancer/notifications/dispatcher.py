@@ -0,0 +1,313 @@
+import asyncio
+import atexit
+import logging
+import os
+import socket
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from threading import Thread
+from typing import NamedTuple
+
+from logmancer.conf import get, get_int
+from logmancer.notifications.manager import notification_manager
+
+logger = logging.getLogger("logmancer.notifications")
+
+OVERFLOW_POLICIES = ("drop_newest", "drop_oldest", "block", "outbox")
+STATS_CACHE_KEY = "logmancer:notification_stats"
+STATS_CACHE_TIMEOUT = 300
+# Processes publish into a fixed set of slots, so readers never need a shared index
+STATS_SLOTS = 64
+
+
+def stats_slot_key(slot: int) -> str:
+    return f"{STATS_CACHE_KEY}:{slot}"
+
+
+class NotificationStats(NamedTuple):
+    """
+    Counters of one dispatcher since the process started. ``skipped`` counts
+    notifications that delivered nothing: filtered out by every backend, suppressed as
+    repeats or only collected for a digest. Latency covers sent and failed ones.
+    """
+
+    enqueued: int
+    dropped: int
+    spilled: int
+    sent: int
+    failed: int
+    skipped: int
+    queued: int
+    in_flight: int
+    max_queued: int
+    avg_latency_ms: float
+    max_latency_ms: float
+
+
+class NotificationDispatcher:
+    """
+    Sends notifications from one long-lived event loop running in a background thread.
+
+    At most ``max_concurrency`` notifications are sent at a time and each backend is
+    further limited to its own ``max_concurrency`` in-flight sends. Once
+    ``max_queue_size`` notifications are queued or being sent, ``overflow`` decides
+    what happens to the next one:
+
+    - ``drop_newest``: drop it
+    - ``drop_oldest``: drop the oldest queued notification to make room
+    - ``block``: wait up to ``block_timeout`` seconds for room, then drop it
+    - ``outbox``: store it in the persistent outbox for ``logmancer_outbox``
+    """
+
+    def __init__(
+        self,
+        max_queue_size=1000,
+        max_concurrency=10,
+        manager=None,
+        overflow="drop_newest",
+        block_timeout=1.0,
+        stats_interval=0,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            logger.error(f"Unknown NOTIFICATION_OVERFLOW_POLICY {overflow!r}, using drop_newest")
+            overflow = "drop_newest"
+
+        self.max_queue_size = max(1, max_queue_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.manager = manager or notification_manager
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.stats_interval = stats_interval
+        self._loop = None
+        self._limits = {}
+        self._tasks = set()
+        self._queue = deque()
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._counters = Counter()
+        self._max_queued = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self._stats_slot = None
+
+    @property
+    def pending(self):
+        """Notifications queued or being sent"""
+        return len(self._queue) + self._in_flight
+
+    def submit(self, log_entry, context=None) -> bool:
+        """Queue a notification for the dispatcher loop, returns False if it was not queued"""
+        with self._cond:
+            if self.pending < self.max_queue_size or self._make_room():
+                self._queue.append((time.perf_counter(), log_entry, context))
+                self._counters["enqueued"] += 1
+                self._max_queued = max(self._max_queued, len(self._queue))
+                if self._loop is None:
+                    self._start_loop()
+                self._loop.call_soon_threadsafe(self._pump)
+                return True
+
+            if self.overflow != "outbox":
+                self._counters["dropped"] += 1
+                logger.error("Notification queue is full, dropping notification")
+                return False
+
+        self._spill(log_entry, context)
+        return False
+
+    def stats(self) -> NotificationStats:
+        """Snapshot of the dispatcher counters"""
+        with self._cond:
+            finished = self._counters["sent"] + self._counters["failed"]
+            return NotificationStats(
+                enqueued=self._counters["enqueued"],
+                dropped=self._counters["dropped"],
+                spilled=self._counters["spilled"],
+                sent=self._counters["sent"],
+                failed=self._counters["failed"],
+                skipped=self._counters["skipped"],
+                queued=len(self._queue),
+                in_flight=self._in_flight,
+                max_queued=self._max_queued,
+                avg_latency_ms=round(self._latency_total / finished, 3) if finished else 0.0,
+                max_latency_ms=round(self._latency_max, 3),
+            )
+
+    def publish_stats(self):
+        """
+        Store the counters in Django's cache, where logmancer_notification_stats reads
+        them. Each process claims one of ``STATS_SLOTS`` keys with ``cache.add``, entries
+        expire after twice the publishing interval so stopped processes free their slot.
+        """
+        from django.core.cache import cache
+
+        process = f"{socket.gethostname()}:{os.getpid()}"
+        value = {"process": process, **self.stats()._asdict()}
+        timeout = 2 * self.stats_interval if self.stats_interval else STATS_CACHE_TIMEOUT
+        try:
+            if self._stats_slot is not None:
+                current = cache.get(stats_slot_key(self._stats_slot))
+                if current is None or current.get("process") == process:
+                    cache.set(stats_slot_key(self._stats_slot), value, timeout)
+                    return
+            for slot in range(STATS_SLOTS):
+                if cache.add(stats_slot_key(slot), value, timeout):
+                    self._stats_slot = slot
+                    return
+            logger.error(f"All {STATS_SLOTS} notification stats slots are taken")
+        except Exception as e:
+            logger.error(f"Publishing notification stats failed: {e}")
+
+    def shutdown(self, timeout=5):
+        """Wait up to ``timeout`` seconds for pending notifications and digests, then stop"""
+        with self._cond:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+
+        try:
+            asyncio.run_coroutine_threadsafe(self._drain(), loop).result(timeout)
+        except FutureTimeoutError:
+            logger.error(f"Stopping notification dispatcher with {self.pending} pending")
+        loop.call_soon_threadsafe(loop.stop)
+        if self.stats_interval:
+            self.publish_stats()
+
+    def limit_for(self, backend):
+        """Semaphore capping in-flight sends of one backend"""
+        limit = self._limits.get(backend)
+        if limit is None:
+            limit = self._limits[backend] = asyncio.Semaphore(
+                max(1, getattr(backend, "max_concurrency", 1))
+            )
+        return limit
+
+    def _make_room(self) -> bool:
+        """Apply the overflow policy to a full queue, called with the lock held"""
+        if self.overflow == "drop_oldest" and self._queue:
+            self._queue.popleft()
+            self._counters["dropped"] += 1
+            logger.error("Notification queue is full, dropping the oldest notification")
+            return True
+        if self.overflow == "block":
+            return self._cond.wait_for(
+                lambda: self.pending < self.max_queue_size, self.block_timeout
+            )
+        return False
+
+    def _spill(self, log_entry, context):
+        """Store an overflowing notification in the persistent outbox"""
+        from logmancer.notifications.outbox import enqueue_notification
+
+        try:
+            enqueue_notification(log_entry, context, self.manager)
+            counter = "spilled"
+        except Exception as e:
+            logger.error(f"Notification queue is full and the outbox write failed: {e}")
+            counter = "dropped"
+
+        with self._cond:
+            self._counters[counter] += 1
+
+    def _pump(self):
+        """Start queued notifications while there are free slots, runs on the loop"""
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            while self._queue and self._in_flight < self.max_concurrency:
+                task = loop.create_task(self._dispatch(*self._queue.popleft()))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+                self._in_flight += 1
+
+    async def _dispatch(self, queued_at, log_entry, context):
+        try:
+            results = await self.manager.send_notifications(
+                log_entry, context, limit_for=self.limit_for
+            )
+            outcome = self._outcome(results)
+        except Exception as e:
+            logger.error(f"Notification dispatch failed: {e}")
+            outcome = "failed"
+
+        latency = (time.perf_counter() - queued_at) * 1000
+        with self._cond:
+            self._in_flight -= 1
+            self._counters[outcome] += 1
+            if outcome != "skipped":
+                self._latency_total += latency
+                self._latency_max = max(self._latency_max, latency)
+            self._cond.notify_all()
+
+        self._pump()
+
+    @staticmethod
+    def _outcome(results) -> str:
+        """Failed if any backend failed, sent if any delivered, skipped otherwise"""
+        results = list(results or ())
+        if any(res is False or isinstance(res, Exception) for res in results):
+            return "failed"
+        if any(res is True for res in results):
+            return "sent"
+        return "skipped"
+
+    def _publish_periodically(self):
+        """
+        Publish the counters every ``stats_interval`` seconds, runs on the loop. A timer
+        rather than finished sends drives it, so drops are still reported while every
+        backend hangs.
+        """
+        loop = asyncio.get_running_loop()
+        loop.run_in_executor(None, self.publish_stats)
+        loop.call_later(self.stats_interval, self._publish_periodically)
+
+    async def _drain(self):
+        while self.pending:
+            await asyncio.sleep(0.05)
+        await self.manager.flush_batches()
+
+    def _start_loop(self):
+        """Start the background thread running the dispatcher loop"""
+        loop = asyncio.new_event_loop()
+        self._limits = {}
+
+        def run():
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_forever()
+            finally:
+                loop.close()
+
+        if self.stats_interval:
+            loop.call_soon(self._publish_periodically)
+        Thread(target=run, daemon=True, name="logmancer_notifier").start()
+        self._loop = loop
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_notification_dispatcher():
+    """Return the process wide NotificationDispatcher, creating it on first use"""
+    global _dispatcher
+
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = NotificationDispatcher(
+                    max_queue_size=get_int("NOTIFICATION_QUEUE_SIZE"),
+                    max_concurrency=get_int("NOTIFICATION_MAX_CONCURRENCY"),
+                    overflow=get("NOTIFICATION_OVERFLOW_POLICY"),
+                    block_timeout=get("NOTIFICATION_BLOCK_TIMEOUT"),
+                    stats_interval=get_int("NOTIFICATION_STATS_INTERVAL"),
+                )
+                atexit.register(_dispatcher.shutdown)
+
+    return _dispatcher
+
+
+def get_notification_stats() -> NotificationStats:
+    """Counters of this process's notification dispatcher"""
+    return get_notification_dispatcher().stats()
@@ -4,6 +4,7 @@ from django.conf import settings
 from django.core.mail import send_mail
 
 from logmancer.notifications import NotificationBackend
+from logmancer.notifications.digest import Digest, format_digest
 
 
 class EmailBackend(NotificationBackend):
@@ -16,12 +17,21 @@ class EmailBackend(NotificationBackend):
             return
 
         subject = f"[{log_entry.level}] {log_entry.message[:50]}..."
-        message = self.format_message(log_entry, context)
+        return await self._send_mail(subject, self.format_message(log_entry, context))
+
+    async def send_digest(self, digest: Digest):
+        """Send a batch summary via email"""
+        level = digest.top_level.name if digest.top_level else "LOG"
+        return await self._send_mail(
+            f"[{level}] Logmancer digest: {digest.total} entries", format_digest(digest)
+        )
+
+    async def _send_mail(self, subject, message) -> bool:
         recipients = self.config.get("to_emails", [])
 
         if not recipients:
             self.logger.error("Email backend requires 'to_emails' in configuration")
-            return
+            return False
 
         def _send():
             send_mail(
@@ -33,6 +43,7 @@ class EmailBackend(NotificationBackend):
             )
 
         await asyncio.to_thread(_send)
+        return True
 
     def format_message(self, log_entry, context=None):
         """Format email message"""
@@ -47,4 +58,8 @@ class EmailBackend(NotificationBackend):
         if log_entry.source:
             message += f"Source: {log_entry.source}\n"
 
+        suppressed = self.get_suppressed(context)
+        if suppressed:
+            message += f"Repeats: {suppressed} suppressed since the last alert\n"
+
         return message
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import weakref
+from typing import Any, Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from logmancer.notifications.base import NotificationBackend
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def build_session(pool_size: int = 4, retries: int = 2, backoff: float = 0.5) -> requests.Session:
+    """
+    Create a keep-alive session whose pool holds up to ``pool_size`` connections per host.
+
+    Connection errors and 429/5xx responses are retried with exponential backoff,
+    honouring ``Retry-After``. Read timeouts are not retried, the request may already
+    have been delivered.
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=0,
+        status=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "POST"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class HTTPNotificationBackend(NotificationBackend):
+    """Base class for backends that post to an HTTP API through a pooled session"""
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.timeout = config.get("timeout", 10)
+        self.pool_size = config.get("pool_size", 4)
+        self.retries = config.get("retries", 2)
+        self.backoff = config.get("retry_backoff", 0.5)
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._async_clients = weakref.WeakKeyDictionary()
+
+        self.async_client = bool(config.get("async_client", False))
+        if self.async_client and httpx is None:
+            self.logger.error(
+                "Backend 'async_client' requires httpx (pip install django-logmancer[httpx]), "
+                "falling back to requests"
+            )
+            self.async_client = False
+
+    @property
+    def session(self) -> requests.Session:
+        """The backend's session, created on first use and shared by all sender threads"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = build_session(self.pool_size, self.retries, self.backoff)
+        return self._session
+
+    def get_async_client(self):
+        """httpx client of the running event loop, a client cannot be shared across loops"""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            limits = httpx.Limits(
+                max_connections=self.pool_size, max_keepalive_connections=self.pool_size
+            )
+            client = self._async_clients[loop] = httpx.AsyncClient(
+                limits=limits,
+                timeout=self.timeout,
+                transport=httpx.AsyncHTTPTransport(limits=limits, retries=self.retries),
+            )
+        return client
+
+    async def post(self, url, payload):
+        """POST JSON without blocking the event loop"""
+        if self.async_client:
+            return await self.get_async_client().post(url, json=payload)
+        return await asyncio.to_thread(self.session.post, url, json=payload, timeout=self.timeout)
+
+    def close(self):
+        """Close pooled connections, a later send opens a new session"""
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
@@ -4,6 +4,9 @@ from enum import Enum
 from importlib import import_module
 from typing import Any, Dict, List
 
+from logmancer.notifications.base import NotificationBackend
+from logmancer.notifications.dedup import DedupStore, fingerprint
+
 logger = logging.getLogger("logmancer.notifications")
 
 
@@ -16,13 +19,15 @@ class Backends(Enum):
 class NotificationManager:
     """Manages all notification backends"""
 
+    dedup = None
+
     def __init__(self):
         self.backends: List = []
         self._load_backends()
 
     def _load_backends(self):
         """Load notification backends from settings"""
-        from logmancer.conf import get_bool, get_dict
+        from logmancer.conf import get_bool, get_dict, get_int
 
         enabled = get_bool("ENABLE_NOTIFICATIONS")
 
@@ -30,6 +35,10 @@ class NotificationManager:
             logger.info("Notifications disabled")
             return
 
+        window = get_int("NOTIFICATION_DEDUP_WINDOW")
+        if window > 0:
+            self.dedup = DedupStore(window, get_int("NOTIFICATION_DEDUP_MAX_KEYS"))
+
         notifications_config = get_dict("NOTIFICATIONS")
 
         for backend_name, config in notifications_config.items():
@@ -55,22 +64,76 @@ class NotificationManager:
             backend_class = getattr(module, class_name)
 
             backend = backend_class(config)
+            backend.name = backend_name.lower()
             self.backends.append(backend)
 
         except (ImportError, AttributeError, ValueError) as e:
             logger.error(f"Failed to load notification backend '{backend_name}': {e}")
 
-    async def send_notifications(self, log_entry, context: Dict = None):
-        """Send notifications to all configured backends"""
+    async def send_notifications(self, log_entry, context: Dict = None, limit_for=None):
+        """
+        Send notifications to all configured backends.
+
+        ``limit_for`` optionally maps a backend to a semaphore held while sending to it.
+        Returns each backend's result or exception, or None when nothing was sent.
+        """
         if not self.backends:
-            return
+            return None
+
+        send, context = self.deduplicate(log_entry, context)
+        if not send:
+            return None
 
-        coros = [backend.send_notification(log_entry, context) for backend in self.backends]
+        coros = [
+            self._send_one(backend, log_entry, context, limit_for) for backend in self.backends
+        ]
         # Run concurrently and swallow individual errors
         results = await asyncio.gather(*coros, return_exceptions=True)
         for backend, res in zip(self.backends, results):
             if isinstance(res, Exception):
                 logger.error(f"Notification failed via {backend.__class__.__name__}: {res}")
+        return results
+
+    def deduplicate(self, log_entry, context: Dict = None):
+        """Return (send, context), adding the suppressed repeat count to the context"""
+        if self.dedup is None:
+            return True, context
+
+        send, suppressed = self.dedup.check(fingerprint(log_entry))
+        if not send:
+            logger.debug(f"Suppressed repeated notification: {(log_entry.message or '')[:100]}")
+        elif suppressed:
+            context = {**(context or {}), "suppressed": suppressed}
+        return send, context
+
+    def get_backend(self, name):
+        """Loaded backend by its NOTIFICATIONS key"""
+        for backend in self.backends:
+            if backend.name == name:
+                return backend
+        return None
+
+    async def _send_one(self, backend, log_entry, context, limit_for):
+        if isinstance(backend, NotificationBackend) and backend.batch_window:
+            # Batched entries are sent later as one digest
+            return await backend.add_to_batch(
+                log_entry, limit_for(backend) if limit_for is not None else None
+            )
+        if limit_for is None:
+            return await backend.send_notification(log_entry, context)
+        async with limit_for(backend):
+            return await backend.send_notification(log_entry, context)
+
+    async def flush_batches(self):
+        """Send every pending digest now"""
+        for backend in self.backends:
+            if isinstance(backend, NotificationBackend) and backend.batch_window:
+                try:
+                    await backend.flush_batch()
+                except Exception as e:
+                    logger.error(
+                        f"Digest notification failed via {backend.__class__.__name__}: {e}"
+                    )
 
     def list_available_backends(self):
         """List all available backend types"""
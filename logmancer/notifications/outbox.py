@@ -0,0 +1,150 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from typing import NamedTuple
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from logmancer.models import LogEntry, NotificationOutbox
+from logmancer.notifications.base import NotificationBackend
+from logmancer.notifications.digest import build_digest
+from logmancer.notifications.manager import notification_manager
+
+logger = logging.getLogger("logmancer.notifications")
+
+# Context keys that are never stored, meta may hold unmasked values
+UNSTORED_CONTEXT_KEYS = ("meta", "user")
+
+
+class DrainResult(NamedTuple):
+    """Outcome of one drained batch, ``done`` also counts rows that can no longer be sent"""
+
+    done: int
+    retried: int
+    dead: int
+
+
+def enqueue_notification(log_entry, context=None, manager=None) -> int:
+    """
+    Store one outbox row per loaded backend, call it in the transaction that saves
+    ``log_entry``. Returns the number of rows written.
+    """
+    manager = manager or notification_manager
+    send, context = manager.deduplicate(log_entry, context)
+    if not send or not manager.backends:
+        return 0
+
+    context = {k: v for k, v in (context or {}).items() if k not in UNSTORED_CONTEXT_KEYS}
+    rows = [
+        NotificationOutbox(log_entry=log_entry, backend=backend.name, context=context)
+        for backend in manager.backends
+    ]
+    NotificationOutbox.objects.bulk_create(rows)
+    return len(rows)
+
+
+def claim(batch_size: int, max_attempts: int, lease: timedelta, now):
+    """
+    Lock due rows, count the attempt and hide them for ``lease`` so concurrent workers
+    skip them. A worker that crashes mid-send leaves them to be retried after the lease.
+    """
+    with transaction.atomic():
+        rows = list(
+            NotificationOutbox.objects.select_for_update(skip_locked=True)
+            .filter(next_attempt_at__lte=now, attempts__lt=max_attempts)
+            .order_by("pk")[:batch_size]
+        )
+        if rows:
+            NotificationOutbox.objects.filter(pk__in=[row.pk for row in rows]).update(
+                attempts=F("attempts") + 1, next_attempt_at=now + lease
+            )
+
+    for row in rows:
+        row.attempts += 1
+    return rows
+
+
+async def _deliver_backend(backend, items):
+    """Send one backend's rows, returns [(row, error or None)]"""
+    if isinstance(backend, NotificationBackend) and backend.batch_window and len(items) > 1:
+        entries = [entry for _, entry in items if backend.should_send(entry)]
+        error = None
+        try:
+            if entries:
+                result = await backend.send_digest(build_digest(entries, backend.digest_top))
+                error = "delivery failed" if result is False else None
+        except Exception as e:
+            error = str(e)
+        return [(row, error) for row, _ in items]
+
+    outcomes = []
+    for row, entry in items:
+        try:
+            result = await backend.send_notification(entry, row.context)
+            outcomes.append((row, "delivery failed" if result is False else None))
+        except Exception as e:
+            outcomes.append((row, str(e)))
+    return outcomes
+
+
+async def _deliver(groups):
+    results = await asyncio.gather(
+        *(_deliver_backend(backend, items) for backend, items in groups.items())
+    )
+    return [outcome for outcomes in results for outcome in outcomes]
+
+
+def drain_outbox(
+    batch_size: int = 100,
+    max_attempts: int = 5,
+    backoff: float = 30,
+    lease: float = 300,
+    manager=None,
+) -> DrainResult:
+    """
+    Deliver one batch of due outbox rows.
+
+    Delivered rows are deleted. Failed rows are retried after ``backoff`` seconds,
+    doubling with each attempt, and are kept with their last error once they reach
+    ``max_attempts``. Rows of backends that batch are sent as one digest per backend.
+    """
+    manager = manager or notification_manager
+    now = timezone.now()
+    rows = claim(batch_size, max_attempts, timedelta(seconds=lease), now)
+    if not rows:
+        return DrainResult(0, 0, 0)
+
+    entries = LogEntry.objects.in_bulk({row.log_entry_id for row in rows})
+    groups = defaultdict(list)
+    done = []
+    for row in rows:
+        backend = manager.get_backend(row.backend)
+        entry = entries.get(row.log_entry_id)
+        if backend is None or entry is None:
+            # The backend was removed from settings or cleanup deleted the entry
+            done.append(row.pk)
+        else:
+            groups[backend].append((row, entry))
+
+    failed = []
+    for row, error in asyncio.run(_deliver(groups)):
+        if error is None:
+            done.append(row.pk)
+        else:
+            row.last_error = error
+            row.next_attempt_at = now + timedelta(seconds=backoff * 2 ** (row.attempts - 1))
+            failed.append(row)
+
+    NotificationOutbox.objects.filter(pk__in=done).delete()
+    NotificationOutbox.objects.bulk_update(failed, ["last_error", "next_attempt_at"])
+
+    dead = [row for row in failed if row.attempts >= max_attempts]
+    for row in dead:
+        logger.error(
+            f"Giving up on {row.backend} notification for entry {row.log_entry_id} "
+            f"after {row.attempts} attempts: {row.last_error}"
+        )
+    return DrainResult(len(done), len(failed) - len(dead), len(dead))
@@ -1,21 +1,18 @@
-import asyncio
 import logging
 from typing import Any, Dict, Optional
 
-import requests
-
-from logmancer.notifications.base import NotificationBackend
+from logmancer.notifications.digest import Digest
+from logmancer.notifications.http import HTTPNotificationBackend
 
 logger = logging.getLogger("logmancer.notifications")
 
 
-class SlackBackend(NotificationBackend):
+class SlackBackend(HTTPNotificationBackend):
     """Slack notification backend"""
 
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self.webhook_url = config.get("webhook_url")
-        self.timeout = config.get("timeout", 10)
 
         if not self.webhook_url:
             raise ValueError("Slack backend requires 'webhook_url'")
@@ -25,17 +22,22 @@ class SlackBackend(NotificationBackend):
         if not self.should_send(log_entry):
             return
 
-        payload = self.format_message(log_entry, context)
+        return await self._send(self.format_message(log_entry, context))
 
-        def _send():
-            return requests.post(self.webhook_url, json=payload, timeout=self.timeout)
+    async def send_digest(self, digest: Digest):
+        """Send a batch summary via Slack"""
+        return await self._send(self.format_digest(digest))
 
+    async def _send(self, payload) -> bool:
         try:
-            response = await asyncio.to_thread(_send)
+            response = await self.post(self.webhook_url, payload)
             if response.status_code != 200:
                 logger.error(f"Slack notification failed with status {response.status_code}")
+                return False
         except Exception as e:
             logger.error(f"Slack notification error: {e}")
+            return False
+        return True
 
     def format_message(self, log_entry, context: Optional[Dict] = None) -> Dict:
         """Format message for Slack"""
@@ -59,4 +61,29 @@ class SlackBackend(NotificationBackend):
                 {"title": "User", "value": str(log_entry.user), "short": True}
             )
 
+        suppressed = self.get_suppressed(context)
+        if suppressed:
+            attachment["fields"].append(
+                {"title": "Repeats", "value": f"{suppressed} suppressed", "short": True}
+            )
+
         return {"text": f"Logmancer Alert: {log_entry.level}", "attachments": [attachment]}
+
+    def format_digest(self, digest: Digest) -> Dict:
+        """Format a batch summary for Slack"""
+        fields = [{"title": "Levels", "value": ", ".join(f"{lv} x{n}" for lv, n in digest.levels)}]
+        if digest.paths:
+            paths = "\n".join(f"{n}x {path}" for path, n in digest.paths)
+            fields.append({"title": "Top paths", "value": paths})
+        messages = "\n".join(f"{n}x {message[:100]}" for message, n in digest.messages)
+        fields.append({"title": "Top messages", "value": messages})
+
+        attachment = {
+            "color": digest.top_level.slack_color if digest.top_level else "danger",
+            "title": f"{digest.total} log entries",
+            "fields": fields,
+        }
+        if digest.end is not None:
+            attachment["ts"] = digest.end.timestamp()
+
+        return {"text": f"Logmancer Digest: {digest.total} alerts", "attachments": [attachment]}
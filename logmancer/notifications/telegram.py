@@ -1,22 +1,22 @@
-import asyncio
 import logging
+from html import escape
 from typing import Any, Dict, Optional
 
 import requests
 
-from logmancer.notifications.base import NotificationBackend
+from logmancer.notifications.digest import Digest
+from logmancer.notifications.http import HTTPNotificationBackend
 
 logger = logging.getLogger("logmancer.notifications")
 
 
-class TelegramBackend(NotificationBackend):
-    """Telegram notification backend using requests"""
+class TelegramBackend(HTTPNotificationBackend):
+    """Telegram notification backend using a pooled requests session"""
 
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self.bot_token = config.get("bot_token")
         self.chat_id = config.get("chat_id")
-        self.timeout = config.get("timeout", 10)
 
         if not self.bot_token or not self.chat_id:
             raise ValueError("Telegram backend requires 'bot_token' and 'chat_id'")
@@ -27,8 +27,13 @@ class TelegramBackend(NotificationBackend):
             logger.debug(f"Skipping notification for level {log_entry.level}")
             return
 
-        message = self.format_message(log_entry, context)
+        return await self._send(self.format_message(log_entry, context))
 
+    async def send_digest(self, digest: Digest):
+        """Send a batch summary via Telegram"""
+        return await self._send(self.format_digest(digest))
+
+    async def _send(self, message) -> bool:
         url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
         payload = {
             "chat_id": self.chat_id,
@@ -37,15 +42,18 @@ class TelegramBackend(NotificationBackend):
             "disable_web_page_preview": True,
         }
 
-        def _send():
-            return requests.post(url, json=payload, timeout=self.timeout)
-
         try:
-            await asyncio.to_thread(_send)
+            response = await self.post(url, payload)
+            if response.status_code != 200:
+                logger.error(f"Telegram notification failed with status {response.status_code}")
+                return False
         except requests.exceptions.RequestException as e:
             logger.error(f"Telegram notification failed: {e}")
+            return False
         except Exception as e:
             logger.error(f"Telegram notification error: {e}")
+            return False
+        return True
 
     def format_message(self, log_entry, context: Optional[Dict] = None) -> str:
         """Format message for Telegram"""
@@ -68,13 +76,35 @@ class TelegramBackend(NotificationBackend):
         if log_entry.source:
             message += f"<b>Source:</b> {log_entry.source}\n"
 
+        suppressed = self.get_suppressed(context)
+        if suppressed:
+            message += f"<b>Repeats:</b> {suppressed} suppressed\n"
+
         return message[:4000]  # Telegram message limit
 
+    def format_digest(self, digest: Digest) -> str:
+        """Format a batch summary for Telegram"""
+        emoji = digest.top_level.emoji if digest.top_level else "📝"
+
+        message = f"{emoji} <b>{digest.total} log entries</b>\n"
+        if digest.start is not None:
+            message += f"<b>Time:</b> {digest.start:%Y-%m-%d %H:%M:%S} - {digest.end:%H:%M:%S}\n"
+        message += "<b>Levels:</b> " + ", ".join(f"{lv} x{n}" for lv, n in digest.levels) + "\n"
+
+        if digest.paths:
+            message += "<b>Top paths:</b>\n"
+            message += "".join(f"{n}x {escape(path)}\n" for path, n in digest.paths)
+
+        message += "<b>Top messages:</b>\n"
+        message += "".join(f"{n}x {escape(text[:200])}\n" for text, n in digest.messages)
+
+        return message[:4000]
+
     def test_connection(self) -> bool:
         """Test Telegram bot connection"""
         try:
             url = f"https://api.telegram.org/bot{self.bot_token}/getMe"
-            response = requests.get(url, timeout=5)
+            response = self.session.get(url, timeout=5)
             return response.status_code == 200
         except Exception as e:
             logger.error(f"Telegram connection test failed: {e}")
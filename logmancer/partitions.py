@@ -0,0 +1,318 @@
+import logging
+import re
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from typing import List, NamedTuple, Optional
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from logmancer.conf import get
+from logmancer.models import LogEntry
+
+PERIODS = ("daily", "monthly")
+LEGACY_SUFFIX = "_legacy"
+DEFAULT_SUFFIX = "_default"
+RANGE_CHECK_SUFFIX = "_range_check"
+UNIQUE_SUFFIX = "_id_ts_uniq"
+
+BOUND_RE = re.compile(r"FROM \((?P<start>[^)]*)\) TO \((?P<end>[^)]*)\)")
+
+logger = logging.getLogger("logmancer.partitions")
+
+
+class Partition(NamedTuple):
+    """A LogEntry partition, ``start`` is None for MINVALUE and both are None for DEFAULT"""
+
+    name: str
+    start: Optional[datetime]
+    end: Optional[datetime]
+
+    @property
+    def is_default(self):
+        return self.start is None and self.end is None
+
+
+def period_start(period: str, moment: datetime) -> datetime:
+    """Truncate a moment to the start of its daily or monthly period, in UTC"""
+    moment = moment.astimezone(dt_timezone.utc)
+    start = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return start.replace(day=1) if period == "monthly" else start
+
+
+def next_period(period: str, start: datetime) -> datetime:
+    if period == "monthly":
+        return (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def partition_name(table: str, period: str, start: datetime) -> str:
+    return f"{table}_p{start:%Y%m}" if period == "monthly" else f"{table}_p{start:%Y%m%d}"
+
+
+def parse_bound(value: str) -> Optional[datetime]:
+    """Parse one side of a range partition bound as returned by pg_get_expr"""
+    value = value.strip()
+    if value.upper() == "MINVALUE":
+        return None
+    return parse_datetime(value.strip("'"))
+
+
+def parse_partition(name: str, expression: str) -> Partition:
+    found = BOUND_RE.search(expression or "")
+    if not found:
+        return Partition(name, None, None)
+    return Partition(name, parse_bound(found.group("start")), parse_bound(found.group("end")))
+
+
+class PostgresPartitioner:
+    """
+    Manages declarative range partitions of the LogEntry table on PostgreSQL.
+
+    ``setup`` converts the existing table into a partitioned one: the old table is
+    renamed and attached as the first partition, covering everything up to the end of
+    the next period, so no rows are copied. ``ensure`` creates partitions for the
+    upcoming periods and ``drop_before`` drops partitions that only hold rows older
+    than a threshold, which takes constant time regardless of their size.
+    """
+
+    def __init__(self, connection, period: str):
+        self.connection = connection
+        self.period = period
+        self.table = LogEntry._meta.db_table
+        self.qn = connection.ops.quote_name
+
+    def _execute(self, sql, params=None):
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall() if cursor.description else None
+
+    def _literal(self, moment: datetime) -> str:
+        return f"'{moment.astimezone(dt_timezone.utc).isoformat()}'"
+
+    def is_partitioned(self) -> bool:
+        rows = self._execute(
+            "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [self.table]
+        )
+        return bool(rows) and rows[0][0] == "p"
+
+    def partitions(self) -> List[Partition]:
+        rows = self._execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = to_regclass(%s) "
+            "ORDER BY c.relname",
+            [self.table],
+        )
+        return [parse_partition(name, expression) for name, expression in rows or []]
+
+    def prepare_sql(self, legacy_end: datetime) -> List[str]:
+        """
+        Statements run before ``setup_sql``, each in its own transaction.
+
+        They do the work that scales with the table size without blocking writes: the
+        range check is validated under a SHARE UPDATE EXCLUSIVE lock, so ATTACH
+        PARTITION does not scan the table, and the (id, timestamp) unique index the
+        partitioned primary key needs is built concurrently.
+        """
+        qn = self.qn
+        table = qn(self.table)
+        check, unique = qn(self.table + RANGE_CHECK_SUFFIX), qn(self.table + UNIQUE_SUFFIX)
+        pk = qn(LogEntry._meta.pk.column)
+        ts = qn(LogEntry._meta.get_field("timestamp").column)
+        return [
+            f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {check}",
+            f"ALTER TABLE {table} ADD CONSTRAINT {check} "
+            f"CHECK ({ts} < {self._literal(legacy_end)}) NOT VALID",
+            f"ALTER TABLE {table} VALIDATE CONSTRAINT {check}",
+            # An interrupted concurrent build leaves an invalid index behind
+            f"DROP INDEX CONCURRENTLY IF EXISTS {unique}",
+            f"CREATE UNIQUE INDEX CONCURRENTLY {unique} ON {table} ({pk}, {ts})",
+        ]
+
+    def setup_sql(self, legacy_end: datetime) -> List[str]:
+        """
+        Statements converting the LogEntry table into a partitioned table, run in one
+        transaction after ``prepare_sql``. They only change the catalog.
+        """
+        meta = LogEntry._meta
+        qn = self.qn
+        table, legacy = qn(self.table), qn(self.table + LEGACY_SUFFIX)
+        sequence = self.table + "_pid_seq"
+        pk, ts = qn(meta.pk.column), qn(meta.get_field("timestamp").column)
+
+        statements = [
+            f"ALTER TABLE {table} RENAME TO {legacy}",
+            f"ALTER TABLE {legacy} ALTER COLUMN {pk} DROP IDENTITY IF EXISTS",
+            f"ALTER TABLE {legacy} ALTER COLUMN {pk} DROP DEFAULT",
+            f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING STORAGE) "
+            f"PARTITION BY RANGE ({ts})",
+            f"CREATE SEQUENCE {qn(sequence)} OWNED BY {table}.{pk}",
+            f"ALTER TABLE {table} ALTER COLUMN {pk} SET DEFAULT nextval('{sequence}')",
+            f"SELECT setval('{sequence}', "
+            f"COALESCE((SELECT MAX({pk}) FROM {legacy}), 0) + 1, false)",
+            f"ALTER TABLE {table} ADD PRIMARY KEY ({pk}, {ts})",
+        ]
+
+        # The primary key has to include the partition key; other constraints and
+        # indexes are recreated on the parent and matched to the legacy ones on attach
+        for field in meta.concrete_fields:
+            if field.remote_field and field.db_constraint:
+                target = field.target_field
+                statements.append(
+                    f"ALTER TABLE {table} ADD CONSTRAINT {qn(f'{self.table}_{field.column}_p_fk')} "
+                    f"FOREIGN KEY ({qn(field.column)}) "
+                    f"REFERENCES {qn(target.model._meta.db_table)} ({qn(target.column)}) "
+                    "DEFERRABLE INITIALLY DEFERRED"
+                )
+            if field.db_index and not field.primary_key:
+                statements.append(
+                    f"CREATE INDEX {qn(f'{self.table}_{field.column}_p_idx')} "
+                    f"ON {table} ({qn(field.column)})"
+                )
+        for index in meta.indexes:
+            columns = ", ".join(
+                f"{qn(meta.get_field(name).column)} {order}".strip()
+                for name, order in index.fields_orders
+            )
+            statements.append(f"CREATE INDEX {qn(index.name + '_p')} ON {table} ({columns})")
+
+        unique = qn(self.table + UNIQUE_SUFFIX)
+        statements += [
+            # Matches the parent's primary key, so attaching builds no index
+            f"ALTER TABLE {legacy} ADD CONSTRAINT {unique} UNIQUE USING INDEX {unique}",
+            f"ALTER TABLE {table} ATTACH PARTITION {legacy} "
+            f"FOR VALUES FROM (MINVALUE) TO ({self._literal(legacy_end)})",
+            f"ALTER TABLE {legacy} DROP CONSTRAINT {qn(self.table + RANGE_CHECK_SUFFIX)}",
+            f"CREATE TABLE {qn(self.table + DEFAULT_SUFFIX)} PARTITION OF {table} DEFAULT",
+        ]
+        return statements
+
+    def setup(self, ahead: int = 0) -> bool:
+        """Convert the table, returns False if it is already partitioned"""
+        if self.is_partitioned():
+            return False
+
+        rows = self._execute(
+            f"SELECT MAX({self.qn(LogEntry._meta.get_field('timestamp').column)}) "
+            f"FROM {self.qn(self.table)}"
+        )
+        now = timezone.now()
+        latest = max((rows[0][0] if rows else None) or now, now)
+        # One period of headroom keeps rows written during the setup inside the range
+        legacy_end = next_period(
+            self.period, next_period(self.period, period_start(self.period, latest))
+        )
+
+        for sql in self.prepare_sql(legacy_end):
+            self._execute(sql)
+        with transaction.atomic(using=self.connection.alias):
+            for sql in self.setup_sql(legacy_end):
+                self._execute(sql)
+
+        self.ensure(ahead)
+        return True
+
+    def ensure(self, ahead: int, now: Optional[datetime] = None) -> List[str]:
+        """
+        Create partitions for the current period and ``ahead`` upcoming ones.
+
+        Rows of a new range that already landed in the default partition would make
+        the CREATE fail, they are moved into the new partition instead.
+        """
+        partitions = self.partitions()
+        existing = [p for p in partitions if not p.is_default]
+        default = next((p for p in partitions if p.is_default), None)
+        start = period_start(self.period, now or timezone.now())
+        created = []
+
+        for _ in range(ahead + 1):
+            end = next_period(self.period, start)
+            overlaps = any(
+                (p.start is None or p.start < end) and (p.end is None or p.end > start)
+                for p in existing
+            )
+            if not overlaps:
+                name = partition_name(self.table, self.period, start)
+                try:
+                    with transaction.atomic(using=self.connection.alias):
+                        if default is not None and self._has_rows(default, start, end):
+                            statements = self.move_sql(name, default, start, end)
+                        else:
+                            statements = [
+                                f"CREATE TABLE IF NOT EXISTS {self.qn(name)} PARTITION OF "
+                                f"{self.qn(self.table)} FOR VALUES FROM "
+                                f"({self._literal(start)}) TO ({self._literal(end)})"
+                            ]
+                        for sql in statements:
+                            self._execute(sql)
+                    created.append(name)
+                except Exception as e:
+                    logger.error(f"Could not create partition {name}: {e}")
+            start = end
+
+        return created
+
+    def _has_rows(self, partition: Partition, start: datetime, end: datetime) -> bool:
+        ts = self.qn(LogEntry._meta.get_field("timestamp").column)
+        return bool(
+            self._execute(
+                f"SELECT 1 FROM {self.qn(partition.name)} WHERE {ts} >= %s AND {ts} < %s LIMIT 1",
+                [start, end],
+            )
+        )
+
+    def move_sql(self, name: str, default: Partition, start: datetime, end: datetime):
+        """Statements creating a partition from the rows the default partition holds for it"""
+        qn = self.qn
+        table, partition = qn(self.table), qn(name)
+        ts = qn(LogEntry._meta.get_field("timestamp").column)
+        bounds = f"{ts} >= {self._literal(start)} AND {ts} < {self._literal(end)}"
+        return [
+            f"CREATE TABLE {partition} (LIKE {table} INCLUDING DEFAULTS INCLUDING STORAGE)",
+            f"WITH moved AS (DELETE FROM {qn(default.name)} WHERE {bounds} RETURNING *) "
+            f"INSERT INTO {partition} SELECT * FROM moved",
+            f"ALTER TABLE {table} ATTACH PARTITION {partition} "
+            f"FOR VALUES FROM ({self._literal(start)}) TO ({self._literal(end)})",
+        ]
+
+    def expired(self, threshold: datetime) -> List[Partition]:
+        """Partitions whose rows are all older than the threshold"""
+        return [p for p in self.partitions() if p.end is not None and p.end <= threshold]
+
+    def drop_before(self, threshold: datetime, before_drop=None) -> List[Partition]:
+        """
+        Drop every partition that only holds rows older than the threshold.
+
+        ``before_drop`` is called with each partition's rows as a queryset in the
+        transaction that drops it.
+        """
+        dropped = []
+        for partition in self.expired(threshold):
+            with transaction.atomic(using=self.connection.alias):
+                if before_drop is not None:
+                    rows = LogEntry.objects.using(self.connection.alias).filter(
+                        timestamp__lt=partition.end
+                    )
+                    if partition.start is not None:
+                        rows = rows.filter(timestamp__gte=partition.start)
+                    before_drop(rows)
+                self._execute(f"DROP TABLE {self.qn(partition.name)}")
+            dropped.append(partition)
+        return dropped
+
+
+def get_partitioner(using: str = DEFAULT_DB_ALIAS) -> Optional[PostgresPartitioner]:
+    """
+    Return a partitioner when PARTITIONING is enabled and the database supports it.
+
+    Other backends return None, and cleanup falls back to deleting rows.
+    """
+    period = get("PARTITIONING")
+    if period not in PERIODS:
+        return None
+
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return None
+    return PostgresPartitioner(connection, period)
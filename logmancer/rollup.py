@@ -0,0 +1,168 @@
+import math
+from datetime import timezone as dt_timezone
+from typing import Iterable
+
+from django.db import connections
+from django.db.models import Aggregate, Count, F, FloatField, Q, Sum, Value
+from django.db.models.functions import Trunc
+
+from logmancer.levels import LogLevel
+from logmancer.models import LogAggregate
+
+PERIODS = ("hour", "day")
+GROUP_FIELDS = ("path", "method", "status_code", "level")
+STREAM_CHUNK_SIZE = 2000
+
+
+class PercentileDisc(Aggregate):
+    """PostgreSQL's nearest-rank percentile, computed by the database"""
+
+    function = "PERCENTILE_DISC"
+    template = "%(function)s(%(percent)s) WITHIN GROUP (ORDER BY %(expressions)s)"
+
+    def __init__(self, expression, percent, **extra):
+        super().__init__(expression, percent=float(percent), output_field=FloatField(), **extra)
+
+
+def _key(period, row):
+    return (period, row["bucket"]) + tuple(row[field] for field in GROUP_FIELDS)
+
+
+def nearest_rank(count, percent):
+    """1-based rank of the nearest-rank percentile among ``count`` values"""
+    return max(1, math.ceil(percent / 100 * count))
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return None
+    return values[nearest_rank(len(values), percent) - 1]
+
+
+def _merge(old, old_count, new, new_count):
+    # Percentiles of a topped-up bucket are approximated by a count-weighted mean
+    if old is None or new is None:
+        return new if old is None else old
+    return (old * old_count + new * new_count) / (old_count + new_count)
+
+
+def duration_percentiles(queryset, bucket, counts):
+    """
+    Return {group key: (p50, p95)} for rows with a recorded duration.
+
+    ``counts`` maps each group key to its number of timed rows. Rows are streamed in
+    duration order and only the values at the two ranks are kept, so memory does not
+    grow with the number of rows, e.g. when a whole partition is rolled up.
+    """
+    ranks = {
+        key: (nearest_rank(count, 50), nearest_rank(count, 95))
+        for key, count in counts.items()
+        if count
+    }
+    rows = (
+        queryset.filter(duration_ms__isnull=False)
+        .annotate(bucket=bucket)
+        .order_by("bucket", *GROUP_FIELDS, "duration_ms")
+        .values_list("bucket", *GROUP_FIELDS, "duration_ms")
+    )
+
+    result = {}
+    key, position = None, 0
+    for row in rows.iterator(chunk_size=STREAM_CHUNK_SIZE):
+        if row[:-1] != key:
+            key, position = row[:-1], 0
+        position += 1
+        p50_rank, p95_rank = ranks.get(key, (0, 0))
+        if position == p50_rank:
+            result[key] = (row[-1], None)
+        if position == p95_rank:
+            result[key] = (result.get(key, (None, None))[0], row[-1])
+    return result
+
+
+def rollup(queryset, periods: Iterable[str], sources: Iterable[str] = ("middleware",)) -> int:
+    """
+    Add the rows of a queryset to the hourly and/or daily LogAggregate tables.
+
+    Buckets that already exist, e.g. because an earlier cleanup run compacted the
+    first part of the same hour, are topped up instead of duplicated. Call this in
+    the transaction that deletes the rows so they are counted exactly once.
+    Returns the number of aggregate rows created or updated.
+    """
+    queryset = queryset.order_by()
+    sources = list(sources)
+    if sources:
+        queryset = queryset.filter(source__in=sources)
+
+    error_level = LogLevel.ERROR.value.value
+    # Other databases stream the durations instead
+    sql_percentiles = connections[queryset.db].vendor == "postgresql"
+    written = 0
+    for period in periods:
+        if period not in PERIODS:
+            continue
+
+        bucket = Trunc("timestamp", period, tzinfo=dt_timezone.utc)
+        aggregates = {
+            "count": Count("pk"),
+            "error_count": Count(
+                "pk", filter=Q(status_code__gte=500) | Q(level_value__gte=error_level)
+            ),
+            "estimated_count": Sum(Value(1.0) / F("sample_rate"), output_field=FloatField()),
+            "timed_count": Count("duration_ms"),
+        }
+        if sql_percentiles:
+            aggregates["p50"] = PercentileDisc("duration_ms", 0.5)
+            aggregates["p95"] = PercentileDisc("duration_ms", 0.95)
+        rows = list(
+            queryset.annotate(bucket=bucket).values("bucket", *GROUP_FIELDS).annotate(**aggregates)
+        )
+        if not rows:
+            continue
+        if sql_percentiles:
+            percentiles = {_key(period, row)[1:]: (row["p50"], row["p95"]) for row in rows}
+        else:
+            percentiles = duration_percentiles(
+                queryset, bucket, {_key(period, row)[1:]: row["timed_count"] for row in rows}
+            )
+
+        existing = {
+            _key(period, {"bucket": a.bucket, **{f: getattr(a, f) for f in GROUP_FIELDS}}): a
+            for a in LogAggregate.objects.filter(
+                period=period, bucket__in={row["bucket"] for row in rows}
+            )
+        }
+
+        created, updated = [], []
+        for row in rows:
+            aggregate = existing.get(_key(period, row))
+            p50, p95 = percentiles.get(_key(period, row)[1:], (None, None))
+            if aggregate is None:
+                created.append(
+                    LogAggregate(
+                        period=period,
+                        bucket=row["bucket"],
+                        count=row["count"],
+                        error_count=row["error_count"],
+                        estimated_count=row["estimated_count"] or 0,
+                        p50_ms=p50,
+                        p95_ms=p95,
+                        **{field: row[field] for field in GROUP_FIELDS},
+                    )
+                )
+            else:
+                aggregate.p50_ms = _merge(aggregate.p50_ms, aggregate.count, p50, row["count"])
+                aggregate.p95_ms = _merge(aggregate.p95_ms, aggregate.count, p95, row["count"])
+                aggregate.count += row["count"]
+                aggregate.error_count += row["error_count"]
+                aggregate.estimated_count += row["estimated_count"] or 0
+                updated.append(aggregate)
+
+        LogAggregate.objects.bulk_create(created)
+        LogAggregate.objects.bulk_update(
+            updated, ["count", "error_count", "estimated_count", "p50_ms", "p95_ms"]
+        )
+        written += len(created) + len(updated)
+
+    return written
@@ -0,0 +1,220 @@
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import FrozenSet, Iterable, Mapping, NamedTuple, Optional
+
+from logmancer.matching import PathMatcher
+
+logger = logging.getLogger("logmancer.sampling")
+
+RATE_LIMIT_MAX_PATHS = 1024
+
+
+def parse_statuses(value) -> FrozenSet[str]:
+    """Normalize a status rule ("2xx", 404, ["4xx", "500"]) to a set of strings"""
+    if value is None:
+        return frozenset()
+    if isinstance(value, (str, int)):
+        value = [value]
+    return frozenset(str(v).lower() for v in value)
+
+
+def parse_methods(value) -> FrozenSet[str]:
+    """Normalize a method rule ("get", ["GET", "POST"]) to a set of upper-case names"""
+    if not value:
+        return frozenset()
+    if isinstance(value, str):
+        value = [value]
+    return frozenset(str(m).upper() for m in value)
+
+
+def path_patterns(config) -> PathMatcher:
+    patterns = config.get("paths") or config.get("path") or []
+    return PathMatcher([patterns] if isinstance(patterns, str) else patterns)
+
+
+def status_matches(statuses: FrozenSet[str], status_code: int) -> bool:
+    if not statuses:
+        return True
+    code = str(status_code)
+    return code in statuses or f"{code[:1]}xx" in statuses
+
+
+class SamplingRule(NamedTuple):
+    """Keep ``rate`` (0.0 - 1.0) of the requests matching every given condition"""
+
+    rate: float
+    paths: PathMatcher
+    methods: FrozenSet[str]
+    statuses: FrozenSet[str]
+
+    @classmethod
+    def from_config(cls, config) -> "SamplingRule":
+        return cls(
+            rate=min(max(float(config.get("rate", 1.0)), 0.0), 1.0),
+            paths=path_patterns(config),
+            methods=parse_methods(config.get("methods")),
+            statuses=parse_statuses(config.get("status")),
+        )
+
+    def matches(self, path, method, status_code) -> bool:
+        return (
+            (not self.paths or self.paths.matches(path))
+            and (not self.methods or method in self.methods)
+            and status_matches(self.statuses, status_code)
+        )
+
+
+class TokenBucket:
+    """Allows ``rate`` events per second with bursts of up to ``burst`` events"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(rate, 1))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class PathBuckets:
+    """
+    One TokenBucket per request path, the least recently seen paths are evicted once
+    ``max_paths`` are tracked. Each bucket also counts the requests it dropped since
+    it last allowed one.
+    """
+
+    def __init__(
+        self, rate: float, burst: Optional[float] = None, max_paths: int = RATE_LIMIT_MAX_PATHS
+    ):
+        self.rate = float(rate)
+        self.burst = burst
+        self.max_paths = max(1, max_paths)
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, path) -> int:
+        """
+        Return how many requests an allowed one stands for, itself plus those dropped
+        since the previous allowed one, or 0 when it is dropped.
+        """
+        with self._lock:
+            entry = self._buckets.get(path)
+            if entry is None:
+                entry = self._buckets[path] = [TokenBucket(self.rate, self.burst), 0]
+                while len(self._buckets) > self.max_paths:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(path)
+
+            if not entry[0].consume():
+                entry[1] += 1
+                return 0
+            represented, entry[1] = entry[1] + 1, 0
+            return represented
+
+
+class RateLimit(NamedTuple):
+    paths: PathMatcher
+    statuses: FrozenSet[str]
+    buckets: PathBuckets
+
+    @classmethod
+    def from_config(cls, config) -> "RateLimit":
+        return cls(
+            paths=path_patterns(config),
+            statuses=parse_statuses(config.get("status")),
+            buckets=PathBuckets(config["rate"], config.get("burst")),
+        )
+
+
+def _build(factory, configs, setting):
+    built = []
+    for config in configs:
+        try:
+            built.append(factory(config))
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            logger.error(f"Ignoring invalid {setting} entry {config!r}: {e}")
+    return tuple(built)
+
+
+class RequestSampler:
+    """
+    Decides whether the middleware keeps a request log.
+
+    The first SAMPLING_RULES entry matching path, method and status class sets the
+    rate, requests matching no rule are always kept. Kept requests then have to pass
+    every matching RATE_LIMITS token bucket, kept per request path. The returned rate
+    of a request that passed a bucket is divided by the number of requests it stands
+    for, so ``1 / sample_rate`` still sums to the number of requests.
+    """
+
+    def __init__(self, rules: Iterable[dict] = (), rate_limits: Iterable[dict] = ()):
+        self.rules = _build(SamplingRule.from_config, rules, "SAMPLING_RULES")
+        self.rate_limits = _build(RateLimit.from_config, rate_limits, "RATE_LIMITS")
+
+    def __bool__(self):
+        return bool(self.rules or self.rate_limits)
+
+    def sample(self, path, method, status_code) -> Optional[float]:
+        """Return the sampling rate if the request should be logged, None to drop it"""
+        rate = 1.0
+        for rule in self.rules:
+            if rule.matches(path, method, status_code):
+                rate = rule.rate
+                break
+
+        if rate < 1.0 and (rate <= 0.0 or random.random() >= rate):
+            return None
+
+        for limit in self.rate_limits:
+            if limit.paths and not limit.paths.matches(path):
+                continue
+            if not status_matches(limit.statuses, status_code):
+                continue
+            represented = limit.buckets.consume(path)
+            if not represented:
+                return None
+            rate /= represented
+
+        return rate
+
+
+class SlowRequestFilter:
+    """
+    Keeps only requests slower than their path's threshold, plus every 4xx and 5xx.
+
+    ``thresholds`` maps path patterns to milliseconds and is checked in order, so list
+    specific patterns before broader ones. Paths matching no pattern use ``default_ms``.
+    """
+
+    def __init__(self, default_ms: float, thresholds: Mapping[str, float] = None):
+        self.default_ms = float(default_ms)
+        self.thresholds = []
+        for pattern, ms in (thresholds or {}).items():
+            try:
+                self.thresholds.append((PathMatcher([pattern]), float(ms)))
+            except (TypeError, ValueError) as e:
+                logger.error(f"Ignoring invalid SLOW_REQUEST_THRESHOLDS entry {pattern!r}: {e}")
+
+    def threshold_for(self, path) -> float:
+        for matcher, ms in self.thresholds:
+            if matcher.matches(path):
+                return ms
+        return self.default_ms
+
+    def keep(self, path, status_code, duration_ms) -> bool:
+        if status_code is not None and status_code >= 400:
+            return True
+        return duration_ms is not None and duration_ms >= self.threshold_for(path)
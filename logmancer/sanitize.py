@@ -0,0 +1,248 @@
+import fnmatch
+import logging
+import re
+from typing import Any, Dict, Iterable, NamedTuple
+
+from logmancer.matching import compile_alternation
+
+MASK = "****"
+TRUNCATED_KEY = "_truncated"
+DEPTH_PLACEHOLDER = "[max depth exceeded]"
+REGEX_PREFIX = "re:"
+GLOB_CHARS = frozenset("*?[")
+KEY_CACHE_SIZE = 1024
+# Tracebacks end with the innermost frames and the exception, so their end is kept
+TAIL_KEYS = frozenset({"stack", "traceback"})
+
+# 13-19 digits, optionally grouped with spaces or dashes
+CARD_NUMBER_RE = re.compile(r"(?<!\d)\d(?:[ -]?\d){12,18}(?!\d)")
+
+logger = logging.getLogger("logmancer.sanitize")
+
+
+class MetaLimits(NamedTuple):
+    """Size caps for meta payloads, 0 disables a limit"""
+
+    max_field_bytes: int = 0
+    max_depth: int = 0
+    max_list_length: int = 0
+
+
+def luhn_valid(digits: str) -> bool:
+    """Check a string of digits against the Luhn checksum"""
+    total = 0
+    for index, char in enumerate(reversed(digits)):
+        digit = ord(char) - 48
+        if index % 2:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        total += digit
+    return total % 10 == 0
+
+
+def _mask_card_number(found):
+    digits = found.group(0).replace(" ", "").replace("-", "")
+    return MASK if luhn_valid(digits) else found.group(0)
+
+
+class KeyMatcher:
+    """
+    Matches dict keys against LOG_SENSITIVE_KEYS, case-insensitively.
+
+    Plain keys are compared exactly, keys containing ``*?[`` are globs (e.g. ``"*_token"``)
+    and ``re:`` keys are regular expressions matched from the start of the key.
+    Results for pattern lookups are cached per key.
+    """
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        exact = set()
+        regex_parts = []
+        for pattern in patterns:
+            if not isinstance(pattern, str) or not pattern:
+                continue
+            if pattern.startswith(REGEX_PREFIX):
+                expression = pattern[len(REGEX_PREFIX) :]
+                try:
+                    re.compile(expression, re.IGNORECASE)
+                except re.error as e:
+                    logger.error(f"Ignoring invalid sensitive key pattern '{pattern}': {e}")
+                    continue
+                regex_parts.append(expression)
+            elif GLOB_CHARS.intersection(pattern):
+                regex_parts.append(fnmatch.translate(pattern.lower()))
+            else:
+                exact.add(pattern.lower())
+
+        self.exact = frozenset(exact)
+        self._regexes = tuple(regex for regex, _ in compile_alternation(regex_parts, re.IGNORECASE))
+        self._cache: Dict[str, bool] = {}
+
+    def __bool__(self):
+        return bool(self.exact) or bool(self._regexes)
+
+    def matches(self, key: Any) -> bool:
+        if not isinstance(key, str):
+            return False
+        lowered = key.lower()
+        if lowered in self.exact:
+            return True
+        if not self._regexes:
+            return False
+
+        result = self._cache.get(lowered)
+        if result is None:
+            if len(self._cache) >= KEY_CACHE_SIZE:
+                self._cache.clear()
+            result = self._cache[lowered] = any(
+                regex.match(lowered) is not None for regex in self._regexes
+            )
+        return result
+
+
+def compile_value_patterns(patterns: Iterable[str]):
+    """Build (regex, replacement) pairs from LOG_SENSITIVE_VALUE_PATTERNS"""
+    compiled = []
+    for pattern in patterns:
+        if pattern == "card_number":
+            compiled.append((CARD_NUMBER_RE, _mask_card_number))
+            continue
+        try:
+            compiled.append((re.compile(pattern), MASK))
+        except (re.error, TypeError) as e:
+            logger.error(f"Ignoring invalid sensitive value pattern '{pattern}': {e}")
+    return tuple(compiled)
+
+
+def _join(path, key):
+    return f"{path}.{key}" if path else str(key)
+
+
+# Key argument for values that are not inside a container
+_ROOT = object()
+
+
+class Sanitizer:
+    """
+    Masks sensitive data and applies MetaLimits to log metadata in a single pass.
+
+    The walk uses an explicit stack, so deeply nested payloads cannot hit the
+    recursion limit, and is copy-on-write: containers without any masked or cut
+    value are returned as-is instead of being copied.
+
+    Everything that was cut is recorded under ``_truncated`` on the returned dict,
+    keyed by the dotted path of the value, e.g. ``{"POST.upload": "1048576 bytes"}``.
+    Strings are cut at the end, except ``TAIL_KEYS`` such as ``stack``, which keep it.
+    """
+
+    def __init__(
+        self,
+        sensitive_keys: Iterable[str] = (),
+        limits: MetaLimits = MetaLimits(),
+        value_patterns: Iterable[str] = (),
+    ):
+        self.keys = KeyMatcher(sensitive_keys)
+        self.sensitive_keys = self.keys.exact
+        self.limits = limits
+        self.value_patterns = compile_value_patterns(value_patterns)
+        self.active = bool(self.keys or self.value_patterns or any(limits))
+
+    def sanitize(self, data: Any) -> Any:
+        if not self.active:
+            return data
+
+        truncated: Dict[str, str] = {}
+        if isinstance(data, (dict, list, tuple)):
+            result = self._walk(data, truncated)
+        else:
+            result = self._scalar(data, "", _ROOT, truncated)
+
+        if truncated and isinstance(result, dict):
+            if result is data:
+                result = dict(result)
+            result[TRUNCATED_KEY] = truncated
+        return result
+
+    def _walk(self, root, truncated):
+        max_depth = self.limits.max_depth
+        keys = self.keys if self.keys else None
+        stack = [self._frame(root, "", 0, None, truncated)]
+        result = root
+
+        while stack:
+            frame = stack[-1]
+            container, path, depth, items, changes = frame[:5]
+            is_dict = isinstance(container, dict)
+
+            for key, value in items:
+                if is_dict and keys is not None and keys.matches(key):
+                    changes[key] = MASK
+                elif isinstance(value, (dict, list, tuple)):
+                    child_path = _join(path, key)
+                    if max_depth and depth + 1 >= max_depth:
+                        truncated[child_path] = "depth"
+                        changes[key] = DEPTH_PLACEHOLDER
+                    else:
+                        stack.append(self._frame(value, child_path, depth + 1, key, truncated))
+                        break
+                elif isinstance(value, str):
+                    new = self._scalar(value, path, key, truncated)
+                    if new is not value:
+                        changes[key] = new
+            else:
+                stack.pop()
+                new_container = self._rebuild(frame)
+                if stack:
+                    if new_container is not container:
+                        stack[-1][4][frame[5]] = new_container
+                else:
+                    result = new_container
+
+        return result
+
+    def _frame(self, container, path, depth, parent_key, truncated):
+        """Stack entry: [container, path, depth, items, changes, parent_key, source]"""
+        if isinstance(container, dict):
+            return [container, path, depth, iter(container.items()), {}, parent_key, None]
+
+        source = container
+        max_length = self.limits.max_list_length
+        if max_length and len(container) > max_length:
+            truncated[path or "."] = f"{len(container)} items"
+            source = container[:max_length]
+        return [container, path, depth, enumerate(source), {}, parent_key, source]
+
+    def _rebuild(self, frame):
+        container, changes, source = frame[0], frame[4], frame[6]
+        if isinstance(container, dict):
+            return {**container, **changes} if changes else container
+
+        if not changes and source is container:
+            return container
+        result = list(source)
+        for index, value in changes.items():
+            result[index] = value
+        return result
+
+    def _scalar(self, value, path, key, truncated):
+        if not isinstance(value, str):
+            return value
+
+        for regex, replacement in self.value_patterns:
+            value = regex.sub(replacement, value)
+        return self._truncate_str(value, path, key, truncated)
+
+    def _truncate_str(self, value, path, key, truncated):
+        max_bytes = self.limits.max_field_bytes
+        # A UTF-8 character is at most 4 bytes, so short strings need no encoding
+        if not max_bytes or len(value) * 4 <= max_bytes:
+            return value
+
+        encoded = value.encode("utf-8")
+        if len(encoded) <= max_bytes:
+            return value
+
+        truncated[(path or ".") if key is _ROOT else _join(path, key)] = f"{len(encoded)} bytes"
+        if key in TAIL_KEYS:
+            return encoded[-max_bytes:].decode("utf-8", "ignore")
+        return encoded[:max_bytes].decode("utf-8", "ignore")
@@ -0,0 +1,43 @@
+import time
+from contextlib import ExitStack, contextmanager
+from typing import NamedTuple, Optional
+
+from django.db import connections
+
+
+class RequestTiming(NamedTuple):
+    """Timings recorded for one request, the DB values are None unless captured"""
+
+    duration_ms: float
+    db_query_count: Optional[int] = None
+    db_time_ms: Optional[float] = None
+
+
+class QueryTimer:
+    """``execute_wrapper`` that counts queries and adds up the time spent in them"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+
+
+@contextmanager
+def capture_queries():
+    """Install a QueryTimer on every configured database for the current thread"""
+    timer = QueryTimer()
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(timer))
+        yield timer
+
+
+def elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 3)
@@ -1,46 +1,49 @@
-import asyncio
 import logging
-import queue
-from concurrent.futures import ThreadPoolExecutor
-from threading import Thread
 
 from django.db import transaction
 
-from logmancer.conf import get_bool
+from logmancer.conf import get_bool, get_settings
 from logmancer.models import LogEntry
-from logmancer.notifications.manager import notification_manager
+from logmancer.notifications.dispatcher import get_notification_dispatcher
+from logmancer.notifications.outbox import enqueue_notification
+from logmancer.writer import write_log
 
 logger = logging.getLogger("logmancer.utils")
 
 
 class LogEvent:
-    _notification_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="logmancer_notif")
-    _notification_queue = queue.Queue(maxsize=1000)
-    _worker_started = False
-
     @classmethod
     def _log(cls, level, message, **kwargs):
         """Internal log method with notification support"""
 
         def create_log():
             try:
-                log_entry = LogEntry.objects.create(
-                    message=message,
-                    level=level,
-                    source=kwargs.get("source", "manual"),
-                    path=kwargs.get("path"),
-                    method=kwargs.get("method"),
-                    status_code=kwargs.get("status_code"),
-                    meta=kwargs.get("meta", {}),
-                    user=kwargs.get("user"),
-                    actor_type=kwargs.get("actor_type", "user"),
-                )
+                fields = {
+                    "message": message,
+                    "level": level,
+                    "source": kwargs.get("source", "manual"),
+                    "path": kwargs.get("path"),
+                    "method": kwargs.get("method"),
+                    "status_code": kwargs.get("status_code"),
+                    "meta": get_settings().sanitizer.sanitize(kwargs.get("meta", {})),
+                    "user": kwargs.get("user"),
+                    "actor_type": kwargs.get("actor_type", "user"),
+                }
 
                 notify = kwargs.pop("notify", False)
                 enabled = get_bool("ENABLE_NOTIFICATIONS")
 
-                if notify and enabled:
+                if notify and enabled and get_bool("NOTIFICATION_OUTBOX"):
+                    # The outbox rows commit or roll back together with the entry
+                    with transaction.atomic():
+                        log_entry = LogEntry.objects.create(**fields)
+                        enqueue_notification(log_entry, kwargs)
+                elif notify and enabled:
+                    # Notifications need a saved row, so they bypass the write buffer
+                    log_entry = LogEntry.objects.create(**fields)
                     cls._queue_notification(log_entry, kwargs)
+                else:
+                    log_entry = write_log(**fields)
 
                 return log_entry
             except Exception as e:
@@ -50,47 +53,8 @@ class LogEvent:
 
     @classmethod
     def _queue_notification(cls, log_entry, context):
-        """Queue notification for async processing"""
-        try:
-            cls._notification_queue.put_nowait((log_entry, context))
-
-            if not cls._worker_started:
-                cls._start_notification_worker()
-                cls._worker_started = True
-
-        except queue.Full:
-            logger.error("Notification queue is full, dropping notification")
-
-    @classmethod
-    def _start_notification_worker(cls):
-        """Start background worker for processing notifications"""
-
-        def notification_worker():
-            while True:
-                try:
-                    log_entry, context = cls._notification_queue.get(timeout=30)
-
-                    cls._notification_executor.submit(
-                        cls._send_notification_async, log_entry, context
-                    )
-
-                    cls._notification_queue.task_done()
-
-                except queue.Empty:
-                    continue
-                except Exception as e:
-                    logger.error(f"Notification worker error: {e}")
-
-        worker_thread = Thread(target=notification_worker, daemon=True, name="logmancer_worker")
-        worker_thread.start()
-
-    @classmethod
-    def _send_notification_async(cls, log_entry, context):
-        """Run async notifications inside this worker thread"""
-        try:
-            asyncio.run(notification_manager.send_notifications(log_entry, context))
-        except Exception as e:
-            logger.error(f"Sending notification failed: {e}")
+        """Hand the notification to the dispatcher's event loop"""
+        get_notification_dispatcher().submit(log_entry, context)
 
     @classmethod
     def info(cls, message, **kwargs):
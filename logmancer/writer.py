@@ -0,0 +1,258 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from threading import Thread
+
+from django.db import close_old_connections
+
+from logmancer.conf import get_bool, get_int
+from logmancer.models import LogEntry
+
+logger = logging.getLogger("logmancer.writer")
+
+
+class LogBuffer:
+    """Collects pending LogEntry rows in memory and writes them with bulk_create"""
+
+    def __init__(self, max_size=100, flush_interval=5):
+        self.max_size = max(1, max_size)
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flusher_started = False
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, entry):
+        """Add an unsaved LogEntry, flushing once the size threshold is reached"""
+        if self._append(entry):
+            self.flush()
+
+    async def aadd(self, entry):
+        """Async version of add, flushing with abulk_create"""
+        if self._append(entry):
+            await self.aflush()
+
+    def flush(self):
+        """Write all pending entries, returns the number of rows written"""
+        batch = self._take()
+        if not batch:
+            return 0
+
+        try:
+            LogEntry.objects.bulk_create(batch, batch_size=self.max_size)
+        except Exception as e:
+            logger.error(f"Buffered log flush failed, dropping {len(batch)} entries: {e}")
+            return 0
+
+        return len(batch)
+
+    async def aflush(self):
+        """Async version of flush"""
+        batch = self._take()
+        if not batch:
+            return 0
+
+        try:
+            await LogEntry.objects.abulk_create(batch, batch_size=self.max_size)
+        except Exception as e:
+            logger.error(f"Buffered log flush failed, dropping {len(batch)} entries: {e}")
+            return 0
+
+        return len(batch)
+
+    def _append(self, entry):
+        """Append an entry, returns True when the buffer reached max_size"""
+        with self._lock:
+            self._pending.append(entry)
+
+            if not self._flusher_started and self.flush_interval > 0:
+                self._start_flusher()
+                self._flusher_started = True
+
+            return len(self._pending) >= self.max_size
+
+    def _take(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        return batch
+
+    def _start_flusher(self):
+        """Start background thread that flushes on the time threshold"""
+
+        def flusher():
+            while True:
+                time.sleep(self.flush_interval)
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"Log buffer flusher error: {e}")
+                finally:
+                    close_old_connections()
+
+        flusher_thread = Thread(target=flusher, daemon=True, name="logmancer_flusher")
+        flusher_thread.start()
+
+
+class BackgroundWriter:
+    """Persists LogEntry rows from a queue in a background thread"""
+
+    def __init__(self, max_queue_size=10000, batch_size=100):
+        self.batch_size = max(1, batch_size)
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._worker_started = False
+
+    def submit(self, entry):
+        """Hand an unsaved LogEntry to the worker, returns False if it was dropped"""
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            logger.error("Background log queue is full, dropping log entry")
+            return False
+
+        if not self._worker_started:
+            with self._lock:
+                if not self._worker_started:
+                    self._start_worker()
+                    self._worker_started = True
+
+        return True
+
+    def drain(self):
+        """Write everything currently queued, returns the number of rows written"""
+        written = 0
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return written
+            written += self._write_batch(batch)
+
+    def _take_batch(self, first=None):
+        batch = [] if first is None else [first]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(self, batch):
+        try:
+            LogEntry.objects.bulk_create(batch, batch_size=self.batch_size)
+        except Exception as e:
+            logger.error(f"Background log write failed, dropping {len(batch)} entries: {e}")
+            return 0
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+        return len(batch)
+
+    def _start_worker(self):
+        """Start background thread that writes queued entries in batches"""
+
+        def worker():
+            while True:
+                try:
+                    first = self._queue.get(timeout=30)
+                except queue.Empty:
+                    continue
+
+                try:
+                    self._write_batch(self._take_batch(first))
+                except Exception as e:
+                    logger.error(f"Background log writer error: {e}")
+                finally:
+                    close_old_connections()
+
+        worker_thread = Thread(target=worker, daemon=True, name="logmancer_writer")
+        worker_thread.start()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+_background_writer = None
+
+
+def get_log_buffer():
+    """Return the process wide LogBuffer, creating it on first use"""
+    global _buffer
+
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = LogBuffer(
+                    max_size=get_int("BUFFER_SIZE"),
+                    flush_interval=get_int("BUFFER_FLUSH_INTERVAL"),
+                )
+                atexit.register(_buffer.flush)
+
+    return _buffer
+
+
+def get_background_writer():
+    """Return the process wide BackgroundWriter, creating it on first use"""
+    global _background_writer
+
+    if _background_writer is None:
+        with _buffer_lock:
+            if _background_writer is None:
+                _background_writer = BackgroundWriter(
+                    max_queue_size=get_int("BACKGROUND_QUEUE_SIZE"),
+                    batch_size=get_int("BUFFER_SIZE"),
+                )
+                atexit.register(_background_writer.drain)
+
+    return _background_writer
+
+
+def write_log(**fields):
+    """Create a LogEntry, through the buffer when BUFFERED_WRITES is enabled"""
+    if get_bool("BUFFERED_WRITES"):
+        log_entry = LogEntry(**fields)
+        get_log_buffer().add(log_entry)
+        return log_entry
+    return LogEntry.objects.create(**fields)
+
+
+def submit_log(**fields):
+    """Build a LogEntry and hand it to the background writer without touching the database"""
+    log_entry = LogEntry(**fields)
+    get_background_writer().submit(log_entry)
+    return log_entry
+
+
+async def awrite_log(**fields):
+    """Async version of write_log using acreate and abulk_create"""
+    if get_bool("BUFFERED_WRITES"):
+        log_entry = LogEntry(**fields)
+        await get_log_buffer().aadd(log_entry)
+        return log_entry
+    return await LogEntry.objects.acreate(**fields)
+
+
+def write_request_log(**fields):
+    """Persist a middleware log, off the request thread when MIDDLEWARE_BACKGROUND_WRITES is set"""
+    if get_bool("MIDDLEWARE_BACKGROUND_WRITES"):
+        return submit_log(**fields)
+    return write_log(**fields)
+
+
+async def awrite_request_log(**fields):
+    """Async version of write_request_log, queueing never blocks the event loop"""
+    if get_bool("MIDDLEWARE_BACKGROUND_WRITES"):
+        return submit_log(**fields)
+    return await awrite_log(**fields)
+
+
+def flush_logs():
+    """Flush buffered and queued entries, if any"""
+    written = 0
+    if _background_writer is not None:
+        written += _background_writer.drain()
+    if _buffer is not None:
+        written += _buffer.flush()
+    return written
@@ -104,6 +104,25 @@ class TestNotificationBackend:
 
         assert backend.should_send(sample_log_entry) is True
 
+    def test_should_send_excluded_path_patterns(self, sample_log_entry):
+        """Test excluded_paths accepts glob and regex patterns"""
+        config = {
+            "enabled": True,
+            "min_level": "WARNING",
+            "excluded_paths": ["/api/*/ping", "re:/v\\d+/"],
+        }
+        backend = MockBackend(config)
+        sample_log_entry.level = "ERROR"
+
+        sample_log_entry.path = "/api/orders/ping"
+        assert backend.should_send(sample_log_entry) is False
+
+        sample_log_entry.path = "/v3/jobs/"
+        assert backend.should_send(sample_log_entry) is False
+
+        sample_log_entry.path = "/api/orders/"
+        assert backend.should_send(sample_log_entry) is True
+
     def test_get_level_emoji(self, backend, sample_log_entry):
         """Test get_level_emoji returns correct emoji"""
         sample_log_entry.level = "ERROR"
@@ -163,3 +182,11 @@ class TestNotificationBackend:
     def test_test_connection(self, backend):
         """Test default test_connection returns True"""
         assert backend.test_connection() is True
+
+    def test_invalid_min_level_blocks_sending(self, sample_log_entry):
+        """Test an unknown min_level never sends"""
+        backend = MockBackend({"enabled": True, "min_level": "LOUD"})
+        sample_log_entry.level = "CRITICAL"
+
+        assert backend.min_level is None
+        assert backend.should_send(sample_log_entry) is False
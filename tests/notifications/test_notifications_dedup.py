@@ -0,0 +1,107 @@
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from logmancer.notifications.dedup import DedupStore, fingerprint, normalize_message
+from logmancer.notifications.email import EmailBackend
+from logmancer.notifications.manager import NotificationManager
+
+
+def make_entry(message="Order 1234 failed", path="/api/orders/", level="ERROR", meta=None):
+    entry = Mock()
+    entry.level = level
+    entry.message = message
+    entry.path = path
+    entry.meta = meta or {}
+    return entry
+
+
+class TestFingerprint:
+    """Test message normalization and fingerprints"""
+
+    def test_normalize_message(self):
+        """Test ids, numbers and quoted values are replaced"""
+        message = "User 'bob' order 42 (a1b2c3d4-0000-1111-2222-333344445555) took 1.5s"
+
+        assert normalize_message(message) == "User <str> order <n> (<uuid>) took <n>s"
+
+    def test_repeats_share_a_fingerprint(self):
+        """Test entries differing only in ids compare equal"""
+        assert fingerprint(make_entry("Order 1 failed")) == fingerprint(
+            make_entry("Order 2 failed")
+        )
+
+    def test_distinct_fields_change_fingerprint(self):
+        """Test level, path and exception type are part of the fingerprint"""
+        base = fingerprint(make_entry())
+
+        assert fingerprint(make_entry(level="CRITICAL")) != base
+        assert fingerprint(make_entry(path="/api/pay/")) != base
+        assert fingerprint(make_entry(meta={"exception_type": "KeyError"})) != base
+
+
+class TestDedupStore:
+    """Test DedupStore"""
+
+    def test_suppresses_inside_window_and_reports_count(self):
+        """Test repeats are counted and reported on the next send"""
+        store = DedupStore(window=60)
+
+        assert store.check("a", now=0) == (True, 0)
+        assert store.check("a", now=10) == (False, 0)
+        assert store.check("a", now=20) == (False, 0)
+        assert store.check("a", now=61) == (True, 2)
+        assert store.check("a", now=62) == (False, 0)
+
+    def test_bounded_size_evicts_least_recent(self):
+        """Test memory stays bounded by max_keys"""
+        store = DedupStore(window=60, max_keys=2)
+        store.check("a", now=0)
+        store.check("b", now=1)
+        store.check("a", now=2)
+        store.check("c", now=3)
+
+        assert len(store) == 2
+        assert store.check("b", now=4) == (True, 0)
+        assert store.check("c", now=4) == (False, 0)
+
+
+class TestManagerDedup:
+    """Test deduplication in NotificationManager"""
+
+    @pytest.mark.asyncio
+    async def test_repeats_are_suppressed(self):
+        """Test identical alerts reach backends once per window"""
+        backend = Mock()
+        backend.send_notification = AsyncMock()
+        manager = object.__new__(NotificationManager)
+        manager.backends = [backend]
+        manager.dedup = DedupStore(window=60)
+
+        with patch("logmancer.notifications.dedup.time.monotonic", return_value=0):
+            for i in range(100):
+                await manager.send_notifications(make_entry(f"Order {i} failed"), {"id": i})
+
+        backend.send_notification.assert_called_once()
+
+        with patch("logmancer.notifications.dedup.time.monotonic", return_value=61):
+            await manager.send_notifications(make_entry(), {"id": 100})
+
+        assert backend.send_notification.call_count == 2
+        assert backend.send_notification.call_args[0][1] == {"id": 100, "suppressed": 99}
+
+    def test_repeat_without_message(self):
+        """Test entries without a message can be suppressed"""
+        manager = object.__new__(NotificationManager)
+        manager.dedup = DedupStore(window=60)
+
+        assert manager.deduplicate(make_entry(message=None))[0] is True
+        assert manager.deduplicate(make_entry(message=None))[0] is False
+
+    def test_email_reports_suppressed(self, email_config, sample_log_entry):
+        """Test backends include the suppressed count in the message"""
+        backend = EmailBackend(email_config)
+
+        message = backend.format_message(sample_log_entry, {"suppressed": 12})
+
+        assert "Repeats: 12 suppressed" in message
@@ -0,0 +1,196 @@
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from logmancer.notifications.base import NotificationBackend
+from logmancer.notifications.digest import build_digest, format_digest
+from logmancer.notifications.manager import NotificationManager
+from logmancer.notifications.slack import SlackBackend
+from logmancer.notifications.telegram import TelegramBackend
+
+
+def make_entry(level="ERROR", path="/api/orders/", message="Boom", seconds=0):
+    entry = Mock()
+    entry.level = level
+    entry.path = path
+    entry.message = message
+    entry.source = None
+    entry.timestamp = datetime(2026, 1, 1, 12, 0) + timedelta(seconds=seconds)
+    return entry
+
+
+class BatchingBackend(NotificationBackend):
+    """Backend recording what it sends"""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.sent = []
+        self.digests = []
+
+    async def send_notification(self, log_entry, context=None):
+        self.sent.append(log_entry)
+
+    async def send_digest(self, digest):
+        self.digests.append(digest)
+
+    def format_message(self, log_entry, context=None):
+        return log_entry.message
+
+
+class TestBuildDigest:
+    """Test digest summaries"""
+
+    def test_counts_and_top_messages(self):
+        """Test levels are ordered by severity and messages by frequency"""
+        entries = [make_entry(message="Timeout", seconds=i) for i in range(3)]
+        entries += [make_entry("CRITICAL", "/api/pay/", "DB down", seconds=5)]
+        entries += [make_entry(message="Other", path=None, seconds=9)]
+
+        digest = build_digest(entries, top=2)
+
+        assert digest.total == 5
+        assert digest.levels == [("CRITICAL", 1), ("ERROR", 4)]
+        assert digest.paths == [("/api/orders/", 3), ("/api/pay/", 1)]
+        assert digest.messages == [("Timeout", 3), ("DB down", 1)]
+        assert digest.start == entries[0].timestamp
+        assert digest.end == entries[-1].timestamp
+        assert digest.top_level.name == "CRITICAL"
+
+    def test_format_digest(self):
+        """Test the plain text rendering"""
+        text = format_digest(build_digest([make_entry(), make_entry(seconds=3)]))
+
+        assert text.startswith("2 log entries between 2026-01-01 12:00:00 and 12:00:03")
+        assert "ERROR x2" in text
+        assert "2x /api/orders/" in text
+        assert "2x Boom" in text
+
+
+class TestBatching:
+    """Test batching windows in NotificationBackend"""
+
+    @pytest.mark.asyncio
+    async def test_window_sends_one_digest(self):
+        """Test entries collected during the window are sent as one digest"""
+        backend = BatchingBackend({"batch_window": 0.05})
+
+        for i in range(3):
+            await backend.add_to_batch(make_entry(seconds=i))
+        assert backend.digests == []
+
+        await asyncio.sleep(0.1)
+
+        assert len(backend.digests) == 1
+        assert backend.digests[0].total == 3
+        assert backend.sent == []
+
+    @pytest.mark.asyncio
+    async def test_batch_max_size_flushes_early(self):
+        """Test a full batch is sent without waiting for the window"""
+        backend = BatchingBackend({"batch_window": 60, "batch_max_size": 2})
+
+        for i in range(5):
+            await backend.add_to_batch(make_entry(seconds=i))
+
+        assert [digest.total for digest in backend.digests] == [2, 2]
+        await backend.flush_batch()
+        assert backend.sent and backend.sent[0].timestamp.second == 4
+
+    @pytest.mark.asyncio
+    async def test_filtered_entries_are_not_batched(self):
+        """Test entries below min_level are ignored"""
+        backend = BatchingBackend({"batch_window": 60})
+
+        await backend.add_to_batch(make_entry(level="INFO"))
+        await backend.flush_batch()
+
+        assert backend.sent == [] and backend.digests == []
+
+    @pytest.mark.asyncio
+    async def test_manager_batches_and_flushes(self):
+        """Test the manager routes entries of batching backends into the batch"""
+        backend = BatchingBackend({"batch_window": 60})
+        direct = Mock()
+        direct.send_notification = AsyncMock()
+        manager = object.__new__(NotificationManager)
+        manager.backends = [backend, direct]
+
+        await manager.send_notifications(make_entry())
+        await manager.send_notifications(make_entry())
+        await manager.flush_batches()
+
+        assert direct.send_notification.call_count == 2
+        assert backend.digests[0].total == 2
+
+    def test_backend_without_digest_does_not_batch(self, caplog):
+        """Test batch_window is ignored with a warning when send_digest is missing"""
+
+        class PlainBackend(NotificationBackend):
+            async def send_notification(self, log_entry, context=None):
+                pass
+
+            def format_message(self, log_entry, context=None):
+                return log_entry.message
+
+        backend = PlainBackend({"batch_window": 60})
+
+        assert backend.batch_window == 0
+        assert "does not implement send_digest" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_flush_holds_backend_limit(self):
+        """Test digests wait for the backend's concurrency limit"""
+        backend = BatchingBackend({"batch_window": 60})
+        limit = asyncio.Semaphore(1)
+        for i in range(2):
+            await backend.add_to_batch(make_entry(seconds=i), limit)
+
+        async with limit:
+            flush = asyncio.ensure_future(backend.flush_batch())
+            await asyncio.sleep(0.01)
+            assert backend.digests == []
+        await flush
+
+        assert backend.digests[0].total == 2
+
+    @pytest.mark.asyncio
+    async def test_manager_passes_limit_to_batch(self):
+        """Test the manager hands the backend's semaphore to the batch"""
+        backend = BatchingBackend({"batch_window": 60})
+        manager = object.__new__(NotificationManager)
+        manager.backends = [backend]
+        limit = asyncio.Semaphore(1)
+
+        await manager.send_notifications(make_entry(), limit_for=lambda b: limit)
+
+        assert backend._batch_limit is limit
+
+
+class TestBackendDigests:
+    """Test digest formats of the built-in backends"""
+
+    @pytest.mark.asyncio
+    @patch("logmancer.notifications.http.requests.Session.post")
+    async def test_slack_digest(self, mock_post, slack_config):
+        """Test a Slack digest is one message with counts"""
+        mock_post.return_value = Mock(status_code=200)
+        backend = SlackBackend(slack_config)
+
+        await backend.send_digest(build_digest([make_entry(), make_entry("CRITICAL")]))
+
+        payload = mock_post.call_args[1]["json"]
+        assert payload["text"] == "Logmancer Digest: 2 alerts"
+        attachment = payload["attachments"][0]
+        assert attachment["color"] == "danger"
+        assert attachment["fields"][0]["value"] == "CRITICAL x1, ERROR x1"
+
+    def test_telegram_digest_escapes_html(self, telegram_config):
+        """Test Telegram digests escape user controlled text"""
+        backend = TelegramBackend(telegram_config)
+
+        message = backend.format_digest(build_digest([make_entry(message="<script>")]))
+
+        assert "1x &lt;script&gt;" in message
+        assert message.startswith("❌ <b>1 log entries</b>")
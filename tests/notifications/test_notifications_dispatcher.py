@@ -0,0 +1,231 @@
+import asyncio
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from logmancer.notifications.dispatcher import NotificationDispatcher, stats_slot_key
+from logmancer.notifications.manager import NotificationManager
+
+
+class RecordingBackend:
+    """Backend stub that records the loop thread and its peak concurrency"""
+
+    def __init__(self, max_concurrency=1, delay=0.02):
+        self.max_concurrency = max_concurrency
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.threads = set()
+        self.sent = 0
+
+    async def send_notification(self, log_entry, context=None):
+        self.threads.add(threading.current_thread().name)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        self.sent += 1
+        return True
+
+
+@pytest.fixture
+def manager():
+    manager = NotificationManager.__new__(NotificationManager)
+    manager.backends = []
+    return manager
+
+
+class TestNotificationDispatcher:
+    """Test NotificationDispatcher"""
+
+    def test_sends_on_one_persistent_loop(self, manager):
+        """Test every notification runs on the same background loop thread"""
+        backend = RecordingBackend(max_concurrency=5)
+        manager.backends = [backend]
+        dispatcher = NotificationDispatcher(manager=manager)
+
+        for _ in range(10):
+            assert dispatcher.submit(Mock()) is True
+        dispatcher.shutdown()
+
+        assert backend.sent == 10
+        assert backend.threads == {"logmancer_notifier"}
+
+    def test_backend_concurrency_is_capped(self, manager):
+        """Test a backend never has more sends in flight than its max_concurrency"""
+        slow = RecordingBackend(max_concurrency=2)
+        fast = RecordingBackend(max_concurrency=4)
+        manager.backends = [slow, fast]
+        dispatcher = NotificationDispatcher(max_concurrency=10, manager=manager)
+
+        for _ in range(20):
+            dispatcher.submit(Mock())
+        dispatcher.shutdown()
+
+        assert slow.sent == fast.sent == 20
+        assert slow.peak == 2
+        assert fast.peak == 4
+
+    def test_full_queue_drops(self, manager):
+        """Test submissions beyond max_queue_size are dropped"""
+        backend = RecordingBackend(delay=0.2)
+        manager.backends = [backend]
+        dispatcher = NotificationDispatcher(max_queue_size=2, manager=manager)
+
+        results = [dispatcher.submit(Mock()) for _ in range(4)]
+        dispatcher.shutdown()
+
+        assert results == [True, True, False, False]
+        assert backend.sent == 2
+        assert dispatcher.pending == 0
+
+    def test_shutdown_without_loop(self, manager):
+        """Test shutdown before any submission is a no-op"""
+        NotificationDispatcher(manager=manager).shutdown()
+
+
+class TestOverflowPolicies:
+    """Test queue overflow policies and counters"""
+
+    def test_drop_oldest(self, manager):
+        """Test the oldest queued notification makes room for the newest"""
+        backend = RecordingBackend(max_concurrency=1, delay=0.1)
+        manager.backends = [backend]
+        dispatcher = NotificationDispatcher(
+            max_queue_size=3, max_concurrency=1, manager=manager, overflow="drop_oldest"
+        )
+
+        entries = [Mock(name=str(i)) for i in range(5)]
+        results = [dispatcher.submit(entry) for entry in entries]
+        stats = dispatcher.stats()
+        dispatcher.shutdown()
+
+        assert results == [True] * 5
+        assert stats.dropped == 2
+        assert dispatcher.stats().sent == 3
+
+    def test_block_waits_for_room(self, manager):
+        """Test a full queue blocks the caller until a slot frees up"""
+        backend = RecordingBackend(delay=0.05)
+        manager.backends = [backend]
+        dispatcher = NotificationDispatcher(
+            max_queue_size=1, manager=manager, overflow="block", block_timeout=2
+        )
+
+        results = [dispatcher.submit(Mock()) for _ in range(3)]
+        dispatcher.shutdown()
+
+        assert results == [True, True, True]
+        assert backend.sent == 3
+
+    def test_block_times_out(self, manager):
+        """Test a blocked submission is dropped after block_timeout"""
+        manager.backends = [RecordingBackend(delay=0.5)]
+        dispatcher = NotificationDispatcher(
+            max_queue_size=1, manager=manager, overflow="block", block_timeout=0.01
+        )
+
+        assert dispatcher.submit(Mock()) is True
+        assert dispatcher.submit(Mock()) is False
+        assert dispatcher.stats().dropped == 1
+        dispatcher.shutdown()
+
+    def test_outbox_spill(self, manager):
+        """Test overflowing notifications are written to the outbox"""
+        manager.backends = [RecordingBackend(delay=0.2)]
+        dispatcher = NotificationDispatcher(max_queue_size=1, manager=manager, overflow="outbox")
+
+        with patch("logmancer.notifications.outbox.enqueue_notification") as mock_enqueue:
+            dispatcher.submit(Mock())
+            overflow = Mock()
+            assert dispatcher.submit(overflow, {"a": 1}) is False
+
+        mock_enqueue.assert_called_once_with(overflow, {"a": 1}, manager)
+        assert dispatcher.stats().spilled == 1
+        dispatcher.shutdown()
+
+    def test_stats_are_published_while_backends_hang(self, manager):
+        """Test a timer publishes drops even though no send finishes"""
+        manager.backends = [RecordingBackend(delay=0.5)]
+        dispatcher = NotificationDispatcher(max_queue_size=1, manager=manager, stats_interval=0.05)
+        published = []
+
+        with patch.object(
+            dispatcher, "publish_stats", side_effect=lambda: published.append(dispatcher.stats())
+        ):
+            dispatcher.submit(Mock())
+            dispatcher.submit(Mock())
+            time.sleep(0.3)
+            assert any(stats.dropped == 1 and stats.sent == 0 for stats in published)
+            dispatcher.shutdown()
+
+    def test_processes_publish_into_separate_slots(self, manager):
+        """Test each process claims its own expiring stats slot"""
+        from django.core.cache import cache
+
+        cache.clear()
+        first = NotificationDispatcher(manager=manager, stats_interval=10)
+        second = NotificationDispatcher(manager=manager, stats_interval=10)
+
+        with patch.object(cache, "set", wraps=cache.set) as mock_set:
+            with patch("logmancer.notifications.dispatcher.os.getpid", return_value=1):
+                first.publish_stats()
+                first.publish_stats()
+            with patch("logmancer.notifications.dispatcher.os.getpid", return_value=2):
+                second.publish_stats()
+
+        assert (first._stats_slot, second._stats_slot) == (0, 1)
+        assert mock_set.call_args[0][2] == 20
+        assert cache.get(stats_slot_key(0))["process"].endswith(":1")
+        assert cache.get(stats_slot_key(1))["process"].endswith(":2")
+        cache.clear()
+
+    def test_unknown_policy_falls_back(self, manager):
+        """Test an unknown policy is reported and replaced by drop_newest"""
+        assert NotificationDispatcher(manager=manager, overflow="spill").overflow == "drop_newest"
+
+    def test_stats(self, manager):
+        """Test sent, failed and latency counters"""
+
+        class FailingBackend(RecordingBackend):
+            async def send_notification(self, log_entry, context=None):
+                await super().send_notification(log_entry, context)
+                return False if log_entry == "bad" else True
+
+        manager.backends = [FailingBackend(max_concurrency=5, delay=0.01)]
+        dispatcher = NotificationDispatcher(manager=manager)
+
+        for entry in ("ok", "ok", "bad"):
+            dispatcher.submit(entry)
+        dispatcher.shutdown()
+        stats = dispatcher.stats()
+
+        assert (stats.enqueued, stats.sent, stats.failed, stats.dropped) == (3, 2, 1, 0)
+        assert (stats.queued, stats.in_flight) == (0, 0)
+        assert 1 <= stats.max_queued <= 3
+        assert stats.max_latency_ms >= stats.avg_latency_ms >= 10
+
+    def test_stats_count_undelivered_as_skipped(self, manager):
+        """Test filtered, suppressed and batched notifications are not counted as sent"""
+
+        class FilteringBackend(RecordingBackend):
+            async def send_notification(self, log_entry, context=None):
+                if log_entry == "filtered":
+                    return None
+                return await super().send_notification(log_entry, context)
+
+        manager.backends = [FilteringBackend()]
+        dispatcher = NotificationDispatcher(manager=manager)
+
+        dispatcher.submit("filtered")
+        dispatcher.submit("ok")
+        while dispatcher.pending:
+            time.sleep(0.01)
+        with patch.object(manager, "send_notifications", return_value=None):
+            dispatcher.submit("suppressed")
+            dispatcher.shutdown()
+        stats = dispatcher.stats()
+
+        assert (stats.sent, stats.failed, stats.skipped) == (1, 0, 2)
@@ -0,0 +1,67 @@
+from unittest.mock import Mock, patch
+
+import pytest
+
+from logmancer.notifications.http import build_session
+from logmancer.notifications.slack import SlackBackend
+
+
+class TestBuildSession:
+    """Test pooled session construction"""
+
+    def test_adapter_pool_and_retries(self):
+        """Test the mounted adapter uses the configured pool size and retries"""
+        session = build_session(pool_size=8, retries=3, backoff=1)
+        adapter = session.get_adapter("https://hooks.slack.com/")
+
+        assert adapter._pool_maxsize == 8
+        assert adapter.max_retries.total == 3
+        assert adapter.max_retries.read == 0
+        assert 429 in adapter.max_retries.status_forcelist
+        assert "POST" in adapter.max_retries.allowed_methods
+
+
+class TestHTTPNotificationBackend:
+    """Test session reuse in HTTP backends"""
+
+    @pytest.fixture
+    def backend(self, slack_config):
+        return SlackBackend({**slack_config, "pool_size": 2, "retries": 1})
+
+    def test_session_is_created_lazily_and_reused(self, backend):
+        """Test every send shares one session"""
+        assert backend._session is None
+        session = backend.session
+
+        assert backend.session is session
+        assert session.get_adapter("https://x/")._pool_maxsize == 2
+
+    @pytest.mark.asyncio
+    async def test_burst_reuses_session(self, backend, sample_log_entry):
+        """Test a burst of notifications goes through the same session"""
+        sample_log_entry.level = "ERROR"
+        sample_log_entry.path = "/api/test/"
+
+        with patch("logmancer.notifications.http.build_session") as mock_build:
+            mock_build.return_value.post.return_value = Mock(status_code=200)
+            for _ in range(5):
+                await backend.send_notification(sample_log_entry)
+
+        mock_build.assert_called_once_with(2, 1, 0.5)
+        assert mock_build.return_value.post.call_count == 5
+
+    def test_close(self, backend):
+        """Test close releases the session"""
+        session = backend.session
+        with patch.object(session, "close") as mock_close:
+            backend.close()
+
+        mock_close.assert_called_once()
+        assert backend._session is None
+
+    def test_async_client_without_httpx_falls_back(self, slack_config):
+        """Test async_client is ignored when httpx is not installed"""
+        with patch("logmancer.notifications.http.httpx", None):
+            backend = SlackBackend({**slack_config, "async_client": True})
+
+        assert backend.async_client is False
@@ -9,7 +9,7 @@ class TestNotificationsIntegration:
     """Integration tests for notification system"""
 
     @pytest.mark.asyncio
-    @patch("logmancer.notifications.telegram.requests.post")
+    @patch("logmancer.notifications.http.requests.Session.post")
     @patch("django.conf.settings")
     async def test_end_to_end_notification(self, mock_settings, mock_post, sample_log_entry):
         """Test end-to-end notification flow"""
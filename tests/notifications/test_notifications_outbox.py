@@ -0,0 +1,160 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+import pytest
+
+from logmancer.models import LogEntry, NotificationOutbox
+from logmancer.notifications.base import NotificationBackend
+from logmancer.notifications.manager import NotificationManager
+from logmancer.notifications.outbox import drain_outbox, enqueue_notification
+from logmancer.utils import LogEvent
+
+
+class RecordingBackend(NotificationBackend):
+    """Backend returning scripted results"""
+
+    def __init__(self, name, config=None, results=None):
+        super().__init__(config or {})
+        self.name = name
+        self.results = list(results or [])
+        self.sent = []
+        self.digests = []
+
+    async def send_notification(self, log_entry, context=None):
+        self.sent.append((log_entry, context))
+        result = self.results.pop(0) if self.results else True
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def send_digest(self, digest):
+        self.digests.append(digest)
+        return True
+
+    def format_message(self, log_entry, context=None):
+        return log_entry.message
+
+
+def make_manager(*backends):
+    manager = object.__new__(NotificationManager)
+    manager.backends = list(backends)
+    return manager
+
+
+@pytest.fixture
+def entry():
+    return LogEntry.objects.create(message="Outbox test", level="ERROR")
+
+
+@pytest.mark.django_db
+class TestEnqueue:
+    """Test writing outbox rows"""
+
+    def test_one_row_per_backend(self, entry):
+        """Test rows are written per backend without meta or user"""
+        manager = make_manager(RecordingBackend("slack"), RecordingBackend("email"))
+
+        written = enqueue_notification(
+            entry, {"source": "cron", "meta": {"password": "x"}, "user": None}, manager
+        )
+
+        rows = NotificationOutbox.objects.filter(log_entry=entry).order_by("backend")
+        assert written == 2
+        assert [row.backend for row in rows] == ["email", "slack"]
+        assert rows[0].context == {"source": "cron"}
+
+    @override_settings(LOGMANCER={"ENABLE_NOTIFICATIONS": True, "NOTIFICATION_OUTBOX": True})
+    def test_log_event_writes_outbox(self, django_capture_on_commit_callbacks):
+        """Test LogEvent stores the entry and its outbox rows instead of sending"""
+        manager = make_manager(RecordingBackend("slack"))
+
+        with patch("logmancer.notifications.outbox.notification_manager", manager):
+            with patch("logmancer.utils.get_notification_dispatcher") as mock_dispatcher:
+                with django_capture_on_commit_callbacks(execute=True):
+                    LogEvent.error("Outbox event", notify=True)
+
+        entry = LogEntry.objects.get(message="Outbox event")
+        assert NotificationOutbox.objects.filter(log_entry=entry, backend="slack").exists()
+        assert not mock_dispatcher.called
+
+
+@pytest.mark.django_db
+class TestDrainOutbox:
+    """Test delivering outbox rows"""
+
+    def test_delivered_rows_are_deleted(self, entry):
+        """Test a successful send removes the row"""
+        backend = RecordingBackend("slack")
+        manager = make_manager(backend)
+        enqueue_notification(entry, {"source": "cron"}, manager)
+
+        result = drain_outbox(manager=manager)
+
+        assert result.done == 1
+        assert backend.sent == [(entry, {"source": "cron"})]
+        assert not NotificationOutbox.objects.exists()
+
+    def test_failures_back_off_and_give_up(self, entry):
+        """Test failed sends are retried with exponential backoff until max_attempts"""
+        backend = RecordingBackend("slack", results=[False, Exception("timeout")])
+        manager = make_manager(backend)
+        enqueue_notification(entry, None, manager)
+
+        start = timezone.now()
+        assert drain_outbox(max_attempts=2, backoff=10, manager=manager).retried == 1
+        row = NotificationOutbox.objects.get()
+        assert row.attempts == 1
+        assert row.last_error == "delivery failed"
+        assert start + timedelta(seconds=9) < row.next_attempt_at
+
+        # Not due yet
+        assert drain_outbox(max_attempts=2, manager=manager) == (0, 0, 0)
+
+        NotificationOutbox.objects.update(next_attempt_at=timezone.now())
+        assert drain_outbox(max_attempts=2, backoff=10, manager=manager).dead == 1
+        row.refresh_from_db()
+        assert row.attempts == 2
+        assert row.last_error == "timeout"
+        assert row.next_attempt_at > start + timedelta(seconds=19)
+
+        NotificationOutbox.objects.update(next_attempt_at=timezone.now())
+        assert drain_outbox(max_attempts=2, manager=manager) == (0, 0, 0)
+        assert len(backend.sent) == 2
+
+    def test_rows_without_entry_or_backend_are_dropped(self, entry):
+        """Test rows whose entry was cleaned up or whose backend is gone are removed"""
+        manager = make_manager(RecordingBackend("slack"))
+        enqueue_notification(entry, None, manager)
+        NotificationOutbox.objects.create(log_entry_id=entry.pk, backend="removed")
+        NotificationOutbox.objects.create(log_entry_id=entry.pk + 1000, backend="slack")
+
+        assert drain_outbox(manager=manager).done == 3
+        assert not NotificationOutbox.objects.exists()
+
+    def test_batching_backend_gets_one_digest(self, entry):
+        """Test rows of a batching backend are sent as one digest"""
+        backend = RecordingBackend("slack", {"batch_window": 30})
+        manager = make_manager(backend)
+        for _ in range(3):
+            enqueue_notification(entry, None, manager)
+
+        assert drain_outbox(manager=manager).done == 3
+        assert backend.sent == []
+        assert [digest.total for digest in backend.digests] == [3]
+
+    def test_command_drains_in_batches(self, entry):
+        """Test logmancer_outbox keeps going while batches are full"""
+        backend = RecordingBackend("slack")
+        manager = make_manager(backend)
+        for _ in range(5):
+            enqueue_notification(entry, None, manager)
+
+        with patch("logmancer.notifications.outbox.notification_manager", manager):
+            call_command("logmancer_outbox", batch_size=2)
+
+        assert len(backend.sent) == 5
+        assert not NotificationOutbox.objects.exists()
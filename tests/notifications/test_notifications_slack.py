@@ -14,7 +14,7 @@ class TestSlackBackend:
         return SlackBackend(slack_config)
 
     @pytest.mark.asyncio
-    @patch("logmancer.notifications.slack.requests.post")
+    @patch("logmancer.notifications.http.requests.Session.post")
     async def test_send_notification_success(self, mock_post, backend, sample_log_entry):
         """Test successful Slack notification"""
         # Configure to pass should_send
@@ -28,10 +28,10 @@ class TestSlackBackend:
 
         await backend.send_notification(sample_log_entry)
 
-        assert mock_post.called, "requests.post should have been called"
+        assert mock_post.called, "session.post should have been called"
 
     @pytest.mark.asyncio
-    @patch("logmancer.notifications.slack.requests.post")
+    @patch("logmancer.notifications.http.requests.Session.post")
     async def test_send_notification_failed_status(self, mock_post, backend, sample_log_entry):
         """Test Slack notification with failed status"""
         sample_log_entry.level = "ERROR"
@@ -49,7 +49,7 @@ class TestSlackBackend:
         assert mock_post.called
 
     @pytest.mark.asyncio
-    @patch("logmancer.notifications.slack.requests.post")
+    @patch("logmancer.notifications.http.requests.Session.post")
     async def test_send_notification_skipped_low_level(self, mock_post, backend, sample_log_entry):
         """Test notification skipped for low level"""
         sample_log_entry.level = "DEBUG"  # Below WARNING
@@ -62,7 +62,7 @@ class TestSlackBackend:
 
     def test_test_connection(self, backend):
         """Test Slack connection test"""
-        with patch("logmancer.notifications.slack.requests.post") as mock_post:
+        with patch("logmancer.notifications.http.requests.Session.post") as mock_post:
             mock_response = Mock()
             mock_response.status_code = 200
             mock_post.return_value = mock_response
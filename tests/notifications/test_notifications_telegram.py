@@ -43,7 +43,7 @@ class TestTelegramBackend:
         assert backend.timeout == 30
 
     @pytest.mark.asyncio
-    @patch("logmancer.notifications.telegram.requests.post")
+    @patch("logmancer.notifications.http.requests.Session.post")
     async def test_send_notification_success(self, mock_post, backend, sample_log_entry):
         """Test successful notification sending"""
         sample_log_entry.level = "ERROR"
@@ -68,7 +68,7 @@ class TestTelegramBackend:
         assert payload["disable_web_page_preview"] is True
 
     @pytest.mark.asyncio
-    @patch("logmancer.notifications.telegram.requests.post")
+    @patch("logmancer.notifications.http.requests.Session.post")
     async def test_send_notification_skipped_wrong_source(
         self, mock_post, backend, sample_log_entry
     ):
@@ -82,7 +82,7 @@ class TestTelegramBackend:
         assert not mock_post.called
 
     @pytest.mark.asyncio
-    @patch("logmancer.notifications.telegram.requests.post")
+    @patch("logmancer.notifications.http.requests.Session.post")
     @patch("logmancer.notifications.telegram.logger")
     async def test_send_notification_request_exception(
         self, mock_logger, mock_post, backend, sample_log_entry
@@ -100,7 +100,7 @@ class TestTelegramBackend:
         assert mock_logger.error.called
 
     @pytest.mark.asyncio
-    @patch("logmancer.notifications.telegram.requests.post")
+    @patch("logmancer.notifications.http.requests.Session.post")
     async def test_send_notification_with_context(self, mock_post, backend, sample_log_entry):
         """Test notification with context"""
         sample_log_entry.level = "ERROR"
@@ -162,7 +162,7 @@ class TestTelegramBackend:
 
         assert len(message) <= 4000
 
-    @patch("logmancer.notifications.telegram.requests.get")
+    @patch("logmancer.notifications.http.requests.Session.get")
     def test_test_connection_success(self, mock_get, backend):
         """Test connection test with success"""
         mock_response = Mock()
@@ -174,7 +174,7 @@ class TestTelegramBackend:
         assert result is True
         assert mock_get.called
 
-    @patch("logmancer.notifications.telegram.requests.get")
+    @patch("logmancer.notifications.http.requests.Session.get")
     @patch("logmancer.notifications.telegram.logger")
     def test_test_connection_exception(self, mock_logger, mock_get, backend):
         """Test connection test with exception"""
@@ -8,7 +8,7 @@ from django.utils import timezone
 import pytest
 from model_bakery import baker
 
-from logmancer.admin import LEVEL_COLORS, LogEntryAdmin
+from logmancer.admin import LEVEL_COLORS, LogEntryAdmin, MinimumLevelFilter
 from logmancer.models import LogEntry
 
 
@@ -61,7 +61,14 @@ class TestLogEntryAdmin:
 
     def test_list_filter(self):
         """Test admin list filter fields"""
-        expected_filters = ("level", "status_code", "actor_type", "source", "user")
+        expected_filters = (
+            MinimumLevelFilter,
+            "level",
+            "status_code",
+            "actor_type",
+            "source",
+            "user",
+        )
         assert self.admin.list_filter == expected_filters
 
     def test_search_fields(self):
@@ -82,6 +89,10 @@ class TestLogEntryAdmin:
             "meta",
             "source",
             "actor_type",
+            "sample_rate",
+            "duration_ms",
+            "db_query_count",
+            "db_time_ms",
         )
         assert self.admin.readonly_fields == expected_fields
 
@@ -504,5 +515,35 @@ class TestAdminCustomization:
         assert "delete_selected" in actions or len(actions) >= 0
 
 
+@pytest.mark.django_db
+class TestMinimumLevelFilter:
+    """Test the severity admin filter"""
+
+    def _filter(self, value):
+        request = RequestFactory().get("/", {"min_level": value} if value else {})
+        params = dict(request.GET.lists())
+        return MinimumLevelFilter(request, params, LogEntry, LogEntryAdmin(LogEntry, AdminSite()))
+
+    def test_lookups_are_unique_values(self):
+        """Test lookups list each severity once"""
+        lookups = self._filter(None).lookups(None, None)
+        values = [value for value, _ in lookups]
+        assert values == ["10", "20", "30", "40", "50"]
+
+    def test_queryset_filters_by_level_value(self):
+        """Test the filter keeps entries at or above the chosen severity"""
+        LogEntry.objects.create(level="INFO", message="filter-info")
+        LogEntry.objects.create(level="ERROR", message="filter-error")
+
+        queryset = LogEntry.objects.filter(message__startswith="filter-")
+        filtered = self._filter("40").queryset(None, queryset)
+        assert list(filtered.values_list("message", flat=True)) == ["filter-error"]
+
+    def test_queryset_without_value(self):
+        """Test the filter is a no-op without a value"""
+        queryset = LogEntry.objects.all()
+        assert self._filter(None).queryset(None, queryset) is queryset
+
+
 # URL configuration for tests
 urlpatterns = test_admin_urlpatterns
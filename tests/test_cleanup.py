@@ -0,0 +1,355 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models.signals import post_delete
+from django.test import override_settings
+from django.utils import timezone
+
+import pytest
+
+from logmancer.cleanup import (
+    RetentionPolicy,
+    backfill_level_values,
+    build_retention_policies,
+    can_raw_delete,
+    delete_in_batches,
+    plan_retention,
+)
+from logmancer.models import LogEntry
+from logmancer.signals import log_model_delete
+
+
+def make_logs(count, days_old=0):
+    LogEntry.objects.bulk_create(
+        [
+            LogEntry(
+                message=f"Log {i}",
+                source="batch",
+                timestamp=timezone.now() - timedelta(days=days_old),
+            )
+            for i in range(count)
+        ]
+    )
+
+
+def batch_logs():
+    return LogEntry.objects.filter(source="batch")
+
+
+@pytest.mark.django_db
+class TestDeleteInBatches:
+    """Test chunked primary-key range deletes"""
+
+    def test_deletes_in_batches(self):
+        """Test rows are deleted in ranges of batch_size and counted"""
+        make_logs(25)
+        progress = []
+
+        total = delete_in_batches(batch_logs(), batch_size=10, progress=progress.append)
+
+        assert total == 25
+        assert [p.deleted for p in progress] == [10, 10, 5]
+        assert progress[-1].total == 25
+        assert not batch_logs().exists()
+
+    def test_only_matching_rows_are_deleted(self):
+        """Test rows inside a pk range that do not match the filter are kept"""
+        make_logs(3, days_old=40)
+        make_logs(2)
+        make_logs(3, days_old=40)
+        old = batch_logs().filter(timestamp__lt=timezone.now() - timedelta(days=30))
+
+        assert delete_in_batches(old, batch_size=2) == 6
+        assert batch_logs().count() == 2
+
+    def test_start_pk_resumes(self):
+        """Test rows below start_pk are left alone"""
+        make_logs(10)
+        pks = list(batch_logs().order_by("pk").values_list("pk", flat=True))
+
+        assert delete_in_batches(batch_logs(), batch_size=3, start_pk=pks[6]) == 4
+        assert list(batch_logs().order_by("pk").values_list("pk", flat=True)) == pks[:6]
+
+    def test_sleep_between_batches(self):
+        """Test the optional pause runs between full batches only"""
+        make_logs(5)
+        with patch("logmancer.cleanup.time.sleep") as mock_sleep:
+            delete_in_batches(batch_logs(), batch_size=2, sleep=0.5)
+
+        assert mock_sleep.call_count == 2
+        mock_sleep.assert_called_with(0.5)
+
+    def test_empty_queryset(self):
+        """Test nothing happens without matching rows"""
+        assert delete_in_batches(LogEntry.objects.none()) == 0
+
+
+@pytest.mark.django_db
+class TestRawDelete:
+    """Test the Collector is bypassed when deletes have no side effects"""
+
+    def test_log_entry_can_be_raw_deleted(self):
+        """Test Logmancer's own delete receiver does not block raw deletes"""
+        assert can_raw_delete(LogEntry.objects.all()) is True
+
+    def test_own_receiver_is_reconnected(self):
+        """Test the check leaves the signal receiver connected"""
+        can_raw_delete(LogEntry.objects.all())
+        assert post_delete.disconnect(log_model_delete) is True
+        post_delete.connect(log_model_delete)
+
+    def test_foreign_listener_blocks_raw_delete(self):
+        """Test other post_delete listeners keep the Collector path"""
+
+        def listener(sender, **kwargs):
+            pass
+
+        post_delete.connect(listener, sender=LogEntry)
+        try:
+            assert can_raw_delete(LogEntry.objects.all()) is False
+        finally:
+            post_delete.disconnect(listener, sender=LogEntry)
+
+    def test_batches_use_raw_delete(self):
+        """Test rows are deleted without QuerySet.delete"""
+        make_logs(5)
+        with patch("django.db.models.query.QuerySet.delete") as mock_delete:
+            assert delete_in_batches(batch_logs(), batch_size=2) == 5
+
+        mock_delete.assert_not_called()
+        assert not batch_logs().exists()
+
+    def test_collector_fallback(self):
+        """Test raw=False deletes through the Collector"""
+        make_logs(3)
+        assert delete_in_batches(batch_logs(), batch_size=2, raw=False) == 3
+        assert not batch_logs().exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cleanup_batches_without_count(capsys):
+    LogEntry.objects.all().delete()
+    make_logs(5, days_old=40)
+
+    with patch("django.db.models.query.QuerySet.count") as mock_count:
+        call_command("logmancer_cleanup", batch_size=2)
+
+    mock_count.assert_not_called()
+    out = capsys.readouterr().out
+    assert out.count("default: deleted") == 3
+    assert "resume with --start-pass default --start-pk" in out
+    assert "Deleted 5 log entries" in out
+    assert not batch_logs().exists()
+
+
+class TestRetentionPolicy:
+    """Test retention policy parsing"""
+
+    def test_label_and_filters(self):
+        """Test levels, sources and status classes are combined"""
+        policy = RetentionPolicy.from_config(
+            {"level": ["error", "CRITICAL"], "source": "middleware", "status": "5xx", "days": 180}
+        )
+        assert policy.days == 180
+        assert policy.label == "level=ERROR,CRITICAL source=middleware status=5xx"
+
+    def test_invalid_policies_are_skipped(self):
+        """Test policies without days or filters are ignored"""
+        policies = build_retention_policies(
+            [
+                {"level": "INFO"},
+                {"days": 3},
+                {"min_level": "NOPE", "days": 3},
+                {"days": -1, "level": "INFO"},
+            ]
+        )
+        assert policies == []
+
+    def test_duplicate_policies_are_skipped(self):
+        """Test a policy repeating earlier filters is ignored so pass labels stay unique"""
+        policies = build_retention_policies(
+            [
+                {"source": "signal", "days": 14},
+                {"level": "ERROR", "days": 180},
+                {"source": ["signal"], "days": 3},
+            ]
+        )
+        assert [(policy.label, policy.days) for policy in policies] == [
+            ("source=signal", 14),
+            ("level=ERROR", 180),
+        ]
+
+
+@pytest.mark.django_db
+class TestPlanRetention:
+    """Test per-policy retention passes"""
+
+    def make_log(self, days_old, **fields):
+        log = LogEntry.objects.create(message="policy", **fields)
+        LogEntry.objects.filter(pk=log.pk).update(
+            timestamp=timezone.now() - timedelta(days=days_old)
+        )
+        return log.pk
+
+    def test_first_matching_policy_wins(self):
+        """Test rows are kept for the retention of the first policy they match"""
+        error = self.make_log(20, level="ERROR", source="signal")
+        signal = self.make_log(20, level="INFO", source="signal")
+        request = self.make_log(5, level="INFO", source="middleware", status_code=200)
+        server_error = self.make_log(5, level="INFO", source="middleware", status_code=503)
+        other = self.make_log(20, level="INFO", source="custom")
+
+        policies = build_retention_policies(
+            [
+                {"min_level": "ERROR", "days": 180},
+                {"source": "signal", "days": 14},
+                {"source": "middleware", "status": "2xx", "days": 3},
+            ]
+        )
+        deleted = set()
+        for _, _, queryset in plan_retention(policies, 30, timezone.now()):
+            deleted |= set(queryset.filter(message="policy").values_list("pk", flat=True))
+
+        assert deleted == {signal, request}
+        assert not {error, server_error, other} & deleted
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(
+    LOGMANCER={
+        "RETENTION_POLICIES": [
+            {"level": ["ERROR", "CRITICAL"], "days": 180},
+            {"source": "middleware", "level": "INFO", "days": 3},
+        ]
+    }
+)
+def test_cleanup_applies_policies(capsys):
+    LogEntry.objects.all().delete()
+    make_logs(2, days_old=40)
+    LogEntry.objects.bulk_create(
+        [
+            LogEntry(message="error", level="ERROR", timestamp=timezone.now() - timedelta(days=40)),
+            LogEntry(
+                message="request",
+                source="middleware",
+                timestamp=timezone.now() - timedelta(days=5),
+            ),
+        ]
+    )
+
+    call_command("logmancer_cleanup")
+
+    assert set(LogEntry.objects.values_list("message", flat=True)) == {
+        "error",
+        "3 old logs cleaned up (>30 days)",
+    }
+    out = capsys.readouterr().out
+    assert "Deleted 1 entries matching level=INFO source=middleware older than 3 days" in out
+
+
+def make_stale_logs():
+    """Rows written before level_value existed hold its default"""
+    old = timezone.now() - timedelta(days=40)
+    LogEntry.objects.bulk_create(
+        [
+            LogEntry(message="stale error", level="ERROR", source="stale", timestamp=old),
+            LogEntry(message="stale debug", level="DEBUG", source="stale", timestamp=old),
+            LogEntry(message="stale info", level="INFO", source="stale", timestamp=old),
+        ]
+    )
+    LogEntry.objects.filter(source="stale").update(level_value=20)
+
+
+@pytest.mark.django_db
+class TestBackfillLevelValues:
+    """Test recomputing level_value for rows that predate the column"""
+
+    def test_stale_rows(self):
+        """Test only rows whose level is not INFO count as stale"""
+        make_stale_logs()
+        stale = LogEntry.objects.filter(source="stale").stale_level_values()
+        assert set(stale.values_list("message", flat=True)) == {"stale error", "stale debug"}
+
+    def test_backfill_in_batches(self):
+        """Test stale rows are updated one batch at a time"""
+        make_stale_logs()
+        progress = []
+
+        assert backfill_level_values(batch_size=1, progress=progress.append) == 2
+        assert [p.total for p in progress] == [1, 2]
+        assert dict(
+            LogEntry.objects.filter(source="stale").values_list("level", "level_value")
+        ) == {
+            "ERROR": 40,
+            "DEBUG": 10,
+            "INFO": 20,
+        }
+        assert not LogEntry.objects.stale_level_values().exists()
+
+    def test_backfill_command(self, capsys):
+        """Test the command reports the number of updated rows"""
+        make_stale_logs()
+        call_command("logmancer_backfill_levels", batch_size=10)
+
+        assert "Backfilled level_value of 2 log entries" in capsys.readouterr().out
+        assert LogEntry.objects.min_level("ERROR").filter(source="stale").count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(LOGMANCER={"RETENTION_POLICIES": [{"min_level": "ERROR", "days": 180}]})
+def test_min_level_retention_refuses_stale_rows(capsys):
+    make_stale_logs()
+
+    with pytest.raises(CommandError, match="logmancer_backfill_levels"):
+        call_command("logmancer_cleanup")
+    assert LogEntry.objects.filter(message="stale error").exists()
+
+    call_command("logmancer_cleanup", dry_run=True)
+    assert "Run logmancer_backfill_levels first" in capsys.readouterr().out
+
+    call_command("logmancer_backfill_levels")
+    call_command("logmancer_cleanup")
+    assert set(LogEntry.objects.filter(source="stale").values_list("message", flat=True)) == {
+        "stale error"
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(LOGMANCER={"RETENTION_POLICIES": [{"source": "signal", "days": 14}]})
+def test_cleanup_resumes_from_pass(capsys):
+    LogEntry.objects.all().delete()
+    make_logs(4, days_old=40)
+    LogEntry.objects.create(message="signal", source="signal")
+    LogEntry.objects.filter(source="signal").update(timestamp=timezone.now() - timedelta(days=20))
+    pks = list(batch_logs().order_by("pk").values_list("pk", flat=True))
+
+    call_command("logmancer_cleanup", start_pass="default", start_pk=pks[2])
+
+    # The signal pass already finished, the default pass resumes from start_pk
+    assert set(LogEntry.objects.exclude(source="cleanup").values_list("message", flat=True)) == {
+        "signal",
+        "Log 0",
+        "Log 1",
+    }
+    assert "resume with --start-pass default --start-pk" in capsys.readouterr().out
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(LOGMANCER={"RETENTION_POLICIES": [{"source": "signal", "days": 14}]})
+def test_cleanup_start_pk_applies_to_first_pass():
+    LogEntry.objects.all().delete()
+    make_logs(2, days_old=40)
+    log = LogEntry.objects.create(message="signal", source="signal")
+    LogEntry.objects.filter(pk=log.pk).update(timestamp=timezone.now() - timedelta(days=20))
+
+    call_command("logmancer_cleanup", start_pk=log.pk + 1)
+
+    # start_pk skips the signal row, the default pass still deletes everything
+    assert set(LogEntry.objects.exclude(source="cleanup").values_list("message", flat=True)) == {
+        "signal"
+    }
+
+    with pytest.raises(CommandError, match="Unknown retention pass"):
+        call_command("logmancer_cleanup", start_pass="level=DEBUG")
@@ -1,11 +1,15 @@
+import json
 from datetime import timedelta
+from unittest.mock import MagicMock, Mock, patch
 
 from django.core.management import call_command
 from django.utils import timezone
 
 import pytest
 
-from logmancer.models import LogEntry
+from logmancer.models import LogEntry, NotificationOutbox
+from logmancer.notifications.dispatcher import NotificationDispatcher
+from logmancer.partitions import Partition
 
 
 @pytest.mark.django_db(transaction=True)
@@ -51,3 +55,39 @@ def test_cleanup_dry_run(capsys):
 
     out = capsys.readouterr().out
     assert "would be deleted" in out
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cleanup_drops_expired_partitions(capsys):
+    partitioner = MagicMock()
+    partitioner.is_partitioned.return_value = True
+    partitioner.drop_before.return_value = [Partition("logmancer_logentry_p202601", None, None)]
+
+    with patch(
+        "logmancer.management.commands.logmancer_cleanup.get_partitioner",
+        return_value=partitioner,
+    ):
+        call_command("logmancer_cleanup")
+
+    partitioner.drop_before.assert_called_once()
+    partitioner.ensure.assert_called_once_with(3)
+    assert "Partition logmancer_logentry_p202601 dropped" in capsys.readouterr().out
+
+
+@pytest.mark.django_db
+def test_notification_stats(capsys):
+    dispatcher = NotificationDispatcher(manager=Mock(backends=[]), stats_interval=10)
+    dispatcher.publish_stats()
+    entry = LogEntry.objects.create(message="Alert", level="ERROR")
+    NotificationOutbox.objects.create(log_entry=entry, backend="slack")
+    NotificationOutbox.objects.create(log_entry=entry, backend="email", attempts=5)
+
+    call_command("logmancer_notification_stats")
+    out = capsys.readouterr().out
+    assert "0 enqueued, 0 sent" in out
+    assert "Outbox: 2 rows, 1 due, 0 retrying, 1 given up" in out
+
+    call_command("logmancer_notification_stats", json=True)
+    stats = json.loads(capsys.readouterr().out)
+    assert stats["outbox"]["dead"] == 1
+    assert all(process["dropped"] == 0 for process in stats["processes"].values())
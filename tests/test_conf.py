@@ -2,13 +2,17 @@ from django.contrib.admin.models import LogEntry as AdminLogEntry
 from django.contrib.auth.models import Group, User
 from django.test import override_settings
 
+import pytest
+
 from logmancer.conf import (
     DEFAULTS,
+    LogmancerSettings,
     get,
     get_bool,
     get_dict,
     get_int,
     get_list,
+    get_settings,
     should_exclude_model,
     should_exclude_path,
 )
@@ -326,3 +330,48 @@ class TestDefaultsConstant:
         assert DEFAULTS["DEFAULT_LOG_LEVEL"] == "INFO"
         assert "logmancer.LogEntry" in DEFAULTS["SIGNAL_EXCLUDE_MODELS"]
         assert "admin.LogEntry" in DEFAULTS["SIGNAL_EXCLUDE_MODELS"]
+
+
+class TestSettingsSnapshot:
+    """Test the cached LogmancerSettings snapshot"""
+
+    def test_snapshot_is_cached(self):
+        """Test get_settings returns the same object until settings change"""
+        assert get_settings() is get_settings()
+
+    def test_snapshot_rebuilt_on_setting_changed(self):
+        """Test override_settings invalidates the snapshot"""
+        before = get_settings()
+        with override_settings(LOGMANCER={"CLEANUP_AFTER_DAYS": 7}):
+            inside = get_settings()
+            assert inside is not before
+            assert get_int("CLEANUP_AFTER_DAYS") == 7
+        assert get_int("CLEANUP_AFTER_DAYS") != 7
+
+    def test_snapshot_is_immutable(self):
+        """Test snapshot values cannot be modified"""
+        snapshot = get_settings()
+        with pytest.raises(TypeError):
+            snapshot.values["CLEANUP_AFTER_DAYS"] = 1
+        with pytest.raises(AttributeError):
+            snapshot.sensitive_keys = frozenset()
+
+    @override_settings(
+        LOGMANCER={
+            "LOG_SENSITIVE_KEYS": ["Password", "API_KEY"],
+            "SIGNAL_EXCLUDE_MODELS": ["Auth.User"],
+            "PATH_EXCLUDE_PREFIXES": ("/health/",),
+        }
+    )
+    def test_snapshot_precomputed_lookups(self):
+        """Test lookups are normalized once when the snapshot is built"""
+        snapshot = get_settings()
+        assert snapshot.sensitive_keys == frozenset({"password", "api_key"})
+        assert "auth.user" in snapshot.exclude_models
+        assert "logmancer.logentry" in snapshot.exclude_models
+        assert snapshot.path_exclude_matcher.patterns == ("/health/",)
+
+    def test_build_ignores_invalid_lists(self):
+        """Test non-list values produce empty lookups"""
+        snapshot = LogmancerSettings.build({"LOG_SENSITIVE_KEYS": "password"})
+        assert snapshot.sensitive_keys == frozenset()
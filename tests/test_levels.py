@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 import pytest
 
 from logmancer.levels import LevelInfo, LogLevel
@@ -137,6 +139,31 @@ class TestLogLevelClassMethods:
         with pytest.raises(ValueError, match="Unknown log level value"):
             LogLevel.from_value(999)
 
+    def test_from_value_alias_returns_first_definition(self):
+        """Test FATAL shares CRITICAL's value and from_value returns CRITICAL"""
+        assert LogLevel.from_value(50) is LogLevel.CRITICAL
+        assert LogLevel.from_name("FATAL") is LogLevel.FATAL
+
+    def test_lookup(self):
+        """Test lookup returns None instead of raising"""
+        assert LogLevel.lookup("ERROR") is LogLevel.ERROR
+        assert LogLevel.lookup("error") is LogLevel.ERROR
+        assert LogLevel.lookup("INVALID") is None
+        assert LogLevel.lookup(None) is None
+
+    def test_severity(self):
+        """Test severity maps level names to numeric values"""
+        assert LogLevel.severity("WARNING") == 30
+        assert LogLevel.severity("critical") == 50
+        assert LogLevel.severity("INVALID") == 0
+        assert LogLevel.severity("INVALID", default=-1) == -1
+
+    def test_lookups_do_not_iterate_members(self):
+        """Test name and value lookups are served from precomputed maps"""
+        with patch.object(type(LogLevel), "__iter__", side_effect=AssertionError("linear scan")):
+            assert LogLevel.from_name("DEBUG") is LogLevel.DEBUG
+            assert LogLevel.from_value(40) is LogLevel.ERROR
+
     def test_get_choices(self):
         """Test get_choices returns proper Django choices"""
         choices = LogLevel.get_choices()
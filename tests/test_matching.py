@@ -0,0 +1,92 @@
+from django.test import override_settings
+
+from logmancer.conf import should_exclude_path
+from logmancer.matching import PathMatcher
+
+
+class TestPathMatcher:
+    """Test PathMatcher pattern handling"""
+
+    def test_prefix_match(self):
+        """Test plain prefixes match the start of the path"""
+        matcher = PathMatcher(["/static/", "/health"])
+        assert matcher.match("/static/css/app.css") == "/static/"
+        assert matcher.match("/healthz") == "/health"
+        assert matcher.match("/api/health") is None
+
+    def test_many_prefixes(self):
+        """Test a large prefix list is matched correctly"""
+        prefixes = [f"/internal/service-{i}/" for i in range(500)]
+        matcher = PathMatcher(prefixes)
+        assert matcher.matches("/internal/service-499/ping") is True
+        assert matcher.matches("/internal/service-500/ping") is False
+
+    def test_shortest_prefix_wins(self):
+        """Test overlapping prefixes return the shortest one"""
+        matcher = PathMatcher(["/api/v1/internal/", "/api/"])
+        assert matcher.match("/api/v1/internal/jobs") == "/api/"
+
+    def test_glob_pattern(self):
+        """Test glob patterns match the whole path"""
+        matcher = PathMatcher(["/api/*/health", "*.css"])
+        assert matcher.match("/api/v2/health") == "/api/*/health"
+        assert matcher.match("/static/site.css") == "*.css"
+        assert matcher.match("/api/v2/health/deep") is None
+
+    def test_regex_pattern(self):
+        """Test re: patterns match from the start of the path"""
+        matcher = PathMatcher([r"re:/v\d+/metrics"])
+        assert matcher.match("/v12/metrics/cpu") == r"re:/v\d+/metrics"
+        assert matcher.match("/api/v12/metrics") is None
+
+    def test_mixed_patterns_report_the_matching_one(self):
+        """Test the matched pattern is reported when several kinds are configured"""
+        matcher = PathMatcher(["/static/", "/api/*/ping", r"re:/admin/(jsi18n|login)/"])
+        assert matcher.match("/admin/login/") == r"re:/admin/(jsi18n|login)/"
+        assert matcher.match("/api/x/ping") == "/api/*/ping"
+
+    def test_invalid_regex_is_ignored(self):
+        """Test invalid regular expressions are skipped"""
+        matcher = PathMatcher(["re:/bad[", "/ok/"])
+        assert matcher.matches("/ok/path") is True
+        assert matcher.matches("/bad[") is False
+
+    def test_inline_flags_are_kept(self):
+        """Test a regex with a global inline flag does not break the other patterns"""
+        matcher = PathMatcher(["re:(?i)^/health", "/api/*/status", "/static/"])
+        assert matcher.match("/HEALTH/live") == "re:(?i)^/health"
+        assert matcher.match("/api/orders/status") == "/api/*/status"
+        assert matcher.match("/static/app.js") == "/static/"
+        assert matcher.matches("/api/orders/") is False
+
+    def test_empty_matcher(self):
+        """Test an empty matcher matches nothing"""
+        matcher = PathMatcher([])
+        assert not matcher
+        assert matcher.matches("/anything/") is False
+        assert matcher.matches(None) is False
+
+    def test_non_string_patterns_are_ignored(self):
+        """Test invalid entries do not break the matcher"""
+        matcher = PathMatcher([None, 42, "", "/valid/"])
+        assert matcher.patterns == ("/valid/",)
+
+
+class TestShouldExcludePathPatterns:
+    """Test PATH_EXCLUDE_PREFIXES with glob and regex patterns"""
+
+    @override_settings(
+        LOGMANCER={"PATH_EXCLUDE_PREFIXES": ["/static/", "/api/*/health", "re:/v\\d+/"]}
+    )
+    def test_exclusion_patterns(self):
+        """Test prefixes, globs and regexes can be mixed in the exclusion list"""
+        assert should_exclude_path("/static/img.png") is True
+        assert should_exclude_path("/api/orders/health") is True
+        assert should_exclude_path("/v2/users/") is True
+        assert should_exclude_path("/api/orders/") is False
+
+    @override_settings(LOGMANCER={"PATH_EXCLUDE_PREFIXES": ["re:(?i)^/health", "/static/"]})
+    def test_inline_flag_pattern(self):
+        """Test a case-insensitive regex can be used in the exclusion list"""
+        assert should_exclude_path("/Health/ready") is True
+        assert should_exclude_path("/api/") is False
@@ -1,11 +1,12 @@
 import json
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from django.contrib.auth.models import User
 from django.http import HttpResponse
 from django.test import Client, RequestFactory, TransactionTestCase, override_settings
 
 import pytest
+from asgiref.sync import iscoroutinefunction
 
 from logmancer.middleware import DBLoggingMiddleware
 from logmancer.models import LogEntry
@@ -362,7 +363,7 @@ class TestMiddlewareAsync(BaseMiddlewareTest):
         request = RequestFactory().get("/test/")
         request.user = None
 
-        with patch.object(middleware, "log_request"):
+        with patch.object(middleware, "alog_request"):
             response = await middleware.__acall__(request)
             assert response.status_code == 200
 
@@ -388,7 +389,7 @@ class TestMiddlewareAsync(BaseMiddlewareTest):
         request = RequestFactory().get("/test/")
         request.user = user
 
-        with patch.object(middleware, "log_request"):
+        with patch.object(middleware, "alog_request"):
             response = await middleware.__acall__(request)
             assert response.status_code == 200
 
@@ -396,6 +397,140 @@ class TestMiddlewareAsync(BaseMiddlewareTest):
         assert get_current_user() is None
 
 
+@pytest.mark.django_db(transaction=True)
+class TestMiddlewareNativeAsync(BaseMiddlewareTest):
+    """Test the middleware runs natively under ASGI"""
+
+    def test_async_capable_flags(self):
+        """Test middleware declares both sync and async support"""
+        assert DBLoggingMiddleware.sync_capable is True
+        assert DBLoggingMiddleware.async_capable is True
+
+    def test_coroutine_marking(self):
+        """Test middleware is marked as coroutine only with an async get_response"""
+
+        async def async_response(request):
+            return HttpResponse("OK")
+
+        assert iscoroutinefunction(DBLoggingMiddleware(async_response)) is True
+        assert iscoroutinefunction(DBLoggingMiddleware(lambda request: HttpResponse())) is False
+
+    @pytest.mark.asyncio
+    async def test_async_call_persists_log(self):
+        """Test awaiting the middleware writes the log through the async ORM"""
+
+        async def async_response(request):
+            return HttpResponse("OK")
+
+        middleware = DBLoggingMiddleware(async_response)
+        request = RequestFactory().get("/async/native/")
+        request.user = None
+
+        response = await middleware(request)
+        assert response.status_code == 200
+
+        log = await LogEntry.objects.filter(path="/async/native/").afirst()
+        assert log is not None
+        assert log.source == "middleware"
+        assert log.actor_type == "system"
+
+    @pytest.mark.asyncio
+    async def test_async_call_uses_auser(self):
+        """Test the async path resolves the user with request.auser"""
+
+        async def async_response(request):
+            return HttpResponse("OK")
+
+        middleware = DBLoggingMiddleware(async_response)
+        request = RequestFactory().get("/async/auser/")
+        user = MagicMock(is_authenticated=True)
+        request.auser = AsyncMock(return_value=user)
+
+        assert await middleware.aget_user_from_request(request) is user
+        request.auser.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_async_call_with_background_writes(self):
+        """Test the async path hands entries to the background writer without awaiting the DB"""
+
+        async def async_response(request):
+            return HttpResponse("OK")
+
+        middleware = DBLoggingMiddleware(async_response)
+        request = RequestFactory().get("/async/background/")
+        request.user = None
+
+        with override_settings(LOGMANCER={"MIDDLEWARE_BACKGROUND_WRITES": True}):
+            with patch("logmancer.writer.submit_log") as mock_submit:
+                with patch.object(LogEntry.objects, "acreate") as mock_acreate:
+                    await middleware(request)
+
+        mock_submit.assert_called_once()
+        assert mock_submit.call_args.kwargs["path"] == "/async/background/"
+        mock_acreate.assert_not_called()
+
+
+@pytest.mark.django_db
+class TestMiddlewareTiming(BaseMiddlewareTest):
+    """Test request duration and DB time capture"""
+
+    def call(self, get_response, path):
+        middleware = DBLoggingMiddleware(get_response)
+        request = RequestFactory().get(path)
+        request.user = None
+        middleware(request)
+        return LogEntry.objects.get(path=path)
+
+    def test_duration_is_recorded(self):
+        """Test the wall-clock duration is stored without DB timing by default"""
+        log = self.call(lambda request: HttpResponse(), "/timing/plain/")
+
+        assert log.duration_ms is not None and log.duration_ms >= 0
+        assert log.db_query_count is None
+        assert log.db_time_ms is None
+
+    @override_settings(LOGMANCER={"LOG_DB_TIMING": True})
+    def test_db_timing(self):
+        """Test queries run by the view are counted and timed"""
+
+        def view(request):
+            User.objects.count()
+            User.objects.exists()
+            return HttpResponse()
+
+        log = self.call(view, "/timing/db/")
+
+        assert log.db_query_count == 2
+        assert 0 <= log.db_time_ms <= log.duration_ms
+
+    def test_slowest_queryset(self):
+        """Test slowest() orders timed rows by duration"""
+        LogEntry.objects.create(message="fast", duration_ms=5)
+        LogEntry.objects.create(message="slow", duration_ms=500)
+        LogEntry.objects.create(message="untimed")
+
+        assert list(LogEntry.objects.slowest().values_list("message", flat=True)[:2]) == [
+            "slow",
+            "fast",
+        ]
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db(transaction=True)
+    async def test_async_duration_is_recorded(self):
+        """Test the async path records the duration"""
+
+        async def async_response(request):
+            return HttpResponse("OK")
+
+        middleware = DBLoggingMiddleware(async_response)
+        request = RequestFactory().get("/timing/async/")
+        request.user = None
+        await middleware(request)
+
+        log = await LogEntry.objects.aget(path="/timing/async/")
+        assert log.duration_ms is not None
+
+
 @pytest.mark.django_db
 class TestMiddlewareMasking(BaseMiddlewareTest):
     """Test sensitive data masking"""
@@ -409,7 +544,7 @@ class TestMiddlewareMasking(BaseMiddlewareTest):
             {"token": "abc123", "email": "test@example.com"},
         ]
 
-        with patch("logmancer.middleware.get_list", return_value=["password", "token"]):
+        with override_settings(LOGMANCER={"LOG_SENSITIVE_KEYS": ["password", "token"]}):
             masked = middleware.mask_sensitive_data(data)
             assert masked[0]["password"] == "****"
             assert masked[1]["token"] == "****"
@@ -462,6 +597,25 @@ class TestMiddlewareJSONParsing(BaseMiddlewareTest):
         assert log is not None
         assert log.meta["POST"] == {}
 
+    @override_settings(LOGMANCER={"META_MAX_FIELD_BYTES": 16, "META_MAX_LIST_LENGTH": 2})
+    def test_log_request_caps_meta_size(self):
+        """Test large bodies are truncated and the truncation recorded"""
+        middleware = DBLoggingMiddleware(lambda x: HttpResponse())
+
+        body = {"note": "x" * 100, "items": [1, 2, 3, 4], "password": "y" * 100}
+        request = RequestFactory().post(
+            "/api/capped/", data=json.dumps(body), content_type="application/json"
+        )
+        request.user = None
+
+        middleware.log_request(request, HttpResponse(status=200))
+
+        log = LogEntry.objects.get(path="/api/capped/")
+        assert log.meta["POST"]["note"] == "x" * 16
+        assert log.meta["POST"]["items"] == [1, 2]
+        assert log.meta["POST"]["password"] == "****"
+        assert log.meta["_truncated"] == {"POST.note": "100 bytes", "POST.items": "4 items"}
+
     def test_log_request_with_exception_in_logging(self):
         """Test logging handles internal errors gracefully"""
         middleware = DBLoggingMiddleware(lambda x: HttpResponse())
@@ -471,13 +625,85 @@ class TestMiddlewareJSONParsing(BaseMiddlewareTest):
         response = HttpResponse(status=200)
 
         with patch("logmancer.middleware.should_exclude_path", return_value=False):
-            with patch(
-                "logmancer.middleware.LogEntry.objects.create", side_effect=Exception("DB error")
-            ):
+            with patch("logmancer.middleware.write_request_log", side_effect=Exception("DB error")):
                 # Should not raise exception
                 middleware.log_request(request, response)
 
 
+@pytest.mark.django_db
+class TestMiddlewareBodyCapture(BaseMiddlewareTest):
+    """Test request body capture settings"""
+
+    def log_post(self, path, data, content_type="application/json"):
+        middleware = DBLoggingMiddleware(lambda x: HttpResponse())
+        request = RequestFactory().post(path, data=data, content_type=content_type)
+        request.user = None
+        middleware.log_request(request, HttpResponse(status=200))
+        return LogEntry.objects.get(path=path)
+
+    @override_settings(LOGMANCER={"LOG_REQUEST_BODY": False})
+    def test_body_capture_disabled(self):
+        """Test the body is not read when LOG_REQUEST_BODY is off"""
+        log = self.log_post("/api/off/", json.dumps({"a": 1}))
+        assert log.meta["POST"] == {}
+
+    @override_settings(LOGMANCER={"BODY_CAPTURE_PATHS": ["/api/orders/"]})
+    def test_body_capture_paths(self):
+        """Test only matching paths have their body captured"""
+        assert self.log_post("/api/orders/", json.dumps({"a": 1})).meta["POST"] == {"a": 1}
+        assert self.log_post("/api/users/", json.dumps({"a": 1})).meta["POST"] == {}
+
+    @override_settings(LOGMANCER={"BODY_CAPTURE_CONTENT_TYPES": ["Application/JSON"]})
+    def test_body_capture_content_types(self):
+        """Test only listed content types have their body captured"""
+        assert self.log_post("/api/json/", json.dumps({"a": 1})).meta["POST"] == {"a": 1}
+        log = self.log_post("/api/text/", "a=1", content_type="application/x-www-form-urlencoded")
+        assert log.meta["POST"] == {}
+
+    @override_settings(LOGMANCER={"BODY_MAX_BYTES": 10})
+    def test_large_json_body_is_not_parsed(self):
+        """Test JSON bodies over BODY_MAX_BYTES are stored as a truncated string"""
+        body = json.dumps({"payload": "x" * 50})
+        with patch("logmancer.middleware.json.loads", wraps=json.loads) as mock_loads:
+            log = self.log_post("/api/big/", body)
+
+        assert not any(isinstance(c.args[0], bytes) for c in mock_loads.call_args_list)
+        assert log.meta["POST"] == body[:10]
+        assert log.meta["_truncated"] == {"POST": f"{len(body)} bytes"}
+
+    @override_settings(LOGMANCER={"BODY_MAX_BYTES": 10})
+    def test_large_body_is_not_read_whole(self):
+        """Test only BODY_MAX_BYTES + 1 bytes of an unread body are read"""
+        body = json.dumps({"payload": "x" * 5000})
+        middleware = DBLoggingMiddleware(lambda x: HttpResponse())
+        request = RequestFactory().post("/api/upload/", data=body, content_type="application/json")
+        request.user = None
+
+        with patch.object(request, "read", wraps=request.read) as mock_read:
+            middleware.log_request(request, HttpResponse(status=200))
+
+        mock_read.assert_called_once_with(11)
+        assert not hasattr(request, "_body")
+        log = LogEntry.objects.get(path="/api/upload/")
+        assert log.meta["POST"] == body[:10]
+        assert log.meta["_truncated"] == {"POST": f"{len(body)} bytes"}
+
+    @override_settings(LOGMANCER={"BODY_MAX_BYTES": 10})
+    def test_large_form_body_is_skipped(self):
+        """Test unparsed form bodies over BODY_MAX_BYTES are not parsed"""
+        body = "field=" + "x" * 50
+        log = self.log_post("/api/form/", body, content_type="application/x-www-form-urlencoded")
+
+        assert log.meta["POST"] == {}
+        assert log.meta["_truncated"] == {"POST": f"{len(body)} bytes"}
+
+    @override_settings(LOGMANCER={"BODY_FORMAT": "raw"})
+    def test_raw_body_format(self):
+        """Test BODY_FORMAT raw stores the body text without parsing"""
+        log = self.log_post("/api/raw/", '{"a": 1}')
+        assert log.meta["POST"] == '{"a": 1}'
+
+
 @pytest.mark.django_db
 class TestMiddlewareSynchronous(BaseMiddlewareTest):
     """Test middleware with synchronous logging (no transaction.on_commit)"""
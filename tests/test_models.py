@@ -1,13 +1,17 @@
+import json
+import sqlite3
 import time
 from datetime import date, datetime
 from decimal import Decimal
+from unittest.mock import patch
 from uuid import uuid4
 
 from django.contrib.auth import get_user_model
+from django.db import connection
 
 import pytest
 
-from logmancer.models import LogEntry, SafeJSONField
+from logmancer.models import LogEntry, SafeJSONEncoder, SafeJSONField
 
 User = get_user_model()
 
@@ -105,6 +109,89 @@ class TestSafeJSONField:
         assert result["list"] == [1, 2, 3]
 
 
+@pytest.mark.django_db
+class TestSafeJSONEncoder:
+    """Test single-pass encoding of meta payloads"""
+
+    def test_encoder_handles_special_types(self):
+        """Test datetimes, Decimals and UUIDs are converted while encoding"""
+        test_uuid = uuid4()
+        encoded = SafeJSONEncoder().encode(
+            {"when": datetime(2024, 1, 1, 12, 30), "price": Decimal("1.5"), "id": test_uuid}
+        )
+        assert json.loads(encoded) == {
+            "when": "2024-01-01T12:30:00",
+            "price": 1.5,
+            "id": str(test_uuid),
+        }
+
+    def test_encoder_without_orjson(self):
+        """Test the stdlib path produces the same result"""
+        data = {"when": date(2024, 1, 1), "price": Decimal("2.25"), 1: "int key"}
+        with_orjson = json.loads(SafeJSONEncoder().encode(data))
+
+        with patch("logmancer.models.orjson", None):
+            without_orjson = json.loads(SafeJSONEncoder().encode(data))
+
+        assert (
+            with_orjson == without_orjson == {"when": "2024-01-01", "price": 2.25, "1": "int key"}
+        )
+
+    def test_encoder_falls_back_for_big_integers(self):
+        """Test values orjson rejects are still encoded"""
+        assert json.loads(SafeJSONEncoder().encode({"big": 2**70})) == {"big": 2**70}
+
+    def test_field_uses_encoder(self):
+        """Test SafeJSONField is configured with SafeJSONEncoder"""
+        assert LogEntry._meta.get_field("meta").encoder is SafeJSONEncoder
+
+    def test_save_does_not_round_trip(self):
+        """Test saving meta does not decode the payload again"""
+        with patch("logmancer.models.json.loads") as mock_loads:
+            LogEntry.objects.create(message="Single pass", meta={"price": Decimal("3.5")})
+            mock_loads.assert_not_called()
+
+        log = LogEntry.objects.get(message="Single pass")
+        assert log.meta == {"price": 3.5}
+
+    def test_save_unencodable_meta(self):
+        """Test meta that cannot be encoded is stored as an empty dict"""
+        data = {}
+        data["self"] = data
+
+        log = LogEntry.objects.create(message="Circular", meta=data)
+        log.refresh_from_db()
+        assert log.meta == {}
+
+    def test_unencodable_meta_with_deferred_adapter(self):
+        """Test encoding errors surface before the query runs, as with PostgreSQL's Jsonb"""
+
+        class DeferredJSON:
+            def __init__(self, value, encoder):
+                self.value, self.encoder = value, encoder
+
+        # Like psycopg, sqlite3 only calls adapters when the query executes
+        sqlite3.register_adapter(DeferredJSON, lambda obj: json.dumps(obj.value, cls=obj.encoder))
+        circular = {}
+        circular["self"] = circular
+        try:
+            with patch.object(connection.ops, "adapt_json_value", DeferredJSON):
+                LogEntry.objects.create(message="Deferred circular", meta=circular)
+                LogEntry.objects.bulk_create(
+                    [
+                        LogEntry(message="Deferred batch", meta={("tuple", "key"): 1}),
+                        LogEntry(message="Deferred batch", meta={"ok": Decimal("1.5")}),
+                    ]
+                )
+        finally:
+            sqlite3.adapters.pop((DeferredJSON, sqlite3.PrepareProtocol), None)
+
+        assert LogEntry.objects.get(message="Deferred circular").meta == {}
+        assert sorted(
+            (log.meta for log in LogEntry.objects.filter(message="Deferred batch")), key=len
+        ) == [{}, {"ok": 1.5}]
+
+
 @pytest.mark.django_db
 class TestLogEntry:
     """Test LogEntry model"""
@@ -391,3 +478,48 @@ class TestLogEntryQueries:
 
         assert log1 in recent_logs
         assert log2 not in recent_logs
+
+
+@pytest.mark.django_db
+class TestLogEntrySeverity:
+    """Test the stored level_value column"""
+
+    def test_level_value_set_on_create(self):
+        """Test level_value follows the level on save"""
+        log = LogEntry.objects.create(level="WARNING", message="Warn")
+        log.refresh_from_db()
+        assert log.level_value == 30
+
+        log.level = "CRITICAL"
+        log.save()
+        log.refresh_from_db()
+        assert log.level_value == 50
+
+    def test_level_value_set_on_bulk_create(self):
+        """Test bulk_create also stores level_value"""
+        LogEntry.objects.bulk_create(
+            [LogEntry(level="ERROR", message="Bulk error"), LogEntry(level="DEBUG", message="Bulk")]
+        )
+        assert LogEntry.objects.get(message="Bulk error").level_value == 40
+        assert LogEntry.objects.get(message="Bulk").level_value == 10
+
+    def test_min_level_queryset(self):
+        """Test min_level returns entries at or above the level"""
+        LogEntry.objects.create(level="INFO", message="sev-info")
+        LogEntry.objects.create(level="WARNING", message="sev-warning")
+        LogEntry.objects.create(level="FATAL", message="sev-fatal")
+
+        messages = set(
+            LogEntry.objects.filter(message__startswith="sev-")
+            .min_level("warning")
+            .values_list("message", flat=True)
+        )
+        assert messages == {"sev-warning", "sev-fatal"}
+
+    def test_composite_indexes_declared(self):
+        """Test range and severity indexes are declared on the model"""
+        index_fields = {tuple(index.fields) for index in LogEntry._meta.indexes}
+        assert ("timestamp",) in index_fields
+        assert ("level_value", "timestamp") in index_fields
+        assert ("source", "timestamp") in index_fields
+        assert ("status_code", "timestamp") in index_fields
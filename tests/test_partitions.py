@@ -0,0 +1,235 @@
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from unittest.mock import MagicMock, patch
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import override_settings
+
+import pytest
+
+from logmancer.partitions import (
+    Partition,
+    PostgresPartitioner,
+    get_partitioner,
+    next_period,
+    parse_partition,
+    partition_name,
+    period_start,
+)
+
+UTC = dt_timezone.utc
+
+
+def make_partitioner(period="daily"):
+    connection = MagicMock(vendor="postgresql", alias="default")
+    connection.ops.quote_name = lambda name: f'"{name}"'
+    return PostgresPartitioner(connection, period)
+
+
+class TestPeriods:
+    """Test period arithmetic and naming"""
+
+    def test_period_start(self):
+        """Test moments are truncated to their period in UTC"""
+        moment = datetime(2026, 3, 15, 13, 45, tzinfo=UTC)
+        assert period_start("daily", moment) == datetime(2026, 3, 15, tzinfo=UTC)
+        assert period_start("monthly", moment) == datetime(2026, 3, 1, tzinfo=UTC)
+
+    def test_next_period(self):
+        """Test the next period crosses month and year ends"""
+        assert next_period("daily", datetime(2026, 2, 28, tzinfo=UTC)) == datetime(
+            2026, 3, 1, tzinfo=UTC
+        )
+        assert next_period("monthly", datetime(2026, 12, 1, tzinfo=UTC)) == datetime(
+            2027, 1, 1, tzinfo=UTC
+        )
+
+    def test_partition_name(self):
+        """Test partition names encode the period start"""
+        start = datetime(2026, 3, 5, tzinfo=UTC)
+        assert partition_name("t", "daily", start) == "t_p20260305"
+        assert partition_name("t", "monthly", start) == "t_p202603"
+
+    def test_parse_partition(self):
+        """Test partition bounds are parsed from pg_get_expr output"""
+        partition = parse_partition(
+            "t_p20260305",
+            "FOR VALUES FROM ('2026-03-05 00:00:00+00') TO ('2026-03-06 00:00:00+00')",
+        )
+        assert partition.start == datetime(2026, 3, 5, tzinfo=UTC)
+        assert partition.end == datetime(2026, 3, 6, tzinfo=UTC)
+
+        legacy = parse_partition("t_legacy", "FOR VALUES FROM (MINVALUE) TO ('2026-03-05')")
+        assert legacy.start is None
+        assert parse_partition("t_default", "DEFAULT").is_default
+
+
+class TestPostgresPartitioner:
+    """Test partition maintenance statements"""
+
+    def test_setup_sql(self):
+        """Test the legacy table is attached instead of copied"""
+        statements = make_partitioner().setup_sql(datetime(2026, 3, 6, tzinfo=UTC))
+        sql = "\n".join(statements)
+
+        assert (
+            statements[0]
+            == 'ALTER TABLE "logmancer_logentry" RENAME TO "logmancer_logentry_legacy"'
+        )
+        assert 'PARTITION BY RANGE ("timestamp")' in sql
+        assert 'ADD PRIMARY KEY ("id", "timestamp")' in sql
+        assert (
+            '"logmancer_level_ts_idx_p" ON "logmancer_logentry" ("level_value", "timestamp")' in sql
+        )
+        assert 'REFERENCES "auth_user" ("id")' in sql
+        assert "FOR VALUES FROM (MINVALUE) TO ('2026-03-06T00:00:00+00:00')" in sql
+        assert statements[-1].endswith("DEFAULT")
+
+        # The prebuilt unique index is adopted before attaching, the check dropped after
+        attach = next(i for i, sql in enumerate(statements) if "ATTACH PARTITION" in sql)
+        assert 'UNIQUE USING INDEX "logmancer_logentry_id_ts_uniq"' in statements[attach - 1]
+        assert 'DROP CONSTRAINT "logmancer_logentry_range_check"' in statements[attach + 1]
+
+    def test_prepare_sql(self):
+        """Test the range check and unique index are built without blocking writes"""
+        statements = make_partitioner().prepare_sql(datetime(2026, 3, 6, tzinfo=UTC))
+
+        assert statements[1].endswith(
+            "CHECK (\"timestamp\" < '2026-03-06T00:00:00+00:00') NOT VALID"
+        )
+        assert statements[2] == (
+            'ALTER TABLE "logmancer_logentry" VALIDATE CONSTRAINT "logmancer_logentry_range_check"'
+        )
+        assert statements[-1] == (
+            'CREATE UNIQUE INDEX CONCURRENTLY "logmancer_logentry_id_ts_uniq" '
+            'ON "logmancer_logentry" ("id", "timestamp")'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_setup_prepares_outside_the_transaction(self):
+        """Test prepare statements run before the catalog changes, with headroom"""
+        partitioner = make_partitioner()
+        executed = []
+
+        def execute(sql, params=None):
+            executed.append((sql, connection.in_atomic_block))
+            return [(datetime(2026, 3, 5, 12, tzinfo=UTC),)] if sql.startswith("SELECT") else []
+
+        with (
+            patch.object(partitioner, "is_partitioned", return_value=False),
+            patch.object(partitioner, "ensure"),
+            patch.object(partitioner, "_execute", side_effect=execute),
+            patch(
+                "logmancer.partitions.timezone.now",
+                return_value=datetime(2026, 3, 5, 13, tzinfo=UTC),
+            ),
+        ):
+            assert partitioner.setup() is True
+
+        concurrent = [atomic for sql, atomic in executed if "CONCURRENTLY" in sql]
+        assert concurrent and not any(concurrent)
+        assert all(atomic for sql, atomic in executed if "ATTACH PARTITION" in sql)
+        assert any("TO ('2026-03-07T00:00:00+00:00')" in sql for sql, _ in executed)
+
+    @pytest.mark.django_db
+    def test_ensure_skips_covered_periods(self):
+        """Test only periods without a partition are created"""
+        partitioner = make_partitioner()
+        existing = [
+            Partition("logmancer_logentry_legacy", None, datetime(2026, 3, 6, tzinfo=UTC)),
+            Partition("logmancer_logentry_default", None, None),
+        ]
+
+        with (
+            patch.object(partitioner, "partitions", return_value=existing),
+            patch.object(partitioner, "_execute", return_value=[]) as mock_execute,
+        ):
+            created = partitioner.ensure(2, now=datetime(2026, 3, 5, 12, tzinfo=UTC))
+
+        assert created == ["logmancer_logentry_p20260306", "logmancer_logentry_p20260307"]
+        creates = [c.args[0] for c in mock_execute.call_args_list if "PARTITION OF" in c.args[0]]
+        assert len(creates) == 2
+
+    @pytest.mark.django_db
+    def test_ensure_moves_rows_out_of_default(self):
+        """Test rows of a new range in the default partition are moved, not left to fail"""
+        partitioner = make_partitioner()
+        existing = [Partition("logmancer_logentry_default", None, None)]
+
+        with (
+            patch.object(partitioner, "partitions", return_value=existing),
+            patch.object(partitioner, "_execute", return_value=[(1,)]) as mock_execute,
+        ):
+            created = partitioner.ensure(0, now=datetime(2026, 3, 5, 12, tzinfo=UTC))
+
+        assert created == ["logmancer_logentry_p20260305"]
+        statements = [c.args[0] for c in mock_execute.call_args_list]
+        assert statements[0].startswith('SELECT 1 FROM "logmancer_logentry_default"')
+        assert statements[1] == (
+            'CREATE TABLE "logmancer_logentry_p20260305" '
+            '(LIKE "logmancer_logentry" INCLUDING DEFAULTS INCLUDING STORAGE)'
+        )
+        assert 'DELETE FROM "logmancer_logentry_default"' in statements[2]
+        assert statements[3].startswith(
+            'ALTER TABLE "logmancer_logentry" ATTACH PARTITION "logmancer_logentry_p20260305"'
+        )
+
+    @pytest.mark.django_db
+    def test_drop_before(self):
+        """Test only partitions entirely older than the threshold are dropped"""
+        partitioner = make_partitioner()
+        existing = [
+            Partition("logmancer_logentry_legacy", None, datetime(2026, 1, 1, tzinfo=UTC)),
+            Partition(
+                "logmancer_logentry_p202601",
+                datetime(2026, 1, 1, tzinfo=UTC),
+                datetime(2026, 2, 1, tzinfo=UTC),
+            ),
+            Partition("logmancer_logentry_default", None, None),
+        ]
+
+        with (
+            patch.object(partitioner, "partitions", return_value=existing),
+            patch.object(partitioner, "_execute") as mock_execute,
+        ):
+            dropped = partitioner.drop_before(datetime(2026, 1, 15, tzinfo=UTC))
+
+        assert [p.name for p in dropped] == ["logmancer_logentry_legacy"]
+        mock_execute.assert_called_once_with('DROP TABLE "logmancer_logentry_legacy"')
+
+    @pytest.mark.django_db
+    def test_drop_before_hands_rows_to_callback(self):
+        """Test rows of a partition are passed on before it is dropped"""
+        partitioner = make_partitioner()
+        start, end = datetime(2026, 1, 1, tzinfo=UTC), datetime(2026, 2, 1, tzinfo=UTC)
+        seen = []
+
+        with (
+            patch.object(partitioner, "partitions", return_value=[Partition("p", start, end)]),
+            patch.object(partitioner, "_execute"),
+        ):
+            partitioner.drop_before(datetime(2026, 3, 1, tzinfo=UTC), seen.append)
+
+        sql = str(seen[0].query)
+        assert '"timestamp" < 2026-02-01' in sql
+        assert '"timestamp" >= 2026-01-01' in sql
+
+
+class TestGetPartitioner:
+    """Test the portable fallback"""
+
+    def test_disabled_by_default(self):
+        """Test partitioning is off unless configured"""
+        assert get_partitioner() is None
+
+    @override_settings(LOGMANCER={"PARTITIONING": "daily"})
+    def test_unsupported_backend(self):
+        """Test non-PostgreSQL databases fall back to row deletes"""
+        assert get_partitioner() is None
+
+    @override_settings(LOGMANCER={"PARTITIONING": "daily"})
+    def test_command_requires_postgresql(self):
+        """Test logmancer_partitions reports unsupported setups"""
+        with pytest.raises(CommandError, match="PostgreSQL"):
+            call_command("logmancer_partitions")
@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+
+from django.core.management import call_command
+from django.db.models import Value
+from django.test import override_settings
+
+import pytest
+
+from logmancer.models import LogAggregate, LogEntry
+from logmancer.rollup import PercentileDisc, duration_percentiles, rollup
+
+UTC = dt_timezone.utc
+HOUR = datetime(2026, 3, 5, 10, tzinfo=UTC)
+
+
+def make_request_logs(*rows):
+    LogEntry.objects.bulk_create(
+        [
+            LogEntry(
+                message="rollup",
+                source=source,
+                path="/api/orders/",
+                method="GET",
+                status_code=status,
+                level="ERROR" if status >= 500 else "INFO",
+                sample_rate=rate,
+                timestamp=HOUR + timedelta(minutes=minute),
+            )
+            for minute, status, rate, source in rows
+        ]
+    )
+    return LogEntry.objects.filter(message="rollup")
+
+
+@pytest.mark.django_db
+class TestRollup:
+    """Test LogAggregate compaction"""
+
+    def test_hourly_groups(self):
+        """Test rows are grouped by bucket, path, method, status and level"""
+        rows = make_request_logs(
+            (1, 200, 0.5, "middleware"),
+            (2, 200, 0.5, "middleware"),
+            (3, 503, 1.0, "middleware"),
+            (70, 200, 1.0, "middleware"),
+            (4, 200, 1.0, "signal"),
+        )
+
+        assert rollup(rows, ["hour"]) == 3
+
+        ok = LogAggregate.objects.get(period="hour", bucket=HOUR, status_code=200)
+        assert (ok.count, ok.error_count, ok.estimated_count) == (2, 0, 4.0)
+        error = LogAggregate.objects.get(period="hour", bucket=HOUR, status_code=503)
+        assert (error.count, error.error_count, error.level) == (1, 1, "ERROR")
+        assert LogAggregate.objects.get(bucket=HOUR + timedelta(hours=1)).count == 1
+
+    def test_daily_period(self):
+        """Test daily buckets start at midnight UTC"""
+        rows = make_request_logs((1, 200, 1.0, "middleware"), (70, 200, 1.0, "middleware"))
+
+        rollup(rows, ["day"])
+
+        aggregate = LogAggregate.objects.get(period="day")
+        assert aggregate.bucket == datetime(2026, 3, 5, tzinfo=UTC)
+        assert aggregate.count == 2
+
+    def test_existing_buckets_are_topped_up(self):
+        """Test a second rollup of the same bucket adds to it"""
+        rollup(make_request_logs((1, 200, 1.0, "middleware")), ["hour"])
+        LogEntry.objects.filter(message="rollup").delete()
+        rollup(make_request_logs((2, 200, 1.0, "middleware")), ["hour"])
+
+        aggregate = LogAggregate.objects.get()
+        assert aggregate.count == 2
+
+    def test_duration_percentiles(self):
+        """Test p50 and p95 are computed from recorded durations"""
+        rows = make_request_logs(*[(1, 200, 1.0, "middleware")] * 20)
+        for index, pk in enumerate(rows.order_by("pk").values_list("pk", flat=True)):
+            LogEntry.objects.filter(pk=pk).update(duration_ms=index + 1)
+
+        rollup(rows, ["hour"])
+
+        aggregate = LogAggregate.objects.get()
+        assert (aggregate.p50_ms, aggregate.p95_ms) == (10, 19)
+
+    def test_streamed_percentiles_per_group(self):
+        """Test streamed percentiles match nearest-rank per bucket and status"""
+        rows = make_request_logs(
+            *[(1, 200, 1.0, "middleware")] * 5,
+            (2, 503, 1.0, "middleware"),
+            (70, 200, 1.0, "middleware"),
+        )
+        for index, pk in enumerate(rows.order_by("pk").values_list("pk", flat=True)):
+            LogEntry.objects.filter(pk=pk).update(duration_ms=50 - index)
+
+        rollup(rows, ["hour"])
+
+        ok = LogAggregate.objects.get(bucket=HOUR, status_code=200)
+        assert (ok.p50_ms, ok.p95_ms) == (48, 50)
+        error = LogAggregate.objects.get(status_code=503)
+        assert (error.p50_ms, error.p95_ms) == (45, 45)
+        later = LogAggregate.objects.get(bucket=HOUR + timedelta(hours=1))
+        assert (later.p50_ms, later.p95_ms) == (44, 44)
+
+    def test_untimed_groups_have_no_percentiles(self):
+        """Test groups without durations are skipped while streaming"""
+        rows = make_request_logs((1, 200, 1.0, "middleware"))
+        key = (HOUR, "/api/orders/", "GET", 200, "INFO")
+
+        assert duration_percentiles(rows, Value(HOUR), {key: 0}) == {}
+
+    def test_percentile_disc_sql(self):
+        """Test the PostgreSQL aggregate renders an ordered-set percentile"""
+        query = LogEntry.objects.values("path").annotate(p95=PercentileDisc("duration_ms", 0.95))
+        assert "PERCENTILE_DISC(0.95) WITHIN GROUP (ORDER BY" in str(query.query)
+
+    def test_percentiles_are_merged_when_topped_up(self):
+        """Test topping up a bucket weights percentiles by count"""
+        rows = make_request_logs((1, 200, 1.0, "middleware"))
+        rows.update(duration_ms=100)
+        rollup(rows, ["hour"])
+        rows.delete()
+
+        rows = make_request_logs(*[(2, 200, 1.0, "middleware")] * 3)
+        rows.update(duration_ms=20)
+        rollup(rows, ["hour"])
+
+        aggregate = LogAggregate.objects.get()
+        assert aggregate.count == 4
+        assert aggregate.p50_ms == 40
+
+    def test_unknown_period_is_ignored(self):
+        """Test invalid periods are skipped"""
+        assert rollup(make_request_logs((1, 200, 1.0, "middleware")), ["week"]) == 0
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(LOGMANCER={"ROLLUP_PERIODS": ["hour", "day"]})
+def test_cleanup_rolls_up_before_deleting():
+    make_request_logs((1, 200, 1.0, "middleware"), (2, 404, 1.0, "middleware"))
+
+    call_command("logmancer_cleanup")
+
+    assert not LogEntry.objects.filter(message="rollup").exists()
+    assert LogAggregate.objects.filter(period="hour").count() == 2
+    assert sum(LogAggregate.objects.filter(period="day").values_list("count", flat=True)) == 2
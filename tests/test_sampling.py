@@ -0,0 +1,215 @@
+from unittest.mock import patch
+
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+import pytest
+
+from logmancer.middleware import DBLoggingMiddleware
+from logmancer.models import LogEntry
+from logmancer.sampling import (
+    PathBuckets,
+    RequestSampler,
+    SamplingRule,
+    SlowRequestFilter,
+    TokenBucket,
+)
+from logmancer.timing import RequestTiming
+
+
+class TestSamplingRule:
+    """Test SamplingRule matching"""
+
+    def test_status_class(self):
+        """Test status classes and exact codes"""
+        rule = SamplingRule.from_config({"rate": 0.5, "status": ["2xx", 404]})
+        assert rule.matches("/a/", "GET", 201) is True
+        assert rule.matches("/a/", "GET", 404) is True
+        assert rule.matches("/a/", "GET", 500) is False
+
+    def test_path_and_method(self):
+        """Test path patterns and methods must all match"""
+        rule = SamplingRule.from_config({"path": "/api/*/list", "methods": ["get"]})
+        assert rule.matches("/api/users/list", "GET", 200) is True
+        assert rule.matches("/api/users/list", "POST", 200) is False
+        assert rule.matches("/other/", "GET", 200) is False
+
+    def test_single_method_string(self):
+        """Test a method given as a string is not split into characters"""
+        rule = SamplingRule.from_config({"methods": "get"})
+        assert rule.methods == frozenset({"GET"})
+        assert rule.matches("/a/", "GET", 200) is True
+        assert rule.matches("/a/", "POST", 200) is False
+
+    def test_rate_is_clamped(self):
+        """Test rates outside 0-1 are clamped"""
+        assert SamplingRule.from_config({"rate": 5}).rate == 1.0
+        assert SamplingRule.from_config({"rate": -1}).rate == 0.0
+
+
+class TestTokenBucket:
+    """Test TokenBucket refills"""
+
+    def test_burst_then_refill(self):
+        """Test the bucket allows a burst and refills over time"""
+        with patch("logmancer.sampling.time.monotonic", return_value=100.0) as mock_time:
+            bucket = TokenBucket(rate=1, burst=2)
+            assert bucket.consume() is True
+            assert bucket.consume() is True
+            assert bucket.consume() is False
+
+            mock_time.return_value = 101.0
+            assert bucket.consume() is True
+            assert bucket.consume() is False
+
+
+class TestRequestSampler:
+    """Test RequestSampler decisions"""
+
+    def test_no_rules_keeps_everything(self):
+        """Test every request is kept at rate 1.0 without rules"""
+        sampler = RequestSampler()
+        assert not sampler
+        assert sampler.sample("/a/", "GET", 200) == 1.0
+
+    def test_first_matching_rule_wins(self):
+        """Test errors are kept while successes are sampled"""
+        sampler = RequestSampler([{"status": "5xx", "rate": 1.0}, {"status": "2xx", "rate": 0.01}])
+
+        with patch("logmancer.sampling.random.random", return_value=0.5):
+            assert sampler.sample("/a/", "GET", 200) is None
+            assert sampler.sample("/a/", "GET", 503) == 1.0
+
+        with patch("logmancer.sampling.random.random", return_value=0.001):
+            assert sampler.sample("/a/", "GET", 200) == 0.01
+
+    def test_zero_rate_drops(self):
+        """Test a rate of 0 drops every matching request"""
+        sampler = RequestSampler([{"path": "/health", "rate": 0}])
+        assert sampler.sample("/health/", "GET", 200) is None
+        assert sampler.sample("/api/", "GET", 200) == 1.0
+
+    def test_rate_limit(self):
+        """Test requests over the token bucket are dropped"""
+        sampler = RequestSampler(rate_limits=[{"path": "/api/", "rate": 0.001, "burst": 1}])
+        assert sampler.sample("/api/a/", "GET", 200) == 1.0
+        assert sampler.sample("/api/a/", "GET", 200) is None
+        assert sampler.sample("/other/", "GET", 200) == 1.0
+
+    def test_rate_limit_per_path(self):
+        """Test each path matching a rate limit entry has its own bucket"""
+        sampler = RequestSampler(rate_limits=[{"path": "/api/", "rate": 0.001, "burst": 1}])
+        assert sampler.sample("/api/a/", "GET", 200) == 1.0
+        assert sampler.sample("/api/b/", "GET", 200) == 1.0
+        assert sampler.sample("/api/b/", "GET", 200) is None
+
+    def test_rate_limited_rows_carry_effective_rate(self):
+        """Test a row kept by a bucket also stands for the requests dropped before it"""
+        sampler = RequestSampler(
+            [{"rate": 0.5}], rate_limits=[{"path": "/api/", "rate": 1, "burst": 1}]
+        )
+        with (
+            patch("logmancer.sampling.random.random", return_value=0.1),
+            patch("logmancer.sampling.time.monotonic", return_value=100.0) as mock_time,
+        ):
+            assert sampler.sample("/api/a/", "GET", 200) == 0.5
+            assert [sampler.sample("/api/a/", "GET", 200) for _ in range(3)] == [None] * 3
+
+            mock_time.return_value = 101.0
+            assert sampler.sample("/api/a/", "GET", 200) == 0.5 / 4
+
+    def test_path_buckets_are_bounded(self):
+        """Test the least recently seen paths are evicted"""
+        buckets = PathBuckets(rate=0.001, burst=1, max_paths=2)
+        assert [buckets.consume(path) for path in ("/a", "/b", "/a", "/c")] == [1, 1, 0, 1]
+        assert list(buckets._buckets) == ["/a", "/c"]
+
+    def test_invalid_entries_are_ignored(self):
+        """Test invalid rules are skipped"""
+        sampler = RequestSampler([{"rate": "abc"}, "bad"], [{"path": "/x/"}])
+        assert sampler.rules == ()
+        assert sampler.rate_limits == ()
+
+
+@pytest.mark.django_db
+class TestMiddlewareSampling:
+    """Test sampling in DBLoggingMiddleware"""
+
+    def log(self, path, status):
+        middleware = DBLoggingMiddleware(lambda x: HttpResponse())
+        request = RequestFactory().get(path)
+        request.user = None
+        middleware.log_request(request, HttpResponse(status=status))
+
+    @override_settings(LOGMANCER={"SAMPLING_RULES": [{"status": "2xx", "rate": 0.25}]})
+    def test_sample_rate_is_recorded(self):
+        """Test kept rows carry their sampling rate and errors are always kept"""
+        with patch("logmancer.sampling.random.random", side_effect=[0.9, 0.1]):
+            self.log("/api/dropped/", 200)
+            self.log("/api/kept/", 200)
+        self.log("/api/error/", 500)
+
+        assert not LogEntry.objects.filter(path="/api/dropped/").exists()
+        assert LogEntry.objects.get(path="/api/kept/").sample_rate == 0.25
+        assert LogEntry.objects.get(path="/api/error/").sample_rate == 1.0
+
+
+class TestSlowRequestFilter:
+    """Test slow-request-only decisions"""
+
+    def test_errors_are_always_kept(self):
+        """Test 4xx and 5xx responses are kept regardless of duration"""
+        slow = SlowRequestFilter(1000)
+        assert slow.keep("/a/", 404, 1) is True
+        assert slow.keep("/a/", 500, None) is True
+
+    def test_default_threshold(self):
+        """Test healthy requests are kept only above the threshold"""
+        slow = SlowRequestFilter(1000)
+        assert slow.keep("/a/", 200, 999) is False
+        assert slow.keep("/a/", 200, 1000) is True
+        assert slow.keep("/a/", 200, None) is False
+
+    def test_first_matching_pattern_wins(self):
+        """Test per-path thresholds are checked in order"""
+        slow = SlowRequestFilter(
+            1000, {"/api/reports/": 5000, "/api/": 200, "re:/v\\d+/": "50", "/bad/": "x"}
+        )
+        assert slow.threshold_for("/api/reports/monthly/") == 5000
+        assert slow.threshold_for("/api/users/") == 200
+        assert slow.threshold_for("/v2/ping") == 50
+        assert slow.threshold_for("/other/") == 1000
+        assert len(slow.thresholds) == 3
+
+
+@pytest.mark.django_db
+class TestMiddlewareSlowRequests:
+    """Test SLOW_REQUESTS_ONLY in DBLoggingMiddleware"""
+
+    def log(self, path, status, duration_ms):
+        middleware = DBLoggingMiddleware(lambda x: HttpResponse())
+        request = RequestFactory().get(path)
+        request.user = None
+        middleware.log_request(request, HttpResponse(status=status), RequestTiming(duration_ms))
+
+    @override_settings(
+        LOGMANCER={
+            "SLOW_REQUESTS_ONLY": True,
+            "SLOW_REQUEST_THRESHOLD_MS": 500,
+            "SLOW_REQUEST_THRESHOLDS": {"/api/export/": 3000},
+        }
+    )
+    def test_only_slow_and_failed_requests_are_logged(self):
+        """Test fast healthy requests are skipped"""
+        self.log("/api/fast/", 200, 20)
+        self.log("/api/slow/", 200, 800)
+        self.log("/api/export/", 200, 800)
+        self.log("/api/missing/", 404, 5)
+
+        logged = set(LogEntry.objects.filter(source="middleware").values_list("path", flat=True))
+        assert logged == {"/api/slow/", "/api/missing/"}
+
+    def test_disabled_by_default(self):
+        """Test every request is logged without SLOW_REQUESTS_ONLY"""
+        self.log("/api/fast/", 200, 1)
+        assert LogEntry.objects.filter(path="/api/fast/").exists()
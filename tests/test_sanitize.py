@@ -0,0 +1,211 @@
+from django.test import override_settings
+
+import pytest
+
+from logmancer.conf import get_settings
+from logmancer.models import LogEntry
+from logmancer.sanitize import DEPTH_PLACEHOLDER, MASK, TRUNCATED_KEY, MetaLimits, Sanitizer
+from logmancer.utils import LogEvent
+
+
+class TestSanitizerLimits:
+    """Test size caps applied by Sanitizer"""
+
+    def test_no_limits_keeps_data(self):
+        """Test data is unchanged when no limit applies"""
+        data = {"a": "x" * 1000, "b": list(range(100)), "c": {"d": {"e": 1}}}
+        assert Sanitizer().sanitize(data) == data
+
+    def test_field_bytes_limit(self):
+        """Test long strings are cut to the byte limit"""
+        sanitizer = Sanitizer(limits=MetaLimits(max_field_bytes=10))
+        result = sanitizer.sanitize({"body": "a" * 50, "short": "ok"})
+
+        assert result["body"] == "a" * 10
+        assert result["short"] == "ok"
+        assert result[TRUNCATED_KEY] == {"body": "50 bytes"}
+
+    def test_field_bytes_limit_multibyte(self):
+        """Test truncation counts bytes and never splits a character"""
+        sanitizer = Sanitizer(limits=MetaLimits(max_field_bytes=5))
+        result = sanitizer.sanitize({"text": "ééééé"})
+
+        assert result["text"] == "éé"
+        assert result[TRUNCATED_KEY] == {"text": "10 bytes"}
+
+    def test_list_length_limit(self):
+        """Test long lists are cut and the original length recorded"""
+        sanitizer = Sanitizer(limits=MetaLimits(max_list_length=3))
+        result = sanitizer.sanitize({"items": list(range(10))})
+
+        assert result["items"] == [0, 1, 2]
+        assert result[TRUNCATED_KEY] == {"items": "10 items"}
+
+    def test_depth_limit(self):
+        """Test containers nested deeper than max_depth are replaced"""
+        sanitizer = Sanitizer(limits=MetaLimits(max_depth=2))
+        result = sanitizer.sanitize({"a": {"b": {"c": 1}}, "flat": 1})
+
+        assert result["a"]["b"] == DEPTH_PLACEHOLDER
+        assert result["flat"] == 1
+        assert result[TRUNCATED_KEY] == {"a.b": "depth"}
+
+    def test_nested_paths(self):
+        """Test truncation paths include list indexes"""
+        sanitizer = Sanitizer(limits=MetaLimits(max_field_bytes=4))
+        result = sanitizer.sanitize({"rows": [{"note": "long text"}]})
+
+        assert result[TRUNCATED_KEY] == {"rows.0.note": "9 bytes"}
+
+    def test_masking_in_same_pass(self):
+        """Test sensitive keys are masked while limits are applied"""
+        sanitizer = Sanitizer(["Password"], MetaLimits(max_field_bytes=4))
+        result = sanitizer.sanitize({"password": "secret-value", "user": {"PASSWORD": "x"}})
+
+        assert result["password"] == MASK
+        assert result["user"]["PASSWORD"] == MASK
+        assert TRUNCATED_KEY not in result
+
+    def test_non_dict_root(self):
+        """Test a list root is truncated without a marker"""
+        sanitizer = Sanitizer(limits=MetaLimits(max_list_length=2))
+        assert sanitizer.sanitize([1, 2, 3]) == [1, 2]
+        assert sanitizer.sanitize(None) is None
+
+
+class TestSanitizerMasking:
+    """Test key patterns, value patterns and copy-on-write behaviour"""
+
+    def test_glob_key_patterns(self):
+        """Test glob patterns mask every matching key"""
+        sanitizer = Sanitizer(["*_token", "secret?"])
+        result = sanitizer.sanitize({"access_token": "a", "Refresh_Token": "b", "secret1": "c"})
+
+        assert result == {"access_token": MASK, "Refresh_Token": MASK, "secret1": MASK}
+
+    def test_regex_key_patterns(self):
+        """Test re: patterns match from the start of the key"""
+        sanitizer = Sanitizer([r"re:api[-_]?key"])
+        result = sanitizer.sanitize({"API-KEY": "a", "apikey": "b", "my_apikey": "c"})
+
+        assert result == {"API-KEY": MASK, "apikey": MASK, "my_apikey": "c"}
+
+    def test_inline_flag_key_pattern(self):
+        """Test a regex with a global inline flag does not break the other patterns"""
+        sanitizer = Sanitizer(["re:(?i)secret", "*_token"])
+        result = sanitizer.sanitize({"SECRET_value": "a", "auth_token": "b", "name": "c"})
+
+        assert result == {"SECRET_value": MASK, "auth_token": MASK, "name": "c"}
+
+    @override_settings(LOGMANCER={"LOG_SENSITIVE_KEYS": ["re:(?i)secret"]})
+    def test_inline_flag_key_pattern_from_settings(self):
+        """Test LOG_SENSITIVE_KEYS accepts a regex with a global inline flag"""
+        sanitizer = get_settings().sanitizer
+        assert sanitizer.sanitize({"Secret": "a"}) == {"Secret": MASK}
+
+    def test_invalid_key_pattern_is_ignored(self):
+        """Test invalid regex key patterns are skipped"""
+        sanitizer = Sanitizer(["re:[bad", "password"])
+        assert sanitizer.sanitize({"password": "x", "[bad": "y"}) == {"password": MASK, "[bad": "y"}
+
+    def test_card_number_values(self):
+        """Test Luhn-valid card numbers are masked inside strings"""
+        sanitizer = Sanitizer(value_patterns=["card_number"])
+        result = sanitizer.sanitize(
+            {"note": "paid with 4111 1111 1111 1111 today", "order": "1234567890123"}
+        )
+
+        assert result["note"] == f"paid with {MASK} today"
+        assert result["order"] == "1234567890123"
+
+    def test_custom_value_pattern(self):
+        """Test regex value patterns replace every match"""
+        sanitizer = Sanitizer(value_patterns=[r"Bearer \S+", "[invalid"])
+        assert sanitizer.sanitize(["auth: Bearer abc.def"]) == [f"auth: {MASK}"]
+
+    def test_untouched_subtrees_are_reused(self):
+        """Test containers without changes are not copied"""
+        clean = {"a": [1, 2, {"b": "c"}]}
+        data = {"clean": clean, "dirty": {"password": "x"}}
+
+        result = Sanitizer(["password"]).sanitize(data)
+
+        assert result is not data
+        assert result["clean"] is clean
+        assert result["dirty"] == {"password": MASK}
+        assert data["dirty"] == {"password": "x"}
+
+    def test_unchanged_payload_is_returned_as_is(self):
+        """Test a payload without sensitive data is not copied"""
+        data = {"a": {"b": [1, "two"]}}
+        assert Sanitizer(["password"]).sanitize(data) is data
+
+    def test_truncation_does_not_modify_input(self):
+        """Test the _truncated marker is added to a copy"""
+        data = {"items": [1, 2, 3]}
+        result = Sanitizer(limits=MetaLimits(max_list_length=1)).sanitize(data)
+
+        assert result == {"items": [1], TRUNCATED_KEY: {"items": "3 items"}}
+        assert data == {"items": [1, 2, 3]}
+
+    def test_deep_nesting_without_recursion(self):
+        """Test payloads deeper than the recursion limit are handled"""
+        data = leaf = {}
+        for _ in range(5000):
+            leaf["child"] = {}
+            leaf = leaf["child"]
+        leaf["password"] = "x"
+
+        result = Sanitizer(["password"]).sanitize(data)
+
+        node = result
+        while "child" in node:
+            node = node["child"]
+        assert node == {"password": MASK}
+
+
+class TestSanitizerSettings:
+    """Test limits configured through LOGMANCER"""
+
+    @override_settings(
+        LOGMANCER={"META_MAX_FIELD_BYTES": 8, "META_MAX_DEPTH": 3, "META_MAX_LIST_LENGTH": 2}
+    )
+    def test_limits_from_settings(self):
+        """Test the settings snapshot builds limits from LOGMANCER"""
+        assert get_settings().sanitizer.limits == MetaLimits(8, 3, 2)
+        assert get_settings().masker.limits == MetaLimits()
+
+    @pytest.mark.django_db(transaction=True)
+    @override_settings(
+        LOGMANCER={
+            "LOG_SENSITIVE_KEYS": ["*_secret"],
+            "LOG_SENSITIVE_VALUE_PATTERNS": ["card_number"],
+        }
+    )
+    def test_log_event_masks_meta(self):
+        """Test LogEvent masks meta with the shared sanitizer"""
+        LogEvent.info("Masked", meta={"client_secret": "abc", "card": "4111111111111111"})
+
+        log = LogEntry.objects.get(message="Masked")
+        assert log.meta == {"client_secret": MASK, "card": MASK}
+
+    @pytest.mark.django_db(transaction=True)
+    @override_settings(LOGMANCER={"META_MAX_FIELD_BYTES": 100})
+    def test_log_event_caps_stack(self):
+        """Test LogEvent applies the limits to meta"""
+        LogEvent.error("Big stack", meta={"stack": "frame\n" * 1000})
+
+        log = LogEntry.objects.get(message="Big stack")
+        assert len(log.meta["stack"]) == 100
+        assert log.meta[TRUNCATED_KEY] == {"stack": "6000 bytes"}
+
+    def test_stack_keeps_innermost_frames(self):
+        """Test tracebacks are cut from the start so the exception line survives"""
+        stack = "Traceback (most recent call last):\n" + "  frame\n" * 50 + "ValueError: boom\n"
+        sanitizer = Sanitizer(limits=MetaLimits(max_field_bytes=40))
+
+        result = sanitizer.sanitize({"stack": stack, "other": stack})
+
+        assert result["stack"].endswith("ValueError: boom\n")
+        assert result["other"].startswith("Traceback")
+        assert len(result["stack"].encode()) == 40
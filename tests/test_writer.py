@@ -0,0 +1,193 @@
+from unittest.mock import patch
+
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+import pytest
+
+from logmancer.middleware import DBLoggingMiddleware
+from logmancer.models import LogEntry
+from logmancer.utils import LogEvent
+from logmancer.writer import BackgroundWriter, LogBuffer, get_log_buffer, write_log
+
+
+@pytest.fixture(autouse=True)
+def clear_logs():
+    """Clear all logs before each test"""
+    LogEntry.objects.all().delete()
+    yield
+    LogEntry.objects.all().delete()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestLogBuffer:
+    """Test LogBuffer batching"""
+
+    def test_add_does_not_write_below_threshold(self):
+        """Test entries stay in memory until a threshold is hit"""
+        buffer = LogBuffer(max_size=10, flush_interval=0)
+        buffer.add(LogEntry(message="Buffered", level="INFO"))
+
+        assert len(buffer) == 1
+        assert LogEntry.objects.count() == 0
+
+    def test_flush_on_size_threshold(self):
+        """Test buffer flushes when max_size is reached"""
+        buffer = LogBuffer(max_size=3, flush_interval=0)
+        for i in range(3):
+            buffer.add(LogEntry(message=f"Entry {i}", level="INFO"))
+
+        assert len(buffer) == 0
+        assert LogEntry.objects.count() == 3
+
+    def test_flush_uses_single_bulk_create(self):
+        """Test flush writes the whole batch with bulk_create"""
+        buffer = LogBuffer(max_size=50, flush_interval=0)
+        for i in range(5):
+            buffer.add(LogEntry(message=f"Entry {i}", level="INFO"))
+
+        with patch.object(LogEntry.objects, "bulk_create") as mock_bulk:
+            written = buffer.flush()
+
+        assert written == 5
+        mock_bulk.assert_called_once()
+        assert len(mock_bulk.call_args[0][0]) == 5
+
+    def test_flush_empty_buffer(self):
+        """Test flushing an empty buffer is a no-op"""
+        buffer = LogBuffer(max_size=10, flush_interval=0)
+        assert buffer.flush() == 0
+
+    def test_flush_error_is_logged(self):
+        """Test a failing bulk_create does not raise"""
+        buffer = LogBuffer(max_size=10, flush_interval=0)
+        buffer.add(LogEntry(message="Broken", level="INFO"))
+
+        with patch.object(LogEntry.objects, "bulk_create", side_effect=Exception("DB down")):
+            with patch("logmancer.writer.logger") as mock_logger:
+                assert buffer.flush() == 0
+                mock_logger.error.assert_called_once()
+
+        assert len(buffer) == 0
+
+    def test_timestamp_is_kept_from_creation(self):
+        """Test buffered rows keep the time they were logged, not the flush time"""
+        buffer = LogBuffer(max_size=10, flush_interval=0)
+        entry = LogEntry(message="Timed", level="INFO")
+        created_at = entry.timestamp
+        buffer.add(entry)
+        buffer.flush()
+
+        assert LogEntry.objects.get(message="Timed").timestamp == created_at
+
+
+@pytest.mark.django_db(transaction=True)
+class TestWriteLog:
+    """Test write_log dispatch"""
+
+    def test_write_log_saves_immediately_by_default(self):
+        """Test write_log creates the row directly when buffering is disabled"""
+        write_log(message="Direct", level="INFO")
+
+        assert LogEntry.objects.filter(message="Direct").exists()
+
+    @override_settings(LOGMANCER={"BUFFERED_WRITES": True, "BUFFER_SIZE": 1000})
+    def test_write_log_buffers_when_enabled(self):
+        """Test write_log goes through the buffer when BUFFERED_WRITES is set"""
+        buffer = LogBuffer(max_size=1000, flush_interval=0)
+
+        with patch("logmancer.writer.get_log_buffer", return_value=buffer):
+            write_log(message="Buffered", level="INFO")
+
+            assert not LogEntry.objects.filter(message="Buffered").exists()
+            buffer.flush()
+
+        assert LogEntry.objects.filter(message="Buffered").exists()
+
+    @override_settings(
+        LOGMANCER={"BUFFERED_WRITES": True, "BUFFER_SIZE": 1000, "ENABLE_NOTIFICATIONS": True}
+    )
+    def test_notify_bypasses_buffer(self):
+        """Test entries with notify=True are saved before queueing the notification"""
+        buffer = LogBuffer(max_size=1000, flush_interval=0)
+
+        with patch("logmancer.utils.transaction.on_commit", side_effect=lambda f: f()):
+            with patch("logmancer.writer.get_log_buffer", return_value=buffer):
+                with patch.object(LogEvent, "_queue_notification") as mock_queue:
+                    LogEvent.error("Notify me", notify=True)
+
+        assert len(buffer) == 0
+        assert LogEntry.objects.filter(message="Notify me").exists()
+        mock_queue.assert_called_once()
+
+    def test_get_log_buffer_is_singleton(self):
+        """Test get_log_buffer returns the same instance"""
+        assert get_log_buffer() is get_log_buffer()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBackgroundWriter:
+    """Test BackgroundWriter queueing"""
+
+    def test_submit_does_not_write(self):
+        """Test submitted entries are only queued on the calling thread"""
+        writer = BackgroundWriter(max_queue_size=10, batch_size=10)
+
+        with patch.object(writer, "_start_worker"):
+            assert writer.submit(LogEntry(message="Queued", level="INFO")) is True
+
+        assert LogEntry.objects.count() == 0
+
+    def test_drain_writes_in_batches(self):
+        """Test drain persists queued entries with bulk_create batches"""
+        writer = BackgroundWriter(max_queue_size=10, batch_size=2)
+
+        with patch.object(writer, "_start_worker"):
+            for i in range(5):
+                writer.submit(LogEntry(message=f"Queued {i}", level="INFO"))
+
+        with patch.object(
+            LogEntry.objects, "bulk_create", wraps=LogEntry.objects.bulk_create
+        ) as mock_bulk:
+            assert writer.drain() == 5
+
+        assert mock_bulk.call_count == 3
+        assert LogEntry.objects.count() == 5
+
+    def test_submit_drops_when_full(self):
+        """Test submit drops entries when the queue is full"""
+        writer = BackgroundWriter(max_queue_size=1, batch_size=10)
+
+        with patch.object(writer, "_start_worker"):
+            assert writer.submit(LogEntry(message="First", level="INFO")) is True
+            with patch("logmancer.writer.logger") as mock_logger:
+                assert writer.submit(LogEntry(message="Second", level="INFO")) is False
+                mock_logger.error.assert_called_once()
+
+    def test_worker_persists_entries(self):
+        """Test the worker thread writes submitted entries"""
+        writer = BackgroundWriter(max_queue_size=10, batch_size=10)
+        writer.submit(LogEntry(message="From worker", level="INFO"))
+
+        writer._queue.join()
+
+        assert LogEntry.objects.filter(message="From worker").exists()
+
+    @override_settings(LOGMANCER={"MIDDLEWARE_BACKGROUND_WRITES": True})
+    def test_middleware_hands_off_to_background_writer(self):
+        """Test the middleware only builds the entry when background writes are enabled"""
+        middleware = DBLoggingMiddleware(lambda request: HttpResponse())
+        request = RequestFactory().get("/api/background/")
+        request.user = None
+
+        writer = BackgroundWriter(max_queue_size=10, batch_size=10)
+        with patch("logmancer.writer.get_background_writer", return_value=writer):
+            with patch.object(writer, "_start_worker"):
+                middleware.log_request(request, HttpResponse(status=200))
+
+            assert not LogEntry.objects.filter(path="/api/background/").exists()
+            writer.drain()
+
+        log = LogEntry.objects.get(path="/api/background/")
+        assert log.source == "middleware"
+        assert log.status_code == 200